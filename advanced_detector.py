@@ -4,56 +4,208 @@ Détecteur avancé - Détection automatique des symboles et numéros
 """
 
 import cv2
-import numpy as np
 import json
+import numpy as np
 import os
-from typing import Dict, Tuple, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Tuple, Optional
+
+from calibration_store import CalibrationStore, DEFAULT_CONFIG_PATH
+from perspective_grid import PerspectiveGrid
 
 
 class AdvancedDetector:
     """Détecteur avancé pour symboles et numéros"""
     
-    def __init__(self):
-        # Charger la configuration de calibrage
-        with open('grid_calibration_config.json', 'r') as f:
-            self.config = json.load(f)
+    # Confiance attribuée selon l'étape de détection qui a conclu
+    CIRCLE_CONFIDENCE = 0.9   # Cercle coloré trouvé par HoughCircles
+    TEXT_CONFIDENCE = 0.5     # Heuristique de forme sur les contours
+    SHAPE_CONFIDENCE = 0.9    # Masque HSV confirmé par la forme
+    COLOR_CONFIDENCE = 0.4    # Simple couleur dominante
+    
+    # Taille de la miniature utilisée par l'étape rapide
+    QUICK_SIZE = 16
+    
+    # Intervalles de teinte (de 10 en 10) de chaque famille dans l'histogramme rapide
+    QUICK_FAMILIES = {
+        "rouge": (0, 17),
+        "or": (1, 2, 3),
+        "vert": (4, 5, 6, 7),
+        "bleu": (10, 11, 12),
+    }
+    
+    # Signatures des badges : familles attendues, étiquettes et plafond de confiance.
+    # Dague et fraise ont la même signature rouge sur la miniature : une chance sur deux
+    QUICK_SIGNATURES = {
+        "dague": {"familles": ("rouge",), "numéro": "3", "symbole": "🗡️ Dague rouge", "plafond": 0.5},
+        "fraise": {"familles": ("rouge", "vert"), "numéro": "1", "symbole": "🍓 Fraise rouge et verte",
+                   "plafond": 0.5},
+        "goutte": {"familles": ("bleu", "vert"), "numéro": "1", "symbole": "💧 Goutte bleue", "plafond": 1.0},
+        "pièce": {"familles": ("or",), "numéro": "?", "symbole": "🪙 Pièce avec ?", "plafond": 1.0},
+    }
+    
+    # Part de pixels saturés sous laquelle la case n'a pas de badge, et au-delà de laquelle
+    # l'icône est jugée entière (les badges couvrent 4 à 8 % du quart)
+    QUICK_EMPTY = 0.01
+    QUICK_COVERAGE = 0.03
+    
+    # Seuil de la cascade, au-dessus de la pire confiance rapide erronée sur data/sprite_labels.json
+    # (0.5 : la fraise (3,3) lue comme une dague) ; recalculable avec calibrate_threshold
+    QUICK_THRESHOLD = 0.52
+    
+    # Bornes HSV (teinte, saturation, valeur) des familles de couleurs, créées une seule fois
+    HSV_BOUNDS = {
+        "rouge_bas": (np.array([0, 50, 50], np.uint8), np.array([10, 255, 255], np.uint8)),
+        "rouge_haut": (np.array([170, 50, 50], np.uint8), np.array([180, 255, 255], np.uint8)),
+        "bleu": (np.array([100, 50, 50], np.uint8), np.array([130, 255, 255], np.uint8)),
+        "vert": (np.array([40, 50, 50], np.uint8), np.array([80, 255, 255], np.uint8)),
+        "jaune": (np.array([20, 50, 50], np.uint8), np.array([40, 255, 255], np.uint8)),
+        # Étape rapide : pixels saturés et lumineux (icônes des badges), toutes teintes
+        "saturé": (np.array([0, 81, 81], np.uint8), np.array([180, 255, 255], np.uint8)),
+    }
+    
+    def __init__(self, config_path: str = DEFAULT_CONFIG_PATH, debug_mode: bool = True,
+                 confidence_threshold: float = QUICK_THRESHOLD, perspective: Optional[bool] = None,
+                 workers: int = 1, ocr: bool = False):
+        # Profils de calibrage, rechargés automatiquement si le fichier change
+        self.calibration = CalibrationStore(config_path)
+        
+        # Redressement par homographie : None = suivre le 'grid_mode' du profil
+        self.perspective = perspective
+        self.perspective_grid = PerspectiveGrid(self.calibration)
+        
+        # Cascade : les étapes coûteuses ne tournent que sous ce seuil (> 1 pour les forcer)
+        self.confidence_threshold = confidence_threshold
+        
+        # Analyse des cases en parallèle (les appels cv2 libèrent le GIL)
+        self.workers = workers
+        # Un pool par taille demandée, jamais arrêté : un appel concurrent peut encore y soumettre
+        self._executors: Dict[int, ThreadPoolExecutor] = {}
+        self._executors_lock = threading.Lock()
+        
+        # État propre à chaque thread : tampons sur threading.local (libérés avec le thread),
+        # compteurs enregistrés avec leur thread pour les totaux
+        self._local = threading.local()
+        self._thread_states: List[Dict[str, Any]] = []
+        self._retired_counts = {"rapide": 0, "complète": 0}
+        self._states_lock = threading.Lock()
+        
+        # Mode OCR : numéros des 16 badges lus en un seul appel Tesseract par frame
+        self.badge_ocr = None
+        if ocr:
+            from badge_ocr import BadgeOCR
+            self.badge_ocr = BadgeOCR()
         
         # Debug mode pour sauvegarder les cellules individuelles
-        self.debug_mode = True
+        self.debug_mode = debug_mode
         if self.debug_mode:
             os.makedirs("debug_cells", exist_ok=True)
     
+    def _thread_state(self) -> Dict[str, Any]:
+        """Compteurs du thread courant, enregistrés à sa première utilisation"""
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            state = {"thread": threading.current_thread(), "stage_counts": {"rapide": 0, "complète": 0}}
+            with self._states_lock:
+                self._retire_dead_threads()
+                self._thread_states.append(state)
+            self._local.state = state
+        return state
+    
+    def _retire_dead_threads(self):
+        """Verse les compteurs des threads terminés dans le total retiré (verrou tenu)"""
+        alive = []
+        for state in self._thread_states:
+            if state["thread"].is_alive():
+                alive.append(state)
+            else:
+                for stage, count in state["stage_counts"].items():
+                    self._retired_counts[stage] += count
+        self._thread_states = alive
+    
+    def _scratch(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """Tampon uint8 réutilisable, propre au thread courant et indexé par forme"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        key = (name, shape)
+        buffer = buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=np.uint8)
+            buffers[key] = buffer
+        return buffer
+    
+    def _in_range(self, hsv: np.ndarray, family: str) -> np.ndarray:
+        """Masque d'une famille de couleurs, écrit dans un tampon du thread"""
+        lower, upper = self.HSV_BOUNDS[family]
+        return cv2.inRange(hsv, lower, upper, dst=self._scratch(family, hsv.shape[:2]))
+    
+    @property
+    def stage_counts(self) -> Dict[str, int]:
+        """Décisions prises par étape de la cascade, tous threads confondus"""
+        with self._states_lock:
+            self._retire_dead_threads()
+            totals = dict(self._retired_counts)
+            for state in self._thread_states:
+                for stage, count in state["stage_counts"].items():
+                    totals[stage] += count
+        return totals
+    
+    def reset_stage_counts(self):
+        """Remet à zéro les compteurs de la cascade"""
+        with self._states_lock:
+            self._retired_counts = {"rapide": 0, "complète": 0}
+            for state in self._thread_states:
+                state["stage_counts"] = {"rapide": 0, "complète": 0}
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Profil de calibrage par défaut"""
+        return self.calibration.get_default_profile()
+    
     def get_cell_coordinates(self, row: int, col: int, width: int, height: int) -> Tuple[int, int, int, int]:
         """Obtient les coordonnées d'une cellule avec la calibration"""
-        # Utilise les ratios calibrés
-        grid_x1 = int(width * 0.223438)
-        grid_x2 = int(width * 0.777604)
-        grid_y1 = int(height * 0.041667)
-        grid_y2 = int(height * 0.957407)
-        
-        total_width = grid_x2 - grid_x1
-        total_height = grid_y2 - grid_y1
-        
-        # Pas d'espacement (calibré à 0)
-        cell_width = total_width // 4
-        cell_height = total_height // 4
+        # Profil de la résolution (ou profil par défaut mis à l'échelle)
+        return self.calibration.get_cell_coordinates(row, col, width, height)
+    
+    def uses_perspective(self, width: int, height: int) -> bool:
+        """Indique si la grille est redressée par homographie pour cette résolution"""
+        if self.perspective is not None:
+            return self.perspective
+        return self.calibration.get_profile(width, height).get('grid_mode') == 'perspective'
+    
+    def extract_cells(self, image: np.ndarray) -> Dict[Tuple[int, int], np.ndarray]:
+        """Découpe les 16 cellules (vues sans copie) de l'image ou de la grille redressée"""
+        height, width = image.shape[:2]
         
-        # Position de la cellule
-        x1 = grid_x1 + col * cell_width
-        y1 = grid_y1 + row * cell_height
-        x2 = x1 + cell_width
-        y2 = y1 + cell_height
+        if self.uses_perspective(width, height):
+            # Une seule passe de remap, puis des découpes uniformes
+            source = self.perspective_grid.warp(image)
+            get_box = self.perspective_grid.get_canonical_cell
+        else:
+            source = image
+            get_box = self.get_cell_coordinates
         
-        return x1, y1, x2, y2
+        cells = {}
+        for row in range(4):
+            for col in range(4):
+                x1, y1, x2, y2 = get_box(row, col, width, height)
+                cells[(row, col)] = source[y1:y2, x1:x2]
+        return cells
     
     def detect_number_in_cell(self, cell_image: np.ndarray) -> Optional[str]:
         """Détecte un numéro dans une cellule - quart en haut à gauche"""
+        return self._detect_number_scored(cell_image)[0]
+    
+    def _detect_number_scored(self, cell_image: np.ndarray) -> Tuple[Optional[str], float]:
+        """Détection complète du numéro avec son score de confiance"""
         # Extraire le quart en haut à gauche
         height, width = cell_image.shape[:2]
         quarter_image = cell_image[0:height//2, 0:width//2]
         
         # Convertir en niveaux de gris
-        gray = cv2.cvtColor(quarter_image, cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(quarter_image, cv2.COLOR_BGR2GRAY, dst=self._scratch("gris", quarter_image.shape[:2]))
         
         # Rechercher des cercles (les numéros sont souvent dans des cercles)
         circles = cv2.HoughCircles(
@@ -75,31 +227,32 @@ class AdvancedDetector:
                 center_x, center_y, radius = circle
                 
                 # Extraire la région du cercle
-                mask = np.zeros(gray.shape, dtype=np.uint8)
+                mask = self._scratch("cercle", gray.shape)
+                mask.fill(0)
                 cv2.circle(mask, (center_x, center_y), radius-5, 255, -1)
                 
                 # Région masquée
-                circle_region = cv2.bitwise_and(gray, mask)
+                circle_region = cv2.bitwise_and(gray, mask, dst=self._scratch("région_cercle", gray.shape))
                 
                 # Analyse de couleur pour détecter le type
                 cell_bgr = quarter_image[max(0, center_y-radius):min(quarter_image.shape[0], center_y+radius),
                                        max(0, center_x-radius):min(quarter_image.shape[1], center_x+radius)]
                 
                 if cell_bgr.size > 0:
-                    # Analyse des couleurs dominantes
-                    avg_color = np.mean(cell_bgr.reshape(-1, 3), axis=0)
-                    blue, green, red = avg_color
+                    # Analyse des couleurs dominantes (cv2.mean : pas de copie de la vue)
+                    blue, green, red = cv2.mean(cell_bgr)[:3]
                     
                     # Détection basée sur les couleurs
                     if red > 150 and green < 100 and blue < 100:  # Rouge dominant
-                        return self._analyze_red_circle(circle_region, center_x, center_y, radius)
+                        return self._analyze_red_circle(circle_region, center_x, center_y, radius), self.CIRCLE_CONFIDENCE
                     elif blue > 150 and red < 100 and green < 100:  # Bleu dominant
-                        return self._analyze_blue_circle(circle_region, center_x, center_y, radius)
+                        return self._analyze_blue_circle(circle_region, center_x, center_y, radius), self.CIRCLE_CONFIDENCE
                     elif green > 100 and red > 100:  # Jaune/orange
-                        return self._analyze_yellow_circle(circle_region, center_x, center_y, radius)
+                        return self._analyze_yellow_circle(circle_region, center_x, center_y, radius), self.CIRCLE_CONFIDENCE
         
         # Si pas de cercle, chercher des numéros directement
-        return self._detect_text_number(gray)
+        number = self._detect_text_number(gray)
+        return number, self.TEXT_CONFIDENCE if number else 0.0
     
     def _analyze_red_circle(self, region: np.ndarray, cx: int, cy: int, radius: int) -> str:
         """Analyse un cercle rouge pour détecter le numéro"""
@@ -130,7 +283,8 @@ class AdvancedDetector:
     def _detect_text_number(self, gray: np.ndarray) -> Optional[str]:
         """Détecte du texte/numéro dans l'image en niveaux de gris"""
         # Binarisation pour améliorer la détection de texte
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU,
+                                  dst=self._scratch("binaire", gray.shape))
         
         # Recherche de contours de forme numérique
         contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -188,27 +342,28 @@ class AdvancedDetector:
     
     def detect_symbol_in_cell(self, cell_image: np.ndarray) -> Optional[str]:
         """Détecte un symbole dans une cellule - quart en haut à gauche"""
+        return self._detect_symbol_scored(cell_image)[0]
+    
+    def _detect_symbol_scored(self, cell_image: np.ndarray) -> Tuple[Optional[str], float]:
+        """Détection complète du symbole avec son score de confiance"""
         # Extraire le quart en haut à gauche
         height, width = cell_image.shape[:2]
         quarter_image = cell_image[0:height//2, 0:width//2]
         
         # Convertir en HSV pour une meilleure détection de couleurs
-        hsv = cv2.cvtColor(quarter_image, cv2.COLOR_BGR2HSV)
+        hsv = cv2.cvtColor(quarter_image, cv2.COLOR_BGR2HSV, dst=self._scratch("hsv", quarter_image.shape))
         
         # Masques de couleur pour différents symboles
         symbols_detected = []
         
+        # Les masques valent 0 ou 255 : somme des pixels = 255 × nombre de pixels allumés
         # 1. Dague rouge (rouge)
-        red_lower1 = np.array([0, 50, 50])
-        red_upper1 = np.array([10, 255, 255])
-        red_lower2 = np.array([170, 50, 50])
-        red_upper2 = np.array([180, 255, 255])
+        red_mask1 = self._in_range(hsv, "rouge_bas")
+        red_mask2 = self._in_range(hsv, "rouge_haut")
+        red_mask = cv2.bitwise_or(red_mask1, red_mask2, dst=self._scratch("rouge", hsv.shape[:2]))
+        red_sum = cv2.countNonZero(red_mask) * 255
         
-        red_mask1 = cv2.inRange(hsv, red_lower1, red_upper1)
-        red_mask2 = cv2.inRange(hsv, red_lower2, red_upper2)
-        red_mask = cv2.bitwise_or(red_mask1, red_mask2)
-        
-        if np.sum(red_mask) > 1000:  # Assez de pixels rouges
+        if red_sum > 1000:  # Assez de pixels rouges
             # Analyser la forme pour confirmer que c'est une dague
             contours, _ = cv2.findContours(red_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             for contour in contours:
@@ -220,11 +375,9 @@ class AdvancedDetector:
                         symbols_detected.append("🗡️ Dague rouge")
         
         # 2. Goutte bleue (bleu)
-        blue_lower = np.array([100, 50, 50])
-        blue_upper = np.array([130, 255, 255])
-        blue_mask = cv2.inRange(hsv, blue_lower, blue_upper)
+        blue_mask = self._in_range(hsv, "bleu")
         
-        if np.sum(blue_mask) > 800:  # Assez de pixels bleus
+        if cv2.countNonZero(blue_mask) * 255 > 800:  # Assez de pixels bleus
             contours, _ = cv2.findContours(blue_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             for contour in contours:
                 area = cv2.contourArea(contour)
@@ -237,20 +390,16 @@ class AdvancedDetector:
                         symbols_detected.append("💧 Goutte bleue")
         
         # 3. Fraise rouge et verte
-        green_lower = np.array([40, 50, 50])
-        green_upper = np.array([80, 255, 255])
-        green_mask = cv2.inRange(hsv, green_lower, green_upper)
+        green_mask = self._in_range(hsv, "vert")
         
         # Si on a du rouge ET du vert, c'est probablement une fraise
-        if np.sum(red_mask) > 500 and np.sum(green_mask) > 200:
+        if red_sum > 500 and cv2.countNonZero(green_mask) * 255 > 200:
             symbols_detected.append("🍓 Fraise rouge et verte")
         
         # 4. Pièces avec point d'interrogation (jaune/or)
-        yellow_lower = np.array([20, 50, 50])
-        yellow_upper = np.array([40, 255, 255])
-        yellow_mask = cv2.inRange(hsv, yellow_lower, yellow_upper)
+        yellow_mask = self._in_range(hsv, "jaune")
         
-        if np.sum(yellow_mask) > 1000:  # Assez de pixels jaunes
+        if cv2.countNonZero(yellow_mask) * 255 > 1000:  # Assez de pixels jaunes
             contours, _ = cv2.findContours(yellow_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             for contour in contours:
                 area = cv2.contourArea(contour)
@@ -263,16 +412,15 @@ class AdvancedDetector:
         
         # Retourner le premier symbole détecté ou une description générale
         if symbols_detected:
-            return symbols_detected[0]
+            return symbols_detected[0], self.SHAPE_CONFIDENCE
         
         # Détection générale basée sur les couleurs dominantes
-        return self._analyze_general_colors(quarter_image)
+        return self._analyze_general_colors(quarter_image), self.COLOR_CONFIDENCE
     
     def _analyze_general_colors(self, cell_image: np.ndarray) -> str:
         """Analyse générale des couleurs pour identifier le contenu"""
         # Calculer les couleurs moyennes
-        avg_color = np.mean(cell_image.reshape(-1, 3), axis=0)
-        blue, green, red = avg_color
+        blue, green, red = cv2.mean(cell_image)[:3]
         
         # Classification basée sur les couleurs dominantes
         if red > green and red > blue and red > 100:
@@ -289,8 +437,72 @@ class AdvancedDetector:
         else:
             return "⚫ Objet sombre"
     
-    def analyze_cell(self, cell_image: np.ndarray, row: int, col: int) -> Dict[str, str]:
-        """Analyse complète d'une cellule"""
+    def _quick_estimate(self, cell_image: np.ndarray) -> Dict[str, Any]:
+        """Étape rapide : étiquettes et confiances à partir de l'histogramme des teintes du quart"""
+        height, width = cell_image.shape[:2]
+        quarter_image = cell_image[0:height//2, 0:width//2]
+        
+        # Miniature 16x16 : quelques centaines de pixels au lieu de dizaines de milliers
+        size = (self.QUICK_SIZE, self.QUICK_SIZE)
+        small = cv2.resize(quarter_image, size, dst=self._scratch("miniature", size + (3,)),
+                           interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV, dst=self._scratch("miniature_hsv", size + (3,)))
+        
+        # Histogramme des teintes (18 intervalles de 10) des seuls pixels saturés et lumineux :
+        # le décor de la grotte reste sous ce masque, seules les icônes des badges comptent
+        mask = self._in_range(hsv, "saturé")
+        hist = cv2.calcHist([hsv], [0], mask, [18], [0, 180]).ravel() / float(size[0] * size[1])
+        families = {name: float(sum(hist[index] for index in bins))
+                    for name, bins in self.QUICK_FAMILIES.items()}
+        total = float(hist.sum())
+        
+        # Pas de badge : quasiment aucun pixel saturé (chaînes, cases vides)
+        if total < self.QUICK_EMPTY:
+            confidence = 1.0 - total / self.QUICK_EMPTY
+            return {"numéro": None, "confiance_numéro": confidence,
+                    "symbole": None, "confiance_symbole": confidence}
+        
+        # Part des pixels saturés expliquée par chaque signature, pénalisée si l'icône est trop petite
+        coverage = min(1.0, total / self.QUICK_COVERAGE)
+        scores = {name: sum(families[family] for family in signature["familles"]) / total
+                  for name, signature in self.QUICK_SIGNATURES.items()}
+        best = max(scores, key=scores.get)
+        signature = self.QUICK_SIGNATURES[best]
+        if best == "dague" and families["vert"] > 0.15 * total:
+            signature = self.QUICK_SIGNATURES["fraise"]
+        confidence = float(scores[best] * coverage * signature["plafond"])
+        
+        return {
+            "numéro": signature["numéro"],
+            "confiance_numéro": confidence,
+            "symbole": signature["symbole"],
+            "confiance_symbole": confidence,
+        }
+    
+    def calibrate_threshold(self, labels_path: str, margin: float = 0.02) -> float:
+        """Seuil minimal pour que l'étape rapide ne conclue jamais à tort sur une capture étiquetée"""
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+        image_path = os.path.join(os.path.dirname(os.path.abspath(labels_path)), labels['image'])
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Impossible de charger l'image étiquetée: {image_path}")
+        
+        cells = self.extract_cells(image)
+        worst = 0.0
+        for key, label in labels['cells'].items():
+            row, col = (int(value) for value in key.split(','))
+            quick = self._quick_estimate(cells[(row, col)])
+            # Confiance la plus haute d'une étiquette rapide fausse (numéro ou symbole)
+            if quick["numéro"] != label["numéro"]:
+                worst = max(worst, quick["confiance_numéro"])
+            if quick["symbole"] != label["symbole"]:
+                worst = max(worst, quick["confiance_symbole"])
+        # Au-dessus de 1 : l'étape rapide ne conclut plus jamais
+        return min(worst + margin, 1.01)
+    
+    def analyze_cell(self, cell_image: np.ndarray, row: int, col: int, quick_only: bool = False) -> Dict[str, Any]:
+        """Analyse complète d'une cellule (quick_only : étape rapide seule, ex. échéance dépassée)"""
         # Sauvegarder la cellule complète pour debug
         if self.debug_mode:
             cell_filename = f"debug_cells/cell_{row}_{col}.jpg"
@@ -302,18 +514,104 @@ class AdvancedDetector:
             quarter_filename = f"debug_cells/quarter_{row}_{col}.jpg"
             cv2.imwrite(quarter_filename, quarter_image)
         
-        # Détecter le numéro
-        number = self.detect_number_in_cell(cell_image)
+        # Étape rapide, puis étapes complètes seulement sous le seuil de confiance
+        quick = self._quick_estimate(cell_image)
+        stage_counts = self._thread_state()["stage_counts"]
+        
+        if self.badge_ocr is not None:
+            # Numéro lu plus tard pour toute la frame (read_badge_numbers)
+            number, number_confidence = None, 0.0
+        elif quick_only or quick["confiance_numéro"] >= self.confidence_threshold:
+            number, number_confidence = quick["numéro"], quick["confiance_numéro"]
+            stage_counts["rapide"] += 1
+        else:
+            number, number_confidence = self._detect_number_scored(cell_image)
+            stage_counts["complète"] += 1
         
-        # Détecter le symbole
-        symbol = self.detect_symbol_in_cell(cell_image)
+        if quick_only or quick["confiance_symbole"] >= self.confidence_threshold:
+            symbol, symbol_confidence = quick["symbole"], quick["confiance_symbole"]
+            stage_counts["rapide"] += 1
+        else:
+            symbol, symbol_confidence = self._detect_symbol_scored(cell_image)
+            stage_counts["complète"] += 1
         
         return {
             "numéro": number if number else "Aucun",
             "symbole": symbol if symbol else "Non identifié",
-            "position": f"({row},{col})"
+            "position": f"({row},{col})",
+            "confiance_numéro": round(number_confidence, 3),
+            "confiance_symbole": round(symbol_confidence, 3)
         }
     
+    def analyze_image(self, image: np.ndarray, workers: Optional[int] = None) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """Analyse les 16 cases d'une image déjà chargée, sans affichage"""
+        workers = workers or self.workers
+        cells = self.extract_cells(image)
+        
+        if workers <= 1:
+            results = {}
+            for (row, col), cell_image in cells.items():
+                results[(row, col)] = self.analyze_cell(cell_image, row, col)
+        else:
+            # Latence d'une frame : les 16 cases réparties sur le pool de threads
+            executor = self._get_executor(workers)
+            futures = {
+                position: executor.submit(self.analyze_cell, cell_image, position[0], position[1])
+                for position, cell_image in cells.items()
+            }
+            results = {position: future.result() for position, future in futures.items()}
+        
+        if self.badge_ocr is not None:
+            self.read_badge_numbers(cells, results)
+        return results
+    
+    def read_badge_numbers(self, cells: Dict[Tuple[int, int], np.ndarray],
+                           results: Dict[Tuple[int, int], Dict[str, Any]]):
+        """Mode OCR : remplace les numéros des résultats par la lecture groupée des badges"""
+        readings = self.badge_ocr.read_badges(cells)
+        for position, (number, confidence) in readings.items():
+            results[position]["numéro"] = number if number else "Aucun"
+            results[position]["confiance_numéro"] = round(confidence, 3)
+    
+    def _get_executor(self, workers: int) -> ThreadPoolExecutor:
+        """Pool de threads de cette taille, réutilisé d'une frame à l'autre"""
+        with self._executors_lock:
+            executor = self._executors.get(workers)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"cases-{workers}")
+                self._executors[workers] = executor
+            return executor
+    
+    def load_frame_dump(self, dump_path: str, frame_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """Ouvre un dump de frames BGR brutes en mémoire mappée, forme (N, H, W, 3)"""
+        if dump_path.endswith('.npy'):
+            frames = np.load(dump_path, mmap_mode='r')
+        else:
+            # Dump brut sans en-tête : la taille des frames doit être fournie
+            if frame_size is None:
+                raise ValueError(f"Taille des frames (largeur, hauteur) requise pour le dump brut: {dump_path}")
+            width, height = frame_size
+            frames = np.memmap(dump_path, dtype=np.uint8, mode='r')
+            if frames.size % (width * height * 3) != 0:
+                raise ValueError(f"Taille du dump incompatible avec des frames {width}x{height}: {dump_path}")
+            frames = frames.reshape(-1, height, width, 3)
+        
+        if frames.dtype != np.uint8 or frames.ndim != 4 or frames.shape[3] != 3:
+            raise ValueError(f"Dump attendu en uint8 de forme (N, H, W, 3), reçu {frames.dtype} {frames.shape}")
+        
+        return frames
+    
+    def iter_frame_detections(self, frames: np.ndarray) -> Iterator[Tuple[int, Dict[Tuple[int, int], Dict[str, Any]]]]:
+        """Analyse paresseusement chaque frame d'un tableau (N, H, W, 3) sans copie"""
+        # frames[index] est une vue : seules les pages lues sont chargées en mémoire
+        for index in range(frames.shape[0]):
+            yield index, self.analyze_image(frames[index])
+    
+    def detect_frame_dump(self, dump_path: str, frame_size: Optional[Tuple[int, int]] = None) -> Iterator[Tuple[int, Dict[Tuple[int, int], Dict[str, Any]]]]:
+        """Détecte les cases de toutes les frames d'un dump mappé en mémoire"""
+        frames = self.load_frame_dump(dump_path, frame_size)
+        return self.iter_frame_detections(frames)
+    
     def detect_all_cells(self, image_path: str):
         """Détecte tous les symboles et numéros dans toutes les cases"""
         print("=== DÉTECTION AVANCÉE - SYMBOLES ET NUMÉROS ===\n")
@@ -324,6 +622,15 @@ class AdvancedDetector:
             print(f"❌ Erreur: Impossible de charger {image_path}")
             return
         
+        # Analyser chaque cellule
+        results = self.analyze_image(image)
+        
+        self.report_detections(image, results, image_path)
+        
+        return results
+    
+    def report_detections(self, image: np.ndarray, results: Dict, image_path: str):
+        """Affiche le détail des détections et sauvegarde la visualisation"""
         height, width = image.shape[:2]
         print(f"📷 Image: {os.path.basename(image_path)} ({width}x{height})")
         
@@ -333,23 +640,15 @@ class AdvancedDetector:
         print(f"\n📊 ANALYSE DE CHAQUE CASE:")
         print("="*80)
         
-        results = {}
-        
-        # Analyser chaque cellule
         for row in range(4):
             for col in range(4):
                 x1, y1, x2, y2 = self.get_cell_coordinates(row, col, width, height)
-                
-                # Extraire la cellule
-                cell_image = image[y1:y2, x1:x2]
-                
-                # Analyser la cellule
-                analysis = self.analyze_cell(cell_image, row, col)
-                results[(row, col)] = analysis
+                analysis = results[(row, col)]
                 
                 print(f"\n📍 Case ({row},{col}) - Coordonnées: ({x1},{y1}) → ({x2},{y2})")
                 print(f"   🔢 Numéro détecté: {analysis['numéro']}")
                 print(f"   🎯 Symbole détecté: {analysis['symbole']}")
+                print(f"   📈 Confiance: numéro {analysis['confiance_numéro']:.2f} | symbole {analysis['confiance_symbole']:.2f}")
         
         # Résumé
         print(f"\n{'='*80}")
@@ -381,21 +680,26 @@ class AdvancedDetector:
         
         # Créer une visualisation
         self.create_detection_visualization(image, results, image_path)
-        
-        return results
     
     def create_detection_visualization(self, image: np.ndarray, results: Dict, image_path: str):
         """Crée une visualisation avec les détections"""
         vis_image = image.copy()
         height, width = image.shape[:2]
+        perspective = self.uses_perspective(width, height)
         
         for row in range(4):
             for col in range(4):
                 x1, y1, x2, y2 = self.get_cell_coordinates(row, col, width, height)
                 analysis = results[(row, col)]
                 
-                # Rectangle de la cellule
-                cv2.rectangle(vis_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                # Contour de la cellule (quadrilatère projeté en mode perspective)
+                if perspective:
+                    corners = self.perspective_grid.project_cell(row, col, width, height)
+                    cv2.polylines(vis_image, [np.array(corners, dtype=np.int32)], True, (0, 255, 0), 2)
+                    x1, y1 = corners[0]
+                    y2 = corners[3][1]
+                else:
+                    cv2.rectangle(vis_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
                 
                 # Position
                 cv2.putText(vis_image, f"({row},{col})", (x1+5, y1+20), 
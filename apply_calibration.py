@@ -2,39 +2,41 @@
 
 import cv2
 import numpy as np
-import json
 from typing import Tuple
 import os
 
+from calibration_store import CalibrationStore, DEFAULT_CONFIG_PATH
+
 class CalibrationApplier:
     """Applique une configuration de calibrage sauvegardée"""
     
-    def __init__(self):
+    def __init__(self, config_path: str = DEFAULT_CONFIG_PATH):
+        self.config_path = config_path
+        self.store = None
         self.config = None
         self.load_calibration()
     
     def load_calibration(self):
         """Charge la configuration de calibrage"""
-        config_file = '/home/fievetl/PycharmProjects/Sol-Cesto-IA/grid_calibration_config.json'
-        
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                self.config = json.load(f)
-            print("✓ Configuration de calibrage chargée")
+        if os.path.exists(self.config_path):
+            self.store = CalibrationStore(self.config_path)
+            self.config = self.store.get_default_profile()
+            print(f"✓ Configuration de calibrage chargée ({len(self.store.profiles)} profil(s))")
         else:
             print("❌ Aucune configuration trouvée. Lancez d'abord interactive_calibrator.py")
     
     def get_cell_coordinates(self, row: int, col: int, width: int, height: int) -> Tuple[int, int, int, int]:
         """Retourne les coordonnées calibrées d'une cellule"""
         
-        if not self.config:
+        if not self.store:
             raise ValueError("Aucune configuration de calibrage disponible")
         
-        # Utilise la configuration calibrée
-        grid_config = self.config['grid_config']
+        # Utilise le profil calibré pour cette résolution (ou le profil par défaut)
+        profile = self.store.get_profile(width, height)
+        grid_config = profile['grid_config']
         
         # Calcul des ratios par rapport à la taille originale
-        orig_width, orig_height = self.config['image_dimensions']
+        orig_width, orig_height = profile['image_dimensions']
         
         # Mise à l'échelle pour la nouvelle taille d'image
         scale_x = width / orig_width
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+OCR des badges - Lecture groupée des 16 badges de probabilité en un seul appel Tesseract
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import pytesseract
+
+from metrics import OCR_CACHE
+
+
+class BadgeOCR:
+    """Assemble les badges en une mosaïque, la lit une fois et remappe le texte par case"""
+
+    # Taille normalisée d'une vignette de badge et marge blanche entre vignettes
+    TILE_WIDTH = 48
+    TILE_HEIGHT = 48
+    MARGIN = 24
+
+    def __init__(self, psm: int = 11, whitelist: str = "0123456789?", cache_size: int = 4096):
+        # psm 11 : texte épars (badges vides tolérés) ; psm 7 : une seule ligne
+        self.config = f"--psm {psm} -c tessedit_char_whitelist={whitelist}"
+        self.cache_size = cache_size
+        # Empreinte de la vignette -> (texte, confiance), du plus ancien au plus récent
+        self._cache: "OrderedDict[bytes, Tuple[Optional[str], float]]" = OrderedDict()
+        # Détecteur partagé entre le service et le pool de cases : accès au cache sérialisés
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.ocr_calls = 0
+
+    def badge_tile(self, cell_image: np.ndarray) -> np.ndarray:
+        """Vignette binarisée du badge (quart en haut à gauche), texte noir sur fond blanc"""
+        height, width = cell_image.shape[:2]
+        quarter_image = cell_image[0:height//2, 0:width//2]
+
+        gray = cv2.cvtColor(quarter_image, cv2.COLOR_BGR2GRAY)
+        tile = cv2.resize(gray, (self.TILE_WIDTH, self.TILE_HEIGHT), interpolation=cv2.INTER_AREA)
+        _, tile = cv2.threshold(tile, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        # Tesseract attend un texte sombre : inverser si le fond est majoritairement noir
+        if cv2.countNonZero(tile) < tile.size // 2:
+            tile = cv2.bitwise_not(tile)
+        return tile
+
+    @staticmethod
+    def tile_hash(tile: np.ndarray) -> bytes:
+        """Empreinte d'une vignette : deux badges identiques ne sont lus qu'une fois"""
+        return hashlib.blake2b(tile.tobytes(), digest_size=16).digest()
+
+    def build_mosaic(self, tiles: List[np.ndarray]) -> np.ndarray:
+        """Aligne les vignettes sur une bande, à position connue : x = MARGIN + i × pas"""
+        stride = self.TILE_WIDTH + self.MARGIN
+        mosaic = np.full((self.TILE_HEIGHT + 2 * self.MARGIN, len(tiles) * stride + self.MARGIN), 255, dtype=np.uint8)
+        for index, tile in enumerate(tiles):
+            x = self.MARGIN + index * stride
+            mosaic[self.MARGIN:self.MARGIN + self.TILE_HEIGHT, x:x + self.TILE_WIDTH] = tile
+        return mosaic
+
+    def read_mosaic(self, mosaic: np.ndarray, count: int) -> List[Tuple[Optional[str], float]]:
+        """Un seul appel Tesseract ; chaque mot est rattaché à la vignette sous son centre"""
+        with self._lock:
+            self.ocr_calls += 1
+        data = pytesseract.image_to_data(mosaic, config=self.config, output_type=pytesseract.Output.DICT)
+
+        stride = self.TILE_WIDTH + self.MARGIN
+        readings: List[List[Tuple[str, float]]] = [[] for _ in range(count)]
+        for text, conf, left, width in zip(data['text'], data['conf'], data['left'], data['width']):
+            text = text.strip()
+            if not text or float(conf) < 0:
+                continue
+            center = left + width / 2 - self.MARGIN
+            index = int(center // stride)
+            # Centre tombé dans une marge ou hors bande : mot ignoré
+            if 0 <= index < count and center - index * stride <= self.TILE_WIDTH:
+                readings[index].append((text, float(conf) / 100))
+
+        results = []
+        for words in readings:
+            if not words:
+                results.append((None, 0.0))
+            else:
+                # Plusieurs fragments dans une vignette : concaténés de gauche à droite
+                text = "".join(word for word, _ in words)
+                results.append((text, min(conf for _, conf in words)))
+        return results
+
+    def read_badges(self, cells: Dict[Tuple[int, int], np.ndarray]) -> Dict[Tuple[int, int], Tuple[Optional[str], float]]:
+        """Texte et confiance du badge de chaque case, avec au plus un appel OCR"""
+        tiles = {position: self.badge_tile(cell_image) for position, cell_image in cells.items()}
+        keys = {position: self.tile_hash(tile) for position, tile in tiles.items()}
+
+        results = {}
+        pending: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        with self._lock:
+            for position, key in keys.items():
+                reading = self._cache.get(key)
+                if reading is not None:
+                    # Rafraîchi avant toute éviction : un succès de cette frame n'est jamais évincé
+                    self._cache.move_to_end(key)
+                    results[position] = reading
+                    self.hits += 1
+                elif key not in pending:
+                    self.misses += 1
+                    pending[key] = tiles[position]
+                else:
+                    self.hits += 1  # Badge identique déjà en attente dans cette frame
+
+        OCR_CACHE.inc(len(keys) - len(pending), ("hit",))
+        if pending:
+            OCR_CACHE.inc(len(pending), ("miss",))
+            # Tesseract hors du verrou : les autres threads continuent à lire le cache
+            readings = dict(zip(pending, self.read_mosaic(self.build_mosaic(list(pending.values())), len(pending))))
+            with self._lock:
+                for key, reading in readings.items():
+                    self._cache[key] = reading
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            for position, key in keys.items():
+                if position not in results:
+                    results[position] = readings[key]
+        return {position: results[position] for position in keys}
+
+    def get_cache_stats(self) -> Dict[str, float]:
+        """Succès du cache et nombre d'appels Tesseract"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            size = len(self._cache)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "ocr_calls": self.ocr_calls,
+            "size": size,
+        }
+
+
+def main():
+    """Lit les badges des captures passées en argument"""
+    from advanced_detector import AdvancedDetector
+
+    image_paths = sys.argv[1:] or [os.path.join('data', '20250604220023_1.jpg')]
+    detector = AdvancedDetector(debug_mode=False)
+    ocr = BadgeOCR()
+
+    for image_path in image_paths:
+        image = cv2.imread(image_path)
+        if image is None:
+            print(f"❌ Image non trouvée: {image_path}")
+            continue
+
+        readings = ocr.read_badges(detector.extract_cells(image))
+        print(f"\n📷 {os.path.basename(image_path)}")
+        for row in range(4):
+            texts = [readings[(row, col)][0] or "---" for col in range(4)]
+            print(f"   Rangée {row}: " + " ".join(f"[{text:>3}]" for text in texts))
+
+    stats = ocr.get_cache_stats()
+    print(f"\n🔤 {stats['ocr_calls']} appel(s) Tesseract | cache: {stats['hit_rate']:.0%} de succès")
+
+
+if __name__ == "__main__":
+    main()
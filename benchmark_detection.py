@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Benchmark de détection - Mesure du coût de l'analyse des cases
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from advanced_detector import AdvancedDetector
+from synthetic_board_generator import DEFAULT_LABELS_PATH, SyntheticBoardGenerator
+
+
+DEFAULT_IMAGES = [
+    os.path.join('data', '20250604220023_1.jpg'),
+    os.path.join('data', 'img.png'),
+]
+
+
+def load_images(image_paths: List[str]) -> List[np.ndarray]:
+    """Charge les images de test (décodage exclu des mesures)"""
+    images = []
+    for image_path in image_paths:
+        image = cv2.imread(image_path)
+        if image is None:
+            print(f"❌ Image non trouvée: {image_path}")
+            continue
+        images.append(image)
+    return images
+
+
+def benchmark_cascade(images: List[np.ndarray], repeat: int, threshold: float) -> Dict[str, float]:
+    """Mesure le coût moyen par case, avec ou sans sortie anticipée"""
+    detector = AdvancedDetector(debug_mode=False, confidence_threshold=threshold)
+
+    # Préchauffage hors mesure
+    detector.analyze_image(images[0])
+    detector.reset_stage_counts()
+
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for image in images:
+            detector.analyze_image(image)
+    elapsed = time.perf_counter() - start_time
+
+    cells = repeat * len(images) * 16
+    decisions = sum(detector.stage_counts.values())
+    return {
+        "ms_par_case": elapsed / cells * 1000,
+        "ms_par_frame": elapsed / (repeat * len(images)) * 1000,
+        "part_rapide": detector.stage_counts["rapide"] / decisions if decisions else 0.0,
+    }
+
+
+def benchmark_allocations(images: List[np.ndarray], repeat: int, threshold: float) -> Dict[str, float]:
+    """Mémoire allouée par frame en régime établi (tampons déjà créés)"""
+    detector = AdvancedDetector(debug_mode=False, confidence_threshold=threshold)
+    for image in images:
+        detector.analyze_image(image)  # Préchauffage : création des tampons par forme
+
+    frames = repeat * len(images)
+    peak_total = 0
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(repeat):
+        for image in images:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            detector.analyze_image(image)
+            _, peak = tracemalloc.get_traced_memory()
+            # Pic au-dessus du niveau d'entrée : mémoire temporaire de la frame
+            peak_total += peak - current
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    return {
+        "ko_temporaires_par_frame": peak_total / frames / 1024,
+        "blocs_retenus_par_frame": retained / frames,
+    }
+
+
+def benchmark_threads(images: List[np.ndarray], repeat: int, threshold: float,
+                      thread_counts: List[int]) -> Dict[int, Dict[str, float]]:
+    """Latence d'une frame selon le nombre de threads analysant les cases"""
+    detector = AdvancedDetector(debug_mode=False, confidence_threshold=threshold)
+    results = {}
+    for workers in thread_counts:
+        detector.analyze_image(images[0], workers=workers)  # Préchauffage (pool, tampons)
+
+        latencies = []
+        for _ in range(repeat):
+            for image in images:
+                start_time = time.perf_counter()
+                detector.analyze_image(image, workers=workers)
+                latencies.append((time.perf_counter() - start_time) * 1000)
+
+        latencies = np.array(latencies)
+        results[workers] = {
+            "moyenne_ms": float(latencies.mean()),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+        }
+    return results
+
+
+def benchmark_synthetic(count: int, width: int, height: int, threshold: float,
+                        noise_sigma: float) -> Dict[str, float]:
+    """Débit et précision du détecteur sur des grilles synthétiques étiquetées"""
+    generator = SyntheticBoardGenerator()
+    detector = AdvancedDetector(debug_mode=False, confidence_threshold=threshold)
+
+    correct = {"numéro": 0, "symbole": 0}
+    expected = {"numéro": 0, "symbole": 0}
+    elapsed = 0.0
+
+    for frame, labels in generator.iter_frames(count, width, height, noise_sigma=noise_sigma):
+        start_time = time.perf_counter()
+        results = detector.analyze_image(frame)
+        elapsed += time.perf_counter() - start_time
+
+        for (row, col), analysis in results.items():
+            label = labels[row][col]
+            for key in ("numéro", "symbole"):
+                # Cases sans étiquette (chaînes, héros) exclues de la précision
+                if label[key] is None:
+                    continue
+                expected[key] += 1
+                correct[key] += analysis[key] == label[key]
+
+    return {
+        "frames_par_s": count / elapsed if elapsed else 0.0,
+        "précision_numéro": correct["numéro"] / expected["numéro"] if expected["numéro"] else 0.0,
+        "précision_symbole": correct["symbole"] / expected["symbole"] if expected["symbole"] else 0.0,
+    }
+
+
+def benchmark_pipeline(images: List[np.ndarray], frames: int, budget_ms: float, fps: float) -> Dict[str, float]:
+    """Latences de bout en bout du pipeline de recommandation sous flux continu"""
+    # Import local : seule cette section dépend du paquet de jeu
+    from recommendation_pipeline import LatencyBudget, RecommendationPipeline
+    from row_evaluator import row_cache_info
+
+    pipeline = RecommendationPipeline(budget=LatencyBudget(total_ms=budget_ms))
+    pipeline.process_frame(images[0])  # Préchauffage hors mesure
+
+    latencies = []
+    degraded = 0
+    interval = 1.0 / fps if fps > 0 else 0.0
+    stream_start = time.perf_counter()
+    for index in range(frames):
+        # Frame disponible à son instant d'arrivée : l'attente due au retard compte dans la latence
+        now = time.perf_counter()
+        arrival = stream_start + index * interval if interval else now
+        if now < arrival:
+            time.sleep(arrival - now)
+        result = pipeline.process_frame(images[index % len(images)])
+        latencies.append((time.perf_counter() - arrival) * 1000)
+        degraded += result["cases_dégradées"]
+
+    latencies = np.array(latencies)
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+        "dans_budget": float(np.mean(latencies <= budget_ms)),
+        "cases_dégradées": degraded / (frames * 16),
+        "cache_rangées": row_cache_info()["hit_rate"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de détection Sol Cesto')
+    parser.add_argument('images', nargs='*', default=DEFAULT_IMAGES, help='Images à analyser')
+    parser.add_argument('--repeat', '-r', type=int, default=10, help='Nombre de passages par image')
+    parser.add_argument('--threshold', '-t', type=float, default=AdvancedDetector.QUICK_THRESHOLD,
+                        help='Seuil de confiance de la cascade')
+    parser.add_argument('--calibrate', action='store_true',
+                        help='Calcule le seuil sur data/sprite_labels.json au lieu de --threshold')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Nombre de grilles synthétiques pour mesurer débit et précision')
+    parser.add_argument('--width', type=int, default=1920, help='Largeur des grilles synthétiques')
+    parser.add_argument('--height', type=int, default=1080, help='Hauteur des grilles synthétiques')
+    parser.add_argument('--noise', type=float, default=0.0, help='Bruit des grilles synthétiques')
+    parser.add_argument('--threads', type=int, nargs='*', default=[1, 2, 4, 8],
+                        help='Nombres de threads comparés pour la latence d\'une frame')
+    parser.add_argument('--pipeline', type=int, default=0,
+                        help='Nombre de frames envoyées au pipeline de recommandation (latences p50/p99)')
+    parser.add_argument('--budget', type=float, default=100.0, help='Budget de latence du pipeline (ms)')
+    parser.add_argument('--fps', type=float, default=0.0,
+                        help='Cadence d\'arrivée des frames (0 = frames enchaînées sans pause)')
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    if not images:
+        print("❌ Aucune image à analyser")
+        return
+
+    if args.calibrate:
+        args.threshold = AdvancedDetector(debug_mode=False).calibrate_threshold(DEFAULT_LABELS_PATH)
+        print(f"🎯 Seuil calibré sur les étiquettes: {args.threshold:.3f}\n")
+
+    print("=== BENCHMARK DE DÉTECTION ===\n")
+    print(f"📷 {len(images)} image(s) × {args.repeat} passages\n")
+
+    print("⏱️ CASCADE DE CONFIANCE:")
+    # Un seuil au-dessus de 1 force l'étape complète sur toutes les cases
+    for label, threshold in [("Complète", 1.01), (f"Cascade (seuil {args.threshold})", args.threshold)]:
+        stats = benchmark_cascade(images, args.repeat, threshold)
+        print(f"   {label:<24} {stats['ms_par_case']:.3f} ms/case | "
+              f"{stats['ms_par_frame']:.2f} ms/frame | étape rapide: {stats['part_rapide']:.0%}")
+
+    print("\n🧠 ALLOCATIONS PAR FRAME (régime établi):")
+    for label, threshold in [("Complète", 1.01), (f"Cascade (seuil {args.threshold})", args.threshold)]:
+        stats = benchmark_allocations(images, args.repeat, threshold)
+        print(f"   {label:<24} pic temporaire {stats['ko_temporaires_par_frame']:.1f} Ko/frame | "
+              f"blocs retenus {stats['blocs_retenus_par_frame']:.2f}/frame")
+
+    if args.threads:
+        print(f"\n🧵 LATENCE PAR FRAME (cases en parallèle, seuil {args.threshold}):")
+        stats = benchmark_threads(images, args.repeat, args.threshold, args.threads)
+        baseline = stats[args.threads[0]]["moyenne_ms"]
+        for workers, latency in stats.items():
+            print(f"   {workers} thread(s){'':<5} moyenne {latency['moyenne_ms']:.2f} ms | "
+                  f"p50 {latency['p50_ms']:.2f} ms | p99 {latency['p99_ms']:.2f} ms | "
+                  f"×{baseline / latency['moyenne_ms']:.2f}")
+
+    if args.synthetic > 0:
+        print(f"\n🎨 GRILLES SYNTHÉTIQUES ({args.synthetic} × {args.width}x{args.height}):")
+        for label, threshold in [("Complète", 1.01), (f"Cascade (seuil {args.threshold})", args.threshold)]:
+            stats = benchmark_synthetic(args.synthetic, args.width, args.height, threshold, args.noise)
+            print(f"   {label:<24} {stats['frames_par_s']:.1f} frames/s | "
+                  f"numéros: {stats['précision_numéro']:.0%} | symboles: {stats['précision_symbole']:.0%}")
+
+    if args.pipeline > 0:
+        cadence = f"{args.fps:g} fps" if args.fps > 0 else "flux continu"
+        print(f"\n🤖 PIPELINE DE RECOMMANDATION ({args.pipeline} frames, {cadence}, budget {args.budget:g} ms):")
+        stats = benchmark_pipeline(images, args.pipeline, args.budget, args.fps)
+        print(f"   p50 {stats['p50_ms']:.1f} ms | p95 {stats['p95_ms']:.1f} ms | "
+              f"p99 {stats['p99_ms']:.1f} ms | max {stats['max_ms']:.1f} ms")
+        print(f"   Dans le budget: {stats['dans_budget']:.0%} | "
+              f"cases en étape rapide forcée: {stats['cases_dégradées']:.0%} | "
+              f"cache des rangées: {stats['cache_rangées']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark de simulation - Allocations mémoire par déplacement simulé
+"""
+
+import argparse
+import contextlib
+import os
+import time
+import tracemalloc
+from typing import Dict
+
+from main import BOARD_POSITIONS, ModularSolCestoGame
+from sol_cesto.core.models import Position
+
+
+def new_game() -> ModularSolCestoGame:
+    """Partie prête à explorer, sur la grille de référence (affichage supprimé)"""
+    game = ModularSolCestoGame()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        game.select_hero_interactive()
+        game.setup_game_grid()
+    return game
+
+
+def benchmark_moves(rows: int) -> Dict[str, float]:
+    """Allocations et pic mémoire par déplacement, sur `rows` explorations de rangée"""
+    moves = 0
+    allocated_blocks = 0
+    allocated_bytes = 0
+    peak_bytes = 0
+    elapsed = 0.0
+
+    tracemalloc.start()
+    for index in range(rows):
+        game = new_game()
+        moves_before = game.stats_tracker.get_summary()['total_moves']
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            start_time = time.perf_counter()
+
+            game.explore_row(index % 4)
+
+            elapsed += time.perf_counter() - start_time
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+
+        # Blocs encore vivants après l'exploration (positions, événements, historique...)
+        for stat in after.compare_to(before, 'filename'):
+            if stat.count_diff > 0:
+                allocated_blocks += stat.count_diff
+                allocated_bytes += stat.size_diff
+        peak_bytes = max(peak_bytes, peak)
+        moves += game.stats_tracker.get_summary()['total_moves'] - moves_before
+    tracemalloc.stop()
+
+    moves = max(moves, 1)
+    return {
+        "déplacements": moves,
+        "blocs_par_déplacement": allocated_blocks / moves,
+        "octets_par_déplacement": allocated_bytes / moves,
+        "pic_octets": peak_bytes,
+        "µs_par_déplacement": elapsed / moves * 1e6,
+    }
+
+
+def benchmark_positions(iterations: int) -> Dict[str, float]:
+    """Blocs alloués pour obtenir les 16 positions : construction vs positions internées"""
+    results = {}
+    for label, lookup in [("construites", lambda row, col: Position(row, col)),
+                          ("internées", lambda row, col: BOARD_POSITIONS[row][col])]:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        # Positions gardées en vie, comme les clés de grille et les événements
+        kept = [lookup(row, col) for _ in range(iterations) for row in range(4) for col in range(4)]
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+        results[label] = blocks / len(kept)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark mémoire de la simulation Sol Cesto')
+    parser.add_argument('--rows', '-n', type=int, default=200, help='Nombre de rangées explorées')
+    parser.add_argument('--positions', type=int, default=10000, help='Itérations du test des positions')
+    args = parser.parse_args()
+
+    print("=== BENCHMARK DE SIMULATION ===\n")
+
+    stats = benchmark_moves(args.rows)
+    print(f"🚶 {stats['déplacements']} déplacements simulés:")
+    print(f"   {stats['blocs_par_déplacement']:.1f} blocs | {stats['octets_par_déplacement']:.0f} octets "
+          f"retenus par déplacement | pic {stats['pic_octets'] / 1024:.1f} Ko | "
+          f"{stats['µs_par_déplacement']:.1f} µs/déplacement")
+
+    positions = benchmark_positions(args.positions)
+    print(f"\n📍 Blocs alloués par position obtenue:")
+    for label, blocks in positions.items():
+        print(f"   {label:<12} {blocks:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Générateur de plateaux - Lots de grilles 4x4 réalistes tirés en NumPy, par biome et par étage
+"""
+
+import argparse
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from probability_modifiers import CATEGORIES, EMPTY
+from sol_cesto.core.enums import ObjectType
+from sol_cesto.patterns.factory import GameObjectFactory
+
+
+OBJECT_TYPES = list(ObjectType)
+
+# 3 biomes et 25 étages en accès anticipé (data/game.md)
+BIOMES = (1, 2, 3)
+FLOORS = 25
+
+# Part de chaque catégorie (et des cases vides) au premier étage de chaque biome.
+# Valeurs de départ, à remplacer par fit_history sur les captures détectées.
+BIOME_DISTRIBUTIONS: Dict[int, Dict[str, float]] = {
+    1: {"monster": 0.35, "treasure": 0.20, "trap": 0.10, "healing": 0.15, "utility": 0.10, "empty": 0.10},
+    2: {"monster": 0.40, "treasure": 0.18, "trap": 0.14, "healing": 0.12, "utility": 0.08, "empty": 0.08},
+    3: {"monster": 0.45, "treasure": 0.16, "trap": 0.16, "healing": 0.10, "utility": 0.07, "empty": 0.06},
+}
+
+# Évolution relative par étage : plus de monstres et de pièges, moins de soins en montant
+FLOOR_DRIFT: Dict[str, float] = {"monster": 0.03, "trap": 0.02, "healing": -0.02}
+
+Streams = List[np.random.Generator]
+
+
+def object_categories() -> np.ndarray:
+    """Indice de catégorie (dans CATEGORIES) de chaque ObjectType"""
+    return np.array([CATEGORIES.index(GameObjectFactory.get_object_info(obj_type)['category'])
+                     for obj_type in OBJECT_TYPES], dtype=np.int64)
+
+
+def worker_streams(seed: int, workers: int) -> Streams:
+    """Générateurs indépendants et reproductibles, un par processus de travail"""
+    return [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(workers)]
+
+
+def encode_board(board: Dict[Tuple[int, int], Optional[ObjectType]]) -> np.ndarray:
+    """Plateau détecté (row, col) -> ObjectType en codes (4, 4), -1 pour une case vide ou non identifiée"""
+    codes = np.full((4, 4), EMPTY, dtype=np.int16)
+    for (row, col), obj_type in board.items():
+        if obj_type is not None:
+            codes[row, col] = OBJECT_TYPES.index(obj_type)
+    return codes
+
+
+class BoardGenerator:
+    """Tire des lots de plateaux (N, 4, 4) de codes d'ObjectType (-1 = case vide)"""
+
+    def __init__(self, rng: Union[None, int, np.random.Generator] = None,
+                 distributions: Optional[Dict[int, Dict[str, float]]] = None,
+                 object_weights: Optional[np.ndarray] = None,
+                 floor_drift: Optional[Dict[str, float]] = None):
+        self.rng = rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+        self.distributions = {biome: dict(shares) for biome, shares in (distributions or BIOME_DISTRIBUTIONS).items()}
+        self.floor_drift = dict(FLOOR_DRIFT if floor_drift is None else floor_drift)
+        self.categories = object_categories()
+        # Poids relatif de chaque objet au sein de sa catégorie (uniforme par défaut)
+        self.object_weights = (np.ones(len(OBJECT_TYPES)) if object_weights is None
+                               else np.asarray(object_weights, dtype=np.float64))
+        self._tables: Dict[int, np.ndarray] = {}
+
+    def _floor_table(self, biome: int) -> np.ndarray:
+        """Fonctions de répartition (FLOORS, objets + 1) ; dernière colonne = case vide"""
+        table = self._tables.get(biome)
+        if table is not None:
+            return table
+
+        shares = self.distributions[biome]
+        floors = np.arange(FLOORS)[:, None]
+        category_shares = np.array([shares.get(category, 0.0) for category in CATEGORIES])[None, :]
+        drift = np.array([self.floor_drift.get(category, 0.0) for category in CATEGORIES])[None, :]
+        category_shares = np.clip(category_shares * (1 + drift * floors), 0.0, None)
+
+        # Part de la catégorie répartie entre ses objets selon leurs poids
+        category_totals = np.bincount(self.categories, weights=self.object_weights, minlength=len(CATEGORIES))
+        within = self.object_weights / np.where(category_totals > 0, category_totals, 1)[self.categories]
+        probabilities = np.concatenate([category_shares[:, self.categories] * within[None, :],
+                                        np.full((FLOORS, 1), shares.get("empty", 0.0))], axis=1)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        table = np.cumsum(probabilities, axis=1)
+        table[:, -1] = 1.0
+        self._tables[biome] = table
+        return table
+
+    def probabilities(self, biome: int, floor: int = 0) -> Dict[str, float]:
+        """Probabilité de chaque objet (et de la case vide) sur une case"""
+        cdf = self._floor_table(biome)[floor]
+        values = np.diff(cdf, prepend=0.0)
+        names = [obj_type.name for obj_type in OBJECT_TYPES] + ["EMPTY"]
+        return dict(zip(names, values.tolist()))
+
+    def sample(self, count: int, biome: int = 1, floors: Union[int, Sequence[int], np.ndarray] = 0) -> np.ndarray:
+        """`count` plateaux ; `floors` : un étage commun ou un étage par plateau"""
+        floors = np.clip(np.broadcast_to(np.asarray(floors, dtype=np.int64), (count,)), 0, FLOORS - 1)
+        table = self._floor_table(biome)
+        width = table.shape[1]
+        # Répartitions de tous les étages mises bout à bout, décalées de l'étage : [f, f + 1]
+        shifted = (table + np.arange(FLOORS)[:, None]).ravel()
+
+        uniforms = self.rng.random((count, 16))  # Un seul tirage pour tout le lot
+        # Inversion de la fonction de répartition de l'étage de chaque plateau, en une recherche
+        positions = np.searchsorted(shifted, uniforms + floors[:, None], side='right')
+        codes = (positions - floors[:, None] * width).astype(np.int16)
+        codes[codes >= len(OBJECT_TYPES)] = EMPTY
+        return codes.reshape(count, 4, 4)
+
+    def sample_run(self, count: int, biome: int = 1, rounds: int = FLOORS) -> np.ndarray:
+        """`count` parcours de `rounds` étages consécutifs : (count, rounds, 4, 4)"""
+        floors = np.tile(np.arange(rounds), count)
+        return self.sample(count * rounds, biome, floors).reshape(count, rounds, 4, 4)
+
+    def fit_history(self, boards: Union[np.ndarray, Iterable[Dict[Tuple[int, int], Optional[ObjectType]]]],
+                    biome: int = 1, prior: float = 1.0):
+        """Ajuste les parts du biome et les poids des objets sur des plateaux détectés"""
+        if not isinstance(boards, np.ndarray):
+            boards = np.array([encode_board(board) for board in boards]).reshape(-1, 4, 4)
+        codes = boards.ravel()
+        counts = np.bincount(codes[codes != EMPTY], minlength=len(OBJECT_TYPES)).astype(np.float64)
+
+        # Lissage (prior) : un objet jamais vu garde une petite probabilité
+        self.object_weights = counts + prior
+        category_counts = np.bincount(self.categories, weights=counts, minlength=len(CATEGORIES)) + prior
+        empty_count = float((codes == EMPTY).sum()) + prior
+        total = category_counts.sum() + empty_count
+        shares = {category: count / total for category, count in zip(CATEGORIES, category_counts)}
+        shares["empty"] = empty_count / total
+        self.distributions[biome] = shares
+        self._tables.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Génération de plateaux Sol Cesto en lots')
+    parser.add_argument('--boards', '-n', type=int, default=1_000_000, help='Plateaux à générer')
+    parser.add_argument('--biome', type=int, default=1, choices=BIOMES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=4, help='Flux indépendants à démontrer')
+    args = parser.parse_args()
+
+    generator = BoardGenerator(args.seed)
+    start_time = time.perf_counter()
+    boards = generator.sample(args.boards, args.biome, generator.rng.integers(0, FLOORS, args.boards))
+    elapsed = time.perf_counter() - start_time
+    print(f"🎲 {args.boards:,} plateaux en {elapsed:.2f} s ({args.boards / elapsed:,.0f} plateaux/s)")
+
+    codes = boards.ravel()
+    print(f"   Cases vides: {(codes == EMPTY).mean():.1%}")
+    categories = generator.categories[codes[codes != EMPTY]]
+    for index, category in enumerate(CATEGORIES):
+        print(f"   {category:<9} {(categories == index).sum() / len(codes):.1%}")
+
+    # Flux par processus : mêmes plateaux à chaque exécution, indépendants entre eux
+    streams = worker_streams(args.seed, args.workers)
+    firsts = [BoardGenerator(stream).sample(1, args.biome)[0, 0].tolist() for stream in streams]
+    print(f"\n🧵 Première rangée de chaque flux: {firsts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Suivi de grille - Mise à jour incrémentale de l'état 4x4 entre les frames
+"""
+
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from advanced_detector import AdvancedDetector
+
+
+class BoardTracker:
+    """Garde la grille courante et ne ré-analyse que les cases modifiées"""
+
+    # Taille de la signature en niveaux de gris comparée d'une frame à l'autre
+    SIGNATURE_SIZE = 32
+
+    def __init__(self, detector: Optional[AdvancedDetector] = None, change_threshold: float = 6.0):
+        self.detector = detector or AdvancedDetector(debug_mode=False)
+        # Écart moyen de niveau de gris (0-255) au-delà duquel une case a changé
+        self.change_threshold = change_threshold
+
+        self.board: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self.observers: List[Callable[[Dict[str, Any]], None]] = []
+        self.frame_size: Optional[Tuple[int, int]] = None
+        self.frames_seen = 0
+        self.cells_reanalyzed = 0
+
+        # Signature de chaque case lors de sa dernière analyse
+        self._signatures: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def add_observer(self, callback: Callable[[Dict[str, Any]], None]):
+        """Ajoute un abonné aux événements de changement de case"""
+        self.observers.append(callback)
+
+    def reset(self):
+        """Oublie la grille courante (nouvel écran ou nouvelle résolution)"""
+        self.board = {}
+        self._signatures = {}
+        self.frame_size = None
+
+    def _cell_signature(self, cell_image: np.ndarray) -> np.ndarray:
+        """Miniature grise servant à détecter un changement de pixels"""
+        gray = cv2.cvtColor(cell_image, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, (self.SIGNATURE_SIZE, self.SIGNATURE_SIZE), interpolation=cv2.INTER_AREA)
+
+    def update(self, image: np.ndarray) -> List[Dict[str, Any]]:
+        """Intègre une nouvelle frame et retourne les événements de changement"""
+        height, width = image.shape[:2]
+        if self.frame_size != (width, height):
+            self.reset()
+            self.frame_size = (width, height)
+
+        self.frames_seen += 1
+        events = []
+
+        changed_cells: Dict[Tuple[int, int], np.ndarray] = {}
+        analyses: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        for position, cell_image in self.detector.extract_cells(image).items():
+            row, col = position
+
+            # Case inchangée : on garde l'analyse précédente
+            signature = self._cell_signature(cell_image)
+            previous_signature = self._signatures.get(position)
+            if previous_signature is not None:
+                difference = cv2.mean(cv2.absdiff(signature, previous_signature))[0]
+                if difference < self.change_threshold:
+                    continue
+
+            changed_cells[position] = cell_image
+            analyses[position] = self.detector.analyze_cell(cell_image, row, col)
+            self._signatures[position] = signature
+            self.cells_reanalyzed += 1
+
+        # Mode OCR : analyze_cell laisse le numéro vide, lu ici pour les seules cases modifiées
+        if analyses and self.detector.badge_ocr is not None:
+            self.detector.read_badge_numbers(changed_cells, analyses)
+
+        for position, analysis in analyses.items():
+            before = self.board.get(position)
+            self.board[position] = analysis
+
+            # Pixels modifiés mais même contenu détecté : pas d'événement
+            if before is not None and before['numéro'] == analysis['numéro'] \
+                    and before['symbole'] == analysis['symbole']:
+                continue
+
+            events.append({
+                "type": "case_apparue" if before is None else "case_modifiée",
+                "position": position,
+                "avant": before,
+                "après": analysis,
+                "frame": self.frames_seen
+            })
+
+        for event in events:
+            for callback in self.observers:
+                callback(event)
+
+        return events
+
+    def update_from_file(self, image_path: str) -> List[Dict[str, Any]]:
+        """Charge une capture d'écran et l'intègre au suivi"""
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Impossible de charger l'image: {image_path}")
+        return self.update(image)
+
+    def get_tracking_stats(self) -> Dict[str, Any]:
+        """Statistiques de suivi : cases ré-analysées par frame"""
+        return {
+            "frames": self.frames_seen,
+            "cells_reanalyzed": self.cells_reanalyzed,
+            "cells_per_frame": self.cells_reanalyzed / self.frames_seen if self.frames_seen else 0.0
+        }
+
+
+def main():
+    """Suit une séquence de captures passées en arguments"""
+    image_paths = sys.argv[1:] or [os.path.join('data', '20250604220023_1.jpg')]
+
+    tracker = BoardTracker()
+    tracker.add_observer(lambda event: print(
+        f"   🔄 {event['position']}: {event['avant']['symbole'] if event['avant'] else '∅'}"
+        f" → {event['après']['symbole']} (numéro {event['après']['numéro']})"
+    ))
+
+    for image_path in image_paths:
+        print(f"\n📷 Frame: {os.path.basename(image_path)}")
+        events = tracker.update_from_file(image_path)
+        if not events:
+            print("   ✅ Aucun changement")
+
+    stats = tracker.get_tracking_stats()
+    print(f"\n📊 {stats['frames']} frame(s), {stats['cells_reanalyzed']} case(s) ré-analysée(s) "
+          f"({stats['cells_per_frame']:.1f}/frame)")
+
+
+if __name__ == "__main__":
+    main()
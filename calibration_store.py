@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Magasin de calibrage - Profils de grille par résolution, rechargés à chaud
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+# Fichier de calibrage à côté des scripts, indépendamment du répertoire courant
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grid_calibration_config.json')
+
+
+class _Profiles(NamedTuple):
+    """Profils d'un chargement du fichier, remplacés d'un bloc à chaque rechargement"""
+    profiles: Dict[str, Dict[str, Any]]
+    default_profile_name: Optional[str]
+    by_size: Dict[Tuple[int, int], str]
+    cell_boxes: Dict[Tuple[int, int], List[List[Tuple[int, int, int, int]]]]
+
+
+class CalibrationStore:
+    """Profils de calibrage indexés par (largeur, hauteur) ou par nom d'affichage"""
+
+    def __init__(self, config_path: str = DEFAULT_CONFIG_PATH, check_interval: float = 0.5):
+        self.config_path = config_path
+        # Délai minimal entre deux vérifications de la date de modification
+        self.check_interval = check_interval
+
+        # Incrémenté à chaque rechargement pour invalider les caches dérivés
+        self.generation = 0
+
+        # Lu sans verrou par les threads de détection : une seule affectation par rechargement
+        self._state = _Profiles({}, None, {}, {})
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._last_check = 0.0
+
+        self.reload()
+
+    @property
+    def profiles(self) -> Dict[str, Dict[str, Any]]:
+        return self._state.profiles
+
+    @property
+    def default_profile_name(self) -> Optional[str]:
+        return self._state.default_profile_name
+
+    @staticmethod
+    def profile_name(width: int, height: int) -> str:
+        """Nom par défaut d'un profil de résolution"""
+        return f"{width}x{height}"
+
+    def reload(self):
+        """Relit le fichier de calibrage (ancien format à profil unique accepté)"""
+        with self._lock:
+            self._reload()
+
+    def _reload(self):
+        mtime = os.stat(self.config_path).st_mtime_ns
+        # Date notée avant la lecture : un fichier invalide n'est pas relu tant qu'il ne change pas
+        self._mtime = mtime
+        with open(self.config_path, 'r') as f:
+            data = json.load(f)
+
+        if 'profiles' in data:
+            profiles = data['profiles']
+            default_profile_name = data.get('default_profile') or next(iter(profiles), None)
+        else:
+            # Ancien format : la configuration entière est l'unique profil
+            width, height = data['image_dimensions']
+            default_profile_name = self.profile_name(width, height)
+            profiles = {default_profile_name: data}
+
+        if not profiles:
+            raise ValueError(f"Aucun profil de calibrage dans {self.config_path}")
+
+        by_size = {tuple(profile['image_dimensions']): name for name, profile in profiles.items()}
+        self._state = _Profiles(profiles, default_profile_name, by_size, {})
+        self.generation += 1
+
+    def check_for_changes(self) -> bool:
+        """Recharge le fichier si sa date de modification a changé"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+
+        try:
+            mtime = os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return False
+
+        if mtime == self._mtime:
+            return False
+
+        with self._lock:
+            if mtime == self._mtime:
+                return False  # Déjà rechargé par un autre thread
+            try:
+                self._reload()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # Fichier en cours d'écriture ou invalide : les derniers profils valides restent en place
+                print(f"⚠️ Calibrage non rechargé ({self.config_path}): {e}")
+                return False
+        return True
+
+    def has_profile(self, width: int, height: int) -> bool:
+        """Indique si un profil a été calibré pour cette résolution exacte"""
+        self.check_for_changes()
+        return (width, height) in self._state.by_size
+
+    def get_profile(self, width: int, height: int) -> Dict[str, Any]:
+        """Profil de la résolution, ou profil par défaut mis à l'échelle"""
+        self.check_for_changes()
+        state = self._state
+        name = state.by_size.get((width, height), state.default_profile_name)
+        return state.profiles[name]
+
+    def get_profile_by_name(self, name: str) -> Dict[str, Any]:
+        """Profil d'un affichage nommé (ex: \"steam-deck\")"""
+        self.check_for_changes()
+        profiles = self._state.profiles
+        if name not in profiles:
+            raise ValueError(f"Profil de calibrage inconnu: {name}")
+        return profiles[name]
+
+    def get_default_profile(self) -> Dict[str, Any]:
+        """Profil utilisé quand la résolution n'a pas été calibrée"""
+        self.check_for_changes()
+        state = self._state
+        return state.profiles[state.default_profile_name]
+
+    def get_grid_ratios(self, width: int, height: int) -> Dict[str, float]:
+        """Ratios de la zone de grille et des espacements pour une résolution"""
+        profile = self.get_profile(width, height)
+        grid_config = profile['grid_config']
+        orig_width, orig_height = profile['image_dimensions']
+
+        total_width = grid_config['grid_x2'] - grid_config['grid_x1']
+        total_height = grid_config['grid_y2'] - grid_config['grid_y1']
+
+        # Arrondis à 6 décimales comme le code généré par le calibrateur
+        return {
+            'grid_x1': round(grid_config['grid_x1'] / orig_width, 6),
+            'grid_x2': round(grid_config['grid_x2'] / orig_width, 6),
+            'grid_y1': round(grid_config['grid_y1'] / orig_height, 6),
+            'grid_y2': round(grid_config['grid_y2'] / orig_height, 6),
+            'h_spacing': round(grid_config['h_spacing'] / total_width, 6) if total_width > 0 else 0.0,
+            'v_spacing': round(grid_config['v_spacing'] / total_height, 6) if total_height > 0 else 0.0,
+        }
+
+    def get_cell_coordinates(self, row: int, col: int, width: int, height: int) -> Tuple[int, int, int, int]:
+        """Coordonnées calibrées d'une cellule (calculées une fois par résolution)"""
+        self.check_for_changes()
+        cell_boxes = self._state.cell_boxes
+        boxes = cell_boxes.get((width, height))
+        if boxes is None:
+            boxes = self._compute_cell_boxes(width, height)
+            cell_boxes[(width, height)] = boxes
+        return boxes[row][col]
+
+    def _compute_cell_boxes(self, width: int, height: int) -> List[List[Tuple[int, int, int, int]]]:
+        """Calcule les 16 rectangles de cellules pour une résolution"""
+        ratios = self.get_grid_ratios(width, height)
+
+        grid_x1 = int(width * ratios['grid_x1'])
+        grid_x2 = int(width * ratios['grid_x2'])
+        grid_y1 = int(height * ratios['grid_y1'])
+        grid_y2 = int(height * ratios['grid_y2'])
+
+        total_width = grid_x2 - grid_x1
+        total_height = grid_y2 - grid_y1
+
+        h_spacing = int(total_width * ratios['h_spacing'])
+        v_spacing = int(total_height * ratios['v_spacing'])
+
+        cell_width = (total_width - 3 * h_spacing) // 4
+        cell_height = (total_height - 3 * v_spacing) // 4
+
+        boxes = []
+        for row in range(4):
+            row_boxes = []
+            for col in range(4):
+                x1 = grid_x1 + col * (cell_width + h_spacing)
+                y1 = grid_y1 + row * (cell_height + v_spacing)
+                row_boxes.append((x1, y1, x1 + cell_width, y1 + cell_height))
+            boxes.append(row_boxes)
+        return boxes
+
+    def save_profile(self, config_data: Dict[str, Any], name: Optional[str] = None, make_default: bool = False):
+        """Ajoute ou remplace un profil et réécrit le fichier de façon atomique"""
+        width, height = config_data['image_dimensions']
+        name = name or self.profile_name(width, height)
+
+        profiles = dict(self.profiles, **{name: config_data})
+        default_profile_name = self.default_profile_name
+        if make_default or default_profile_name is None:
+            default_profile_name = name
+
+        data = {
+            'default_profile': default_profile_name,
+            'profiles': profiles
+        }
+
+        # Écriture dans un fichier temporaire puis remplacement atomique
+        temp_path = f"{self.config_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, self.config_path)
+
+        self.reload()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Service de détection - Démon local qui garde le détecteur chaud
+"""
+
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from advanced_detector import AdvancedDetector
+from calibration_store import DEFAULT_CONFIG_PATH
+
+
+def results_to_cells(results: Dict[Tuple[int, int], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convertit les résultats du détecteur (clés tuple) en liste sérialisable"""
+    cells = []
+    for (row, col), analysis in sorted(results.items()):
+        cell = {"row": row, "col": col}
+        cell.update(analysis)
+        cells.append(cell)
+    return cells
+
+
+class DetectionRequestHandler(BaseHTTPRequestHandler):
+    """Gère les requêtes HTTP du service de détection"""
+
+    def do_GET(self):
+        """Point de santé pour vérifier que le service est prêt"""
+        if self.path == '/health':
+            self._send_json(200, {"status": "ok", "workers": self.server.workers})
+        else:
+            self._send_json(404, {"erreur": f"Chemin inconnu: {self.path}"})
+
+    def do_POST(self):
+        """Détecte les 16 cases d'une image envoyée en octets ou par chemin"""
+        if self.path != '/detect':
+            self._send_json(404, {"erreur": f"Chemin inconnu: {self.path}"})
+            return
+
+        start_time = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            self._send_json(400, {"erreur": "En-tête Content-Length invalide"})
+            return
+        body = self.rfile.read(length) if length > 0 else b""
+        if not body:
+            self._send_json(400, {"erreur": "Corps de requête vide"})
+            return
+
+        # Corps JSON {"path": ...} ou octets bruts de l'image
+        try:
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                image_path = json.loads(body)['path']
+                if not isinstance(image_path, str):
+                    raise ValueError("path doit être une chaîne")
+                image = cv2.imread(image_path)
+            else:
+                image = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"erreur": "JSON attendu: {\"path\": \"...\"}"})
+            return
+        except cv2.error:
+            image = None
+
+        if image is None:
+            self._send_json(400, {"erreur": "Impossible de décoder l'image"})
+            return
+
+        results = self.server.detector.analyze_image(image)
+        height, width = image.shape[:2]
+
+        self._send_json(200, {
+            "image": {"width": width, "height": height},
+            "cells": results_to_cells(results),
+            "durée_ms": round((time.perf_counter() - start_time) * 1000, 2)
+        })
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        """Envoie une réponse JSON"""
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Pas de journal par requête, seulement les erreurs"""
+        pass
+
+
+class DetectionServer(HTTPServer):
+    """Serveur HTTP dont les requêtes sont traitées par un pool de workers"""
+
+    def __init__(self, address: Tuple[str, int], detector: AdvancedDetector, workers: int = 4):
+        super().__init__(address, DetectionRequestHandler)
+        self.detector = detector
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="detection")
+
+    def process_request(self, request, client_address):
+        """Confie la requête au pool (cv2 libère le GIL pendant l'analyse)"""
+        self.pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        """Traite une requête dans un worker du pool"""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """Ferme le socket et attend la fin des requêtes en cours"""
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def request_detection(image_path: str, host: str = '127.0.0.1', port: int = 8765) -> Dict[str, Any]:
+    """Client minimal : envoie une image au service et retourne le JSON"""
+    with open(image_path, 'rb') as f:
+        data = f.read()
+
+    request = urllib.request.Request(
+        f"http://{host}:{port}/detect",
+        data=data,
+        headers={'Content-Type': 'application/octet-stream'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Service de détection Sol Cesto (HTTP local)')
+    parser.add_argument('--host', default='127.0.0.1', help='Adresse d\'écoute (localhost par défaut)')
+    parser.add_argument('--port', type=int, default=8765, help='Port d\'écoute')
+    parser.add_argument('--workers', type=int, default=4, help='Nombre de workers du pool')
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help='Fichier de calibrage')
+    args = parser.parse_args()
+
+    # Détecteur chargé une seule fois, sans écriture des cellules de debug
+    detector = AdvancedDetector(config_path=args.config, debug_mode=False)
+
+    # Préchauffage : initialise les routines OpenCV avant la première requête
+    ref_width, ref_height = detector.config['image_dimensions']
+    detector.analyze_image(np.zeros((ref_height, ref_width, 3), dtype=np.uint8))
+
+    server = DetectionServer((args.host, args.port), detector, workers=args.workers)
+    print(f"🚀 Service de détection prêt sur http://{args.host}:{args.port}/detect ({args.workers} workers)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n⏹️ Arrêt du service")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Pipeline de frames - Décodage, détection et sortie en parallèle via des files bornées
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import cv2
+import numpy as np
+
+from advanced_detector import AdvancedDetector
+from metrics import FRAMES, STAGE_LATENCY
+
+
+# Marque de fin de flux transmise d'une étape à la suivante
+_END = object()
+
+
+class FramePipeline:
+    """Enchaîne décodage -> détection -> sortie, chaque étape dans son thread"""
+
+    STAGES = ("décodage", "détection", "sortie")
+
+    def __init__(self, detector: Optional[AdvancedDetector] = None, queue_size: int = 4,
+                 output: Optional[Callable[[int, str, np.ndarray, Dict], Any]] = None):
+        self.detector = detector or AdvancedDetector(debug_mode=False)
+        # Files bornées : une étape en avance se bloque (contre-pression)
+        self.queue_size = queue_size
+        # Étape de sortie : rapport complet et visualisation par défaut
+        self.output = output or self._report
+
+        self.busy = {stage: 0.0 for stage in self.STAGES}
+        self.blocked = {stage: 0.0 for stage in self.STAGES}
+        self._errors: List[BaseException] = []
+
+    def _report(self, index: int, image_path: str, image: np.ndarray, results: Dict):
+        self.detector.report_detections(image, results, image_path)
+
+    def _record(self, stage: str, elapsed: float):
+        self.busy[stage] += elapsed
+        STAGE_LATENCY.observe(elapsed, ("flux", stage))
+
+    def _put(self, stage: str, target: queue.Queue, item: Any):
+        """Dépose un élément ; le temps bloqué sur une file pleine mesure la contre-pression"""
+        start_time = time.perf_counter()
+        target.put(item)
+        self.blocked[stage] += time.perf_counter() - start_time
+
+    def _get(self, stage: str, source: queue.Queue) -> Any:
+        start_time = time.perf_counter()
+        item = source.get()
+        self.blocked[stage] += time.perf_counter() - start_time
+        return item
+
+    def _decode_stage(self, image_paths: Iterable[str], decoded: queue.Queue):
+        try:
+            for index, image_path in enumerate(image_paths):
+                if self._errors:
+                    break
+                start_time = time.perf_counter()
+                image = cv2.imread(image_path)  # Libère le GIL pendant le décodage
+                self._record("décodage", time.perf_counter() - start_time)
+                if image is None:
+                    print(f"❌ Erreur: Impossible de charger {image_path}")
+                    continue
+                self._put("décodage", decoded, (index, image_path, image))
+        except BaseException as error:
+            self._errors.append(error)
+        finally:
+            decoded.put(_END)
+
+    def _detect_stage(self, decoded: queue.Queue, detected: queue.Queue):
+        try:
+            while True:
+                item = self._get("détection", decoded)
+                if item is _END:
+                    break
+                if self._errors:
+                    continue  # Vide la file pour débloquer le décodage
+                index, image_path, image = item
+                start_time = time.perf_counter()
+                results = self.detector.analyze_image(image)
+                self._record("détection", time.perf_counter() - start_time)
+                self._put("détection", detected, (index, image_path, image, results))
+        except BaseException as error:
+            self._errors.append(error)
+            # Continue à consommer pour que le décodage ne reste pas bloqué sur une file pleine
+            while decoded.get() is not _END:
+                pass
+        finally:
+            detected.put(_END)
+
+    def _output_stage(self, detected: queue.Queue, collected: List[Dict]):
+        try:
+            while True:
+                item = self._get("sortie", detected)
+                if item is _END:
+                    break
+                if self._errors:
+                    continue
+                index, image_path, image, results = item
+                start_time = time.perf_counter()
+                self.output(index, image_path, image, results)
+                self._record("sortie", time.perf_counter() - start_time)
+                FRAMES.inc(labels=("flux",))
+                collected.append({"index": index, "image": image_path, "results": results})
+        except BaseException as error:
+            self._errors.append(error)
+            while detected.get() is not _END:
+                pass
+
+    def run(self, image_paths: Iterable[str]) -> List[Dict]:
+        """Traite toutes les images ; la frame N+1 se décode pendant l'analyse de la frame N"""
+        self.busy = {stage: 0.0 for stage in self.STAGES}
+        self.blocked = {stage: 0.0 for stage in self.STAGES}
+        self._errors = []
+
+        decoded: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        detected: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        collected: List[Dict] = []
+
+        threads = [
+            threading.Thread(target=self._decode_stage, args=(image_paths, decoded), name="décodage"),
+            threading.Thread(target=self._detect_stage, args=(decoded, detected), name="détection"),
+            threading.Thread(target=self._output_stage, args=(detected, collected), name="sortie"),
+        ]
+        start_time = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start_time
+
+        if self._errors:
+            raise self._errors[0]
+        return collected
+
+    def get_stats(self, frames: int) -> Dict[str, Any]:
+        """Débit obtenu comparé à celui de l'étape la plus lente"""
+        slowest = max(self.busy, key=self.busy.get)
+        return {
+            "frames": frames,
+            "frames_par_s": frames / self.elapsed if self.elapsed else 0.0,
+            "limite_frames_par_s": frames / self.busy[slowest] if self.busy[slowest] else 0.0,
+            "étape_limitante": slowest,
+            "occupation_s": dict(self.busy),
+            "attente_s": dict(self.blocked),
+        }
+
+
+def run_sequential(detector: AdvancedDetector, image_paths: Iterable[str],
+                   output: Callable[[int, str, np.ndarray, Dict], Any]) -> float:
+    """Référence : décodage, détection et sortie l'un après l'autre"""
+    start_time = time.perf_counter()
+    for index, image_path in enumerate(image_paths):
+        image = cv2.imread(image_path)
+        if image is None:
+            continue
+        output(index, image_path, image, detector.analyze_image(image))
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Détection en pipeline sur une série de captures')
+    parser.add_argument('images', nargs='*', default=[os.path.join('data', '20250604220023_1.jpg'),
+                                                      os.path.join('data', 'img.png')])
+    parser.add_argument('--queue-size', type=int, default=4, help='Taille des files entre étapes')
+    parser.add_argument('--repeat', '-r', type=int, default=1, help='Nombre de passages sur la liste')
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help='Sortie réduite à la visualisation, sans le rapport texte')
+    parser.add_argument('--compare', action='store_true', help='Compare avec le traitement séquentiel')
+    args = parser.parse_args()
+
+    image_paths = args.images * args.repeat
+    detector = AdvancedDetector(debug_mode=False)
+    pipeline = FramePipeline(detector, queue_size=args.queue_size)
+
+    if args.quiet:
+        def output(index, image_path, image, results):
+            detector.create_detection_visualization(image, results, image_path)
+        pipeline.output = output
+    else:
+        output = pipeline.output
+
+    collected = pipeline.run(image_paths)
+    stats = pipeline.get_stats(len(collected))
+
+    print(f"\n⚡ PIPELINE: {stats['frames']} frame(s) en {pipeline.elapsed:.2f} s "
+          f"({stats['frames_par_s']:.1f} frames/s, limite {stats['limite_frames_par_s']:.1f} "
+          f"imposée par l'étape {stats['étape_limitante']})")
+    for stage in FramePipeline.STAGES:
+        print(f"   {stage:<10} occupé {stats['occupation_s'][stage]:.2f} s | "
+              f"bloqué {stats['attente_s'][stage]:.2f} s")
+
+    if args.compare:
+        elapsed = run_sequential(detector, image_paths, output)
+        print(f"\n🐢 SÉQUENTIEL: {elapsed:.2f} s ({len(collected) / elapsed:.1f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,18 @@
 import cv2
 import numpy as np
 import json
+import os
 from typing import List, Tuple, Dict
 
+from calibration_store import CalibrationStore, DEFAULT_CONFIG_PATH
+from perspective_grid import order_corners
+
 class InteractiveGridCalibrator:
     """Calibrateur interactif pour ajuster la grille en cliquant sur l'image"""
     
-    def __init__(self, image_path: str):
+    def __init__(self, image_path: str, config_path: str = DEFAULT_CONFIG_PATH):
         self.image_path = image_path
+        self.config_path = config_path
         self.image = cv2.imread(image_path)
         if self.image is None:
             raise ValueError(f"Impossible de charger l'image: {image_path}")
@@ -24,6 +29,9 @@ class InteractiveGridCalibrator:
         # Mode de calibrage
         self.calibration_mode = "corners"  # "corners" ou "cells"
         
+        # Mode de grille : "axis" (rectangle aligné) ou "perspective" (homographie)
+        self.grid_mode = "axis"
+        
         # Configuration actuelle
         self.grid_config = {
             'grid_x1': 0, 'grid_y1': 0, 'grid_x2': 0, 'grid_y2': 0,
@@ -42,6 +50,7 @@ class InteractiveGridCalibrator:
         print("3. Appuyez sur 's' pour sauvegarder")
         print("4. Appuyez sur 'q' pour quitter")
         print("5. Appuyez sur 'c' pour mode cellule individuelle")
+        print("6. Appuyez sur 'p' pour basculer en grille perspective (homographie)")
     
     def mouse_callback(self, event, x, y, flags, param):
         """Callback pour les clics de souris"""
@@ -143,9 +152,14 @@ class InteractiveGridCalibrator:
             for col in range(4):
                 x1, y1, x2, y2 = self._get_cell_coords(row, col)
                 
-                # Rectangle de la cellule
+                # Contour de la cellule
                 color = (0, 255, 0) if (row + col) % 2 == 0 else (0, 255, 255)
-                cv2.rectangle(self.image, (x1, y1), (x2, y2), color, 2)
+                if self.grid_mode == "perspective":
+                    corners = self._get_perspective_cell(row, col)
+                    cv2.polylines(self.image, [corners], True, color, 2)
+                    x1, y1 = corners[0]
+                else:
+                    cv2.rectangle(self.image, (x1, y1), (x2, y2), color, 2)
                 
                 # Numéro de cellule
                 cv2.putText(self.image, f"({row},{col})", (x1+5, y1+20), 
@@ -166,19 +180,38 @@ class InteractiveGridCalibrator:
         y2 = y1 + self.grid_config['cell_height']
         return x1, y1, x2, y2
     
+    def _get_perspective_cell(self, row: int, col: int) -> np.ndarray:
+        """Projette une cellule de la grille canonique via l'homographie des 4 coins"""
+        cell_width = self.grid_config['cell_width']
+        cell_height = self.grid_config['cell_height']
+        canonical = np.array([
+            [0, 0], [4 * cell_width, 0], [4 * cell_width, 4 * cell_height], [0, 4 * cell_height]
+        ], dtype=np.float32)
+        homography = cv2.getPerspectiveTransform(canonical, order_corners(self.corner_points))
+        
+        x1, y1 = col * cell_width, row * cell_height
+        x2, y2 = x1 + cell_width, y1 + cell_height
+        corners = np.array([[[x1, y1]], [[x2, y1]], [[x2, y2]], [[x1, y2]]], dtype=np.float32)
+        return cv2.perspectiveTransform(corners, homography).reshape(4, 2).round().astype(np.int32)
+    
     def save_configuration(self):
         """Sauvegarde la configuration"""
         config_data = {
             'image_dimensions': (self.width, self.height),
             'corner_points': self.corner_points,
             'grid_config': self.grid_config,
+            'grid_mode': self.grid_mode,
             'calibration_code': self._generate_code()
         }
         
-        with open('/home/fievetl/PycharmProjects/Sol-Cesto-IA/grid_calibration_config.json', 'w') as f:
-            json.dump(config_data, f, indent=2)
+        # Un profil par résolution : les autres profils du fichier sont conservés
+        if os.path.exists(self.config_path):
+            CalibrationStore(self.config_path).save_profile(config_data)
+        else:
+            with open(self.config_path, 'w') as f:
+                json.dump(config_data, f, indent=2)
         
-        print(f"\n✓ Configuration sauvegardée dans grid_calibration_config.json")
+        print(f"\n✓ Profil {self.width}x{self.height} sauvegardé dans {os.path.basename(self.config_path)}")
         print(f"✓ Code généré et sauvegardé")
     
     def _generate_code(self) -> str:
@@ -231,7 +264,8 @@ def get_calibrated_cell_coordinates(row: int, col: int, width: int, height: int)
 # Cellules: {self.grid_config['cell_width']}x{self.grid_config['cell_height']}'''
         
         # Sauvegarder le code
-        with open('/home/fievetl/PycharmProjects/Sol-Cesto-IA/calibrated_coordinates.py', 'w') as f:
+        code_path = os.path.join(os.path.dirname(os.path.abspath(self.config_path)), 'calibrated_coordinates.py')
+        with open(code_path, 'w') as f:
             f.write(code)
         
         return code
@@ -266,6 +300,11 @@ def get_calibrated_cell_coordinates(row: int, col: int, width: int, height: int)
                     print("\n📍 Mode cellule - Cliquez sur des coins de cellules pour affiner")
                 else:
                     print("❌ Définissez d'abord les 4 coins de la grille !")
+            elif key == ord('p'):  # Basculer le mode perspective
+                self.grid_mode = "axis" if self.grid_mode == "perspective" else "perspective"
+                print(f"\n📐 Mode de grille: {self.grid_mode}")
+                if len(self.corner_points) == 4:
+                    self._draw_calculated_grid()
             elif key == ord('g'):  # Afficher grille
                 if len(self.corner_points) == 4:
                     self._draw_calculated_grid()
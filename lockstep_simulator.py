@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Simulation en lot - Des milliers de parties en tableaux parallèles, avancées d'un tour à la fois
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from board_generator import EMPTY, OBJECT_TYPES, BoardGenerator
+from probability_modifiers import CATEGORIES
+from sol_cesto.patterns.factory import GameObjectFactory
+
+
+MONSTER, TREASURE, TRAP, HEALING, UTILITY = (CATEGORIES.index(category) for category in
+                                             ("monster", "treasure", "trap", "healing", "utility"))
+
+
+def _row_sums(values: np.ndarray, dtype) -> np.ndarray:
+    """Somme sur le dernier axe (4 cases), déroulée : bien plus rapide qu'une réduction sur un axe court"""
+    return (values[..., 0].astype(dtype) + values[..., 1] + values[..., 2] + values[..., 3]).astype(dtype)
+
+
+class ObjectTable:
+    """Caractéristiques de chaque ObjectType en colonnes ; l'indice -1 (dernier) est la case vide"""
+
+    def __init__(self, magic_monsters: Iterable[str] = ()):
+        infos = [GameObjectFactory.get_object_info(obj_type) for obj_type in OBJECT_TYPES]
+        magic = set(magic_monsters)
+
+        def column(values, empty=0):
+            return np.array(list(values) + [empty], dtype=np.int32)
+
+        self.category = column((CATEGORIES.index(info['category']) for info in infos), empty=-1)
+        self.threat = column(info['threat_level'] for info in infos)
+        self.reward = column(info['reward_value'] for info in infos)
+        # Monstres comparés à la magie du héros (les autres à sa force)
+        self.magic = column(obj_type.name in magic for obj_type in OBJECT_TYPES).astype(bool)
+
+        # Effets précalculés par objet : une seule indexation par tour
+        monster = self.category == MONSTER
+        self.monster_threat = np.where(monster, self.threat, 0).astype(np.int32)
+        self.trap_damage = np.where(self.category == TRAP, self.threat, 0).astype(np.int32)
+        self.heal = np.where(self.category == HEALING, self.reward, 0).astype(np.int32)
+        self.gold = np.where(monster | (self.category == TREASURE), self.reward, 0).astype(np.int32)
+        self.monster = monster.astype(np.int32)
+        self.filled = (self.category >= 0).astype(np.int32)
+
+
+class LockstepSimulation:
+    """N parties en parallèle : PV, force, magie, or et plateaux en tableaux NumPy"""
+
+    # Colonnes d'état, une valeur par partie en cours
+    STATE = ("health", "max_health", "strength", "magic", "gold", "damage_taken", "turns", "floor", "remaining")
+    # Colonnes (n, 4) par rangée, tenues à jour à chaque case vidée : colonne d'ObjectTable sommée
+    ROW_STATE = {"row_counts": "filled", "row_reward": "reward", "row_threat": "threat", "row_monsters": "monster"}
+
+    def __init__(self, games: int, health: int = 10, strength: int = 3, magic: int = 3,
+                 biome: int = 1, floors: int = 3, seed: int = 0,
+                 magic_monsters: Iterable[str] = (), cell_weights: Optional[np.ndarray] = None):
+        self.games = games
+        self.biome = biome
+        self.max_floors = floors
+        self.objects = ObjectTable(magic_monsters)
+        self.generator = BoardGenerator(seed)
+        self.rng = self.generator.rng
+        # Poids d'atterrissage communs (4, 4), ex. CompiledModifiers.weight_matrix ; None = 25% par case
+        self.cell_weights = None if cell_weights is None else np.asarray(cell_weights, dtype=np.float32)
+
+        self.health = np.full(games, health, dtype=np.int32)
+        self.max_health = np.full(games, health, dtype=np.int32)
+        self.strength = np.full(games, strength, dtype=np.int32)
+        self.magic = np.full(games, magic, dtype=np.int32)
+        self.gold = np.zeros(games, dtype=np.int32)
+        self.damage_taken = np.zeros(games, dtype=np.int32)
+        self.turns = np.zeros(games, dtype=np.int32)
+        self.floor = np.zeros(games, dtype=np.int32)
+        self.boards = self.generator.sample(games, biome, 0)
+        for name, column in self._row_features(self.boards).items():
+            setattr(self, name, column)
+        self.remaining = _row_sums(self.row_counts, np.int32)
+
+        # Parties terminées retirées des tableaux : leur état final est rangé ici, par numéro d'origine
+        self.ids = np.arange(games)
+        self.final = {name: np.zeros(games, dtype=np.int32) for name in self.STATE}
+        self.steps = 0
+
+    def __len__(self) -> int:
+        """Parties encore en cours"""
+        return len(self.ids)
+
+    def _row_features(self, boards: np.ndarray) -> Dict[str, np.ndarray]:
+        return {name: _row_sums(getattr(self.objects, column)[boards], np.int32)
+                for name, column in self.ROW_STATE.items()}
+
+    def _store(self, mask: np.ndarray):
+        finished = np.flatnonzero(mask)
+        ids = self.ids[finished]
+        for name in self.STATE:
+            self.final[name][ids] = getattr(self, name)[finished]
+
+    def _compact(self, keep: np.ndarray):
+        """Range les parties terminées et ne garde que les autres dans les tableaux d'état"""
+        self._store(~keep)
+        for name in self.STATE + tuple(self.ROW_STATE) + ("boards", "ids"):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def step(self, policy: Callable[['LockstepSimulation'], np.ndarray]) -> int:
+        """Un tour pour toutes les parties en cours ; retourne leur nombre"""
+        count = len(self.ids)
+        if not count:
+            return 0
+        self.steps += 1
+        games = np.arange(count)
+
+        rows = np.asarray(policy(self), dtype=np.int64)
+
+        # Rangée choisie déjà vidée : repli sur la rangée la plus pleine
+        empty_rows = self.row_counts[games, rows] == 0
+        if empty_rows.any():
+            rows[empty_rows] = self.row_counts[empty_rows].argmax(axis=1)
+        # Indices à plat (rangée puis case) : moins coûteux que l'indexation à deux tableaux
+        row_index = games * 4 + rows
+        cells = self.boards.reshape(-1, 4)[row_index]                         # (n, 4)
+        row_filled = cells != EMPTY
+
+        # Case d'atterrissage tirée selon les poids de la rangée (cumul déroulé sur les 4 cases)
+        weights = (row_filled.astype(np.float32) if self.cell_weights is None
+                   else row_filled * self.cell_weights[rows])
+        first = weights[:, 0]
+        second = first + weights[:, 1]
+        third = second + weights[:, 2]
+        total = third + weights[:, 3]
+        draws = self.rng.random(count, dtype=np.float32) * total
+        cols = (draws >= first).astype(np.int64) + (draws >= second) + (draws >= third)
+        codes = cells.reshape(-1)[games * 4 + cols]
+
+        # Combat : dégâts = max(0, monstre - stat du héros) ; pièges : dégâts directs
+        objects = self.objects
+        defense = np.where(objects.magic[codes], self.magic, self.strength)
+        damage = np.maximum(0, objects.monster_threat[codes] - defense) + objects.trap_damage[codes]
+        # Soins bornés par les PV max (un objet ne soigne et ne blesse jamais à la fois)
+        np.minimum(self.health - damage + objects.heal[codes], self.max_health, out=self.health)
+        self.damage_taken += damage
+        self.gold += objects.gold[codes]
+        self.turns += 1
+        self.boards.reshape(-1)[row_index * 4 + cols] = EMPTY
+        for name, column in self.ROW_STATE.items():
+            getattr(self, name).reshape(-1)[row_index] -= getattr(objects, column)[codes]
+        self.remaining -= objects.filled[codes]
+
+        # Plateau vidé : étage suivant
+        cleared = (self.remaining <= 0) & (self.health > 0)
+        if cleared.any():
+            self.floor[cleared] += 1
+            continuing = np.flatnonzero(cleared & (self.floor < self.max_floors))
+            if len(continuing):
+                boards = self.generator.sample(len(continuing), self.biome, self.floor[continuing])
+                self.boards[continuing] = boards
+                for name, column in self._row_features(boards).items():
+                    getattr(self, name)[continuing] = column
+                self.remaining[continuing] = _row_sums(self.row_counts[continuing], np.int32)
+
+        active = (self.health > 0) & (self.floor < self.max_floors)
+        if not active.all():
+            self._compact(active)
+        return count
+
+    def run(self, policy: Callable[['LockstepSimulation'], np.ndarray],
+            max_steps: int = 1000) -> Dict[str, np.ndarray]:
+        """Avance toutes les parties jusqu'à leur fin (mort ou dernier étage)"""
+        for _ in range(max_steps):
+            if not self.step(policy):
+                break
+        return self.results()
+
+    def results(self) -> Dict[str, np.ndarray]:
+        """Résultat de chaque partie ; score comme evaluate_performance, sans objets ni niveaux"""
+        # Parties encore en cours (max_steps atteint) : état courant
+        self._store(np.ones(len(self.ids), dtype=bool))
+        health = np.maximum(self.final["health"], 0)
+        return {
+            "alive": self.final["health"] > 0,
+            "health": health,
+            "gold": self.final["gold"],
+            "floor": self.final["floor"],
+            "turns": self.final["turns"],
+            "damage_taken": self.final["damage_taken"],
+            "score": self.final["gold"] + health - self.final["damage_taken"],
+        }
+
+
+# --- Politiques vectorisées : simulation -> rangée de chaque partie en cours ---
+
+def _non_empty(sim: LockstepSimulation, values: np.ndarray) -> np.ndarray:
+    """Valeurs par rangée, -inf pour les rangées déjà vidées"""
+    return np.where(sim.row_counts > 0, values, -np.inf)
+
+
+def random_policy(sim: LockstepSimulation) -> np.ndarray:
+    return sim.rng.integers(0, 4, size=len(sim))
+
+
+def heuristic_policy(sim: LockstepSimulation) -> np.ndarray:
+    """Récompense moins menace de la rangée"""
+    return _non_empty(sim, sim.row_reward - sim.row_threat).argmax(axis=1)
+
+
+def fewest_monsters_policy(sim: LockstepSimulation) -> np.ndarray:
+    """Moins de monstres, puis moins de menace"""
+    return _non_empty(sim, -(sim.row_monsters * 1000 + sim.row_threat)).argmax(axis=1)
+
+
+def expected_damage_policy(sim: LockstepSimulation) -> np.ndarray:
+    """Espérance (atterrissage uniforme sur les cases pleines) de or + soins - dégâts réels"""
+    boards = sim.boards
+    objects = sim.objects
+    defense = np.where(objects.magic[boards], sim.magic[:, None, None], sim.strength[:, None, None])
+    damage = np.maximum(0, objects.monster_threat[boards] - defense) + objects.trap_damage[boards]
+    # Les dégâts mortels pèsent plus lourd : la partie s'arrête
+    lethal = damage >= sim.health[:, None, None]
+    values = _row_sums(objects.gold[boards] + objects.heal[boards] - damage - lethal * 100, np.float32)
+
+    return _non_empty(sim, values / np.maximum(sim.row_counts, 1)).argmax(axis=1)
+
+
+POLICIES: Dict[str, Callable[[LockstepSimulation], np.ndarray]] = {
+    "aléatoire": random_policy,
+    "heuristique": heuristic_policy,
+    "moins_de_monstres": fewest_monsters_policy,
+    "dégâts_attendus": expected_damage_policy,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulation en lot de parties Sol Cesto')
+    parser.add_argument('--games', '-n', type=int, default=1_000_000, help='Parties simulées en parallèle')
+    parser.add_argument('--floors', type=int, default=3, help='Étages par partie')
+    parser.add_argument('--biome', type=int, default=1)
+    parser.add_argument('--health', type=int, default=10, help='PV de départ')
+    parser.add_argument('--policies', nargs='+', default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for name in args.policies:
+        # Même graine pour chaque politique : mêmes plateaux de départ
+        simulation = LockstepSimulation(args.games, health=args.health, biome=args.biome,
+                                        floors=args.floors, seed=args.seed)
+        start_time = time.perf_counter()
+        results = simulation.run(POLICIES[name])
+        elapsed = time.perf_counter() - start_time
+
+        print(f"⚡ {name:<18} {args.games:,} parties en {elapsed:.2f} s "
+              f"({args.games / elapsed:,.0f} parties/s, {simulation.steps} tours) | "
+              f"survie {results['alive'].mean():.1%} | or {results['gold'].mean():.1f} | "
+              f"score {results['score'].mean():.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,15 +16,22 @@ from sol_cesto.heroes import HeroSelector, HeroFactory, EnhancedGameStats
 from sol_cesto.patterns.factory import GameObjectFactory
 from sol_cesto.patterns.observer import EventPublisher, GameLogger, StatsTracker
 from sol_cesto.patterns.command import CommandHistory, MoveCommand, InteractCommand
+from row_evaluator import recommend_row
+from metrics import GAMES, INTERACTIONS, MOVES
 
 import json
-from typing import Dict, Any
+import random
+from typing import Dict, Any, Optional
+
+
+# Les 16 positions de la grille, créées une seule fois : BOARD_POSITIONS[row][col]
+BOARD_POSITIONS = tuple(tuple(Position(row, col) for col in range(4)) for row in range(4))
 
 
 class ModularSolCestoGame:
     """Jeu Sol Cesto avec architecture modulaire"""
     
-    def __init__(self):
+    def __init__(self, replay_writer=None, seed: Optional[int] = None):
         # Composants modulaires
         self.hero_selector = HeroSelector()
         self.event_publisher = EventPublisher()
@@ -40,24 +47,41 @@ class ModularSolCestoGame:
         # État du jeu
         self.selected_hero = None
         self.hero_stats = None
+        # Statut détaillé mis en cache, recalculé seulement après un changement des stats
+        self._status_cache = None
+        self._status_dirty = True
         self.game_grid = {}  # Position -> (ObjectType, ObjectBehavior)
+        self.grid_weights = {}  # (row, col) -> poids du badge détecté
+        self.selected_class = None
+        self.rows_explored = []  # Rangées choisies, dans l'ordre
         self.hero_position = Position(0, 0)
         self.game_active = False
+        
+        # Enregistrement binaire optionnel de la partie (replay_format.ReplayWriter)
+        self.replay_writer = replay_writer
+        # Graine de la partie, notée dans le replay ; appliquée au module random par l'appelant
+        # (main, resimulate, tournoi) pour ne pas réinitialiser les autres tirages du processus
+        self.seed = seed
+        # Faux pour les copies simulées (ex. rollouts du tournoi) : hors des compteurs exportés
+        self.record_metrics = True
     
     def setup_observers(self):
         """Configure les observers du jeu"""
         self.event_publisher.add_observer(self.game_logger)
         self.event_publisher.add_observer(self.stats_tracker)
     
-    def start_game(self):
+    def start_game(self, screenshot_path: Optional[str] = None):
         """Démarre une nouvelle partie"""
         print("=== SOL CESTO IA - VERSION MODULAIRE ===\n")
         
         # 1. Sélection du héros
         self.select_hero_interactive()
         
-        # 2. Configuration de la grille
-        self.setup_game_grid()
+        # 2. Configuration de la grille (détectée sur la capture si fournie)
+        if screenshot_path:
+            self.setup_game_grid(self.detect_grid(screenshot_path))
+        else:
+            self.setup_game_grid()
         
         # 3. Simulation de jeu
         self.simulate_gameplay()
@@ -92,6 +116,7 @@ class ModularSolCestoGame:
         
         # Sélection automatique pour la démo (Paladin équilibré)
         selected_class = HeroClass.PALADIN
+        self.selected_class = selected_class
         custom_name = "Héros Modulaire"
         
         print(f"\n🎯 Sélection automatique: {selected_class.value} - {custom_name}")
@@ -100,6 +125,11 @@ class ModularSolCestoGame:
         self.selected_hero = self.hero_selector.select_hero(selected_class, custom_name)
         hero_template = HeroFactory.get_hero_templates()[selected_class]
         self.hero_stats = EnhancedGameStats(self.selected_hero, hero_template)
+        self.invalidate_status()
+        if self.record_metrics:
+            GAMES.inc(labels=("started",))
+        if self.replay_writer:
+            self.replay_writer.begin_game(self.seed, selected_class, self.hero_stats.current_health)
         
         # Affichage du résumé
         summary = self.hero_selector.get_hero_summary()
@@ -113,42 +143,48 @@ class ModularSolCestoGame:
         # Amélioration optionnelle
         print(f"\n🔧 Application d'améliorations...")
         if self.hero_selector.enhance_selected_hero("super_regen"):
+            self.invalidate_status()
             enhanced_summary = self.hero_selector.get_hero_summary()
             print(f"   ✨ Amélioré: {enhanced_summary['description']}")
             print(f"   🆕 Nouvelles capacités: {', '.join(enhanced_summary['special_abilities'])}")
         
         print()
     
-    def setup_game_grid(self):
+    def detect_grid(self, screenshot_path: str) -> Dict:
+        """Détecte la grille d'une capture d'écran via le pipeline de recommandation"""
+        # Import local : OpenCV et le détecteur ne sont chargés que si une capture est fournie
+        from recommendation_pipeline import RecommendationPipeline
+        
+        print(f"📷 DÉTECTION DE LA GRILLE: {os.path.basename(screenshot_path)}\n")
+        result = RecommendationPipeline().process_frame(screenshot_path)
+        self.grid_weights = {position: weight for position, weight in result["poids"].items() if weight is not None}
+        print(f"   ⏱️ Détection en {result['total_ms']:.1f} ms\n")
+        return result["plateau"]
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Statut détaillé du héros (instantané partagé, à ne pas modifier)"""
+        if self._status_dirty or self._status_cache is None:
+            self._status_cache = self.hero_stats.get_detailed_status()
+            self._status_dirty = False
+        return self._status_cache
+    
+    def invalidate_status(self):
+        """Marque le statut comme périmé après un changement des stats du héros"""
+        self._status_dirty = True
+    
+    def setup_game_grid(self, detected_board: Optional[Dict] = None):
         """Configure la grille de jeu avec les objets"""
         print("🗺️ CONFIGURATION DE LA GRILLE\n")
         
-        # Configuration basée sur l'image de référence
-        grid_objects = [
-            # Rangée 0 - Risque élevé
-            (Position(0, 0), ObjectType.SLIME_GREEN),
-            (Position(0, 1), ObjectType.KEY_BLUE),
-            (Position(0, 2), ObjectType.SLIME_GREEN),
-            (Position(0, 3), ObjectType.DAGGER_RED),
-            
-            # Rangée 1 - Risque moyen
-            (Position(1, 0), ObjectType.SLIME_GREEN),
-            (Position(1, 1), ObjectType.CHAINS),
-            (Position(1, 2), ObjectType.DAGGER_RED),
-            (Position(1, 3), ObjectType.TREASURE_CHEST),
-            
-            # Rangée 2 - Recommandée par l'IA (meilleur ratio risque/récompense)
-            (Position(2, 0), ObjectType.TREASURE_CHEST),
-            (Position(2, 1), ObjectType.HEALTH_POTION),
-            (Position(2, 2), ObjectType.DAGGER_RED),
-            (Position(2, 3), ObjectType.TREASURE_CHEST),
-            
-            # Rangée 3 - Risque moyen
-            (Position(3, 0), ObjectType.SLIME_GREEN),
-            (Position(3, 1), ObjectType.CHAINS),
-            (Position(3, 2), ObjectType.HEART_RED),
-            (Position(3, 3), ObjectType.SLIME_GREEN),
-        ]
+        if detected_board is not None:
+            # Cases détectées : (row, col) -> ObjectType (None = non identifiée)
+            grid_objects = [(BOARD_POSITIONS[row][col], obj_type)
+                            for (row, col), obj_type in sorted(detected_board.items()) if obj_type is not None]
+        else:
+            grid_objects = self.get_reference_grid()
+        if self.replay_writer:
+            self.replay_writer.record_board({(position.row, position.col): obj_type
+                                             for position, obj_type in grid_objects})
         
         # Création des objets avec la Factory
         for position, obj_type in grid_objects:
@@ -158,6 +194,34 @@ class ModularSolCestoGame:
         print(f"✅ Grille configurée avec {len(self.game_grid)} objets")
         self.display_grid_info()
     
+    def get_reference_grid(self):
+        """Grille de démonstration basée sur l'image de référence"""
+        return [
+            # Rangée 0 - Risque élevé
+            (BOARD_POSITIONS[0][0], ObjectType.SLIME_GREEN),
+            (BOARD_POSITIONS[0][1], ObjectType.KEY_BLUE),
+            (BOARD_POSITIONS[0][2], ObjectType.SLIME_GREEN),
+            (BOARD_POSITIONS[0][3], ObjectType.DAGGER_RED),
+            
+            # Rangée 1 - Risque moyen
+            (BOARD_POSITIONS[1][0], ObjectType.SLIME_GREEN),
+            (BOARD_POSITIONS[1][1], ObjectType.CHAINS),
+            (BOARD_POSITIONS[1][2], ObjectType.DAGGER_RED),
+            (BOARD_POSITIONS[1][3], ObjectType.TREASURE_CHEST),
+            
+            # Rangée 2 - Meilleur ratio risque/récompense
+            (BOARD_POSITIONS[2][0], ObjectType.TREASURE_CHEST),
+            (BOARD_POSITIONS[2][1], ObjectType.HEALTH_POTION),
+            (BOARD_POSITIONS[2][2], ObjectType.DAGGER_RED),
+            (BOARD_POSITIONS[2][3], ObjectType.TREASURE_CHEST),
+            
+            # Rangée 3 - Risque moyen
+            (BOARD_POSITIONS[3][0], ObjectType.SLIME_GREEN),
+            (BOARD_POSITIONS[3][1], ObjectType.CHAINS),
+            (BOARD_POSITIONS[3][2], ObjectType.HEART_RED),
+            (BOARD_POSITIONS[3][3], ObjectType.SLIME_GREEN),
+        ]
+    
     def display_grid_info(self):
         """Affiche les informations de la grille"""
         print("\n📊 ANALYSE DE LA GRILLE:")
@@ -199,12 +263,13 @@ class ModularSolCestoGame:
         """Simule une partie de jeu"""
         print("🎮 SIMULATION DE PARTIE\n")
         
-        # L'IA recommande la rangée 2 (meilleur score risque/récompense)
-        recommended_row = 2
+        # L'IA recommande la rangée au meilleur score risque/récompense
+        board = {(position.row, position.col): obj_type for position, (obj_type, _) in self.game_grid.items()}
+        recommended_row, _ = recommend_row(board, self.grid_weights)
         print(f"🤖 IA recommande la rangée {recommended_row}")
         
         # Affichage du statut initial
-        initial_status = self.hero_stats.get_detailed_status()
+        initial_status = self.get_status()
         print(f"📊 État initial: {initial_status['stats']['health']} HP, {initial_status['stats']['gold']} or")
         
         # Exploration de la rangée recommandée
@@ -215,19 +280,25 @@ class ModularSolCestoGame:
     def explore_row(self, row: int):
         """Explore une rangée complète"""
         print(f"\n🚀 EXPLORATION DE LA RANGÉE {row}:")
+        self.rows_explored.append(row)
         
         for col in range(4):
-            target_pos = Position(row, col)
+            target_pos = BOARD_POSITIONS[row][col]
             
             print(f"\n  📍 Mouvement vers {target_pos}")
             
             # Commande de déplacement
             move_cmd = MoveCommand(self.hero_position, target_pos)
             move_result = self.command_history.execute_command(move_cmd)
+            if self.record_metrics:
+                MOVES.inc()
+            if self.replay_writer:
+                self.replay_writer.record_move(row, col, move_result['success'], self.hero_stats.current_health)
             
             if move_result['success']:
                 # Notification du déplacement
-                old_pos = Position(self.hero_position.row, self.hero_position.col)
+                # Instantané de la position sans nouvelle allocation
+                old_pos = BOARD_POSITIONS[self.hero_position.row][self.hero_position.col]
                 self.event_publisher.notify_hero_moved(old_pos, target_pos)
                 
                 # Interaction avec l'objet s'il y en a un
@@ -238,6 +309,15 @@ class ModularSolCestoGame:
                     # Commande d'interaction
                     interact_cmd = InteractCommand(self.hero_stats, obj_type, behavior, target_pos)
                     interact_result = self.command_history.execute_command(interact_cmd)
+                    # Toute interaction peut modifier les stats, même en échec
+                    self.invalidate_status()
+                    if self.record_metrics:
+                        INTERACTIONS.inc(labels=(obj_type.name,))
+                    if self.replay_writer:
+                        self.replay_writer.record_interaction(
+                            row, col, obj_type, interact_result.get('action', 'unknown'), interact_result['success'],
+                            self.hero_stats.current_health, interact_result.get('gold_gained', 0)
+                        )
                     
                     if interact_result['success']:
                         # Traitement spécialisé selon le type d'interaction
@@ -262,7 +342,7 @@ class ModularSolCestoGame:
                     print(f"    ⬜ Case vide")
                 
                 # Affichage du statut actuel
-                current_status = self.hero_stats.get_detailed_status()
+                current_status = self.get_status()
                 print(f"    💪 Statut: {current_status['stats']['health']} HP, {current_status['stats']['gold']} or")
                 
             else:
@@ -306,7 +386,7 @@ class ModularSolCestoGame:
         print(f"\n🏆 RÉSULTATS FINAUX\n")
         
         # Statut détaillé du héros
-        final_status = self.hero_stats.get_detailed_status()
+        final_status = self.get_status()
         
         print(f"👤 HÉROS FINAL:")
         print(f"   🆔 {final_status['hero_info']['description']}")
@@ -359,14 +439,19 @@ class ModularSolCestoGame:
             print(f"   {event_type}: {count}")
         
         # Évaluation finale
-        self.evaluate_performance()
+        score, grade = self.evaluate_performance()
         
         # Sauvegarde des résultats
-        self.save_results(final_status, game_stats, events_summary)
+        self.save_results(final_status, game_stats, events_summary, score, grade)
+        if self.record_metrics:
+            GAMES.inc(labels=("finished",))
+        if self.replay_writer:
+            self.replay_writer.end_game(self.hero_stats.is_alive(), self.hero_stats.current_health,
+                                        final_status['stats']['gold'])
     
     def evaluate_performance(self):
         """Évalue la performance du joueur"""
-        final_status = self.hero_stats.get_detailed_status()
+        final_status = self.get_status()
         
         # Calcul du score
         score = 0
@@ -405,9 +490,13 @@ class ModularSolCestoGame:
         print(f"   Note: {grade}")
         return score, grade
     
-    def save_results(self, final_status: Dict, game_stats: Dict, events_summary: Dict):
+    def save_results(self, final_status: Dict, game_stats: Dict, events_summary: Dict,
+                     score: Optional[int] = None, grade: Optional[str] = None):
         """Sauvegarde les résultats de la partie"""
         results = {
+            'hero_class': self.selected_class.value if self.selected_class else None,
+            'performance': {'score': score, 'grade': grade},
+            'rows_explored': list(self.rows_explored),
             'hero_final_status': final_status,
             'game_statistics': game_stats,
             'events_summary': events_summary,
@@ -426,15 +515,39 @@ class ModularSolCestoGame:
 
 def main():
     """Lance le jeu modulaire"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Sol Cesto IA - Version Modulaire')
+    parser.add_argument('screenshot', nargs='?', default=None, help='Capture d\'écran à analyser (optionnelle)')
+    parser.add_argument('--seed', type=int, default=None, help='Graine aléatoire de la partie')
+    parser.add_argument('--replay', default=None, help='Enregistre la partie dans ce fichier de replay')
+    args = parser.parse_args()
+    
+    replay_writer = None
     try:
-        game = ModularSolCestoGame()
-        game.start_game()
+        if args.replay:
+            # Import local : NumPy n'est chargé que si un replay est demandé
+            from replay_format import ReplayWriter
+            replay_writer = ReplayWriter(args.replay)
+        seed = args.seed
+        if seed is None and replay_writer:
+            # Partie enregistrée : une graine est nécessaire pour la rejouer à l'identique
+            seed = random.SystemRandom().randrange(2 ** 63)
+        if seed is not None:
+            random.seed(seed)
+        game = ModularSolCestoGame(replay_writer=replay_writer, seed=seed)
+        game.start_game(args.screenshot)
+        if replay_writer:
+            print(f"🎞️ Replay enregistré: {args.replay} (graine {game.seed})")
     except KeyboardInterrupt:
         print(f"\n\n⏹️ Jeu interrompu par l'utilisateur")
     except Exception as e:
         print(f"\n\n❌ Erreur inattendue: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if replay_writer:
+            replay_writer.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Métriques - Compteurs et histogrammes par thread, exposés au format texte Prometheus
+"""
+
+import argparse
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Bornes (secondes) des histogrammes de latence : de 0,5 ms à 1 s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Compteur monotone ; chaque thread incrémente sa propre copie"""
+
+    kind = "counter"
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, amount: float = 1.0, labels: Tuple[str, ...] = ()):
+        values = self.registry._thread_values()
+        key = (self.name, labels)
+        values[key] = values.get(key, 0) + amount
+
+    def merge(self, snapshots: List[Dict]) -> Dict[Tuple[str, ...], float]:
+        merged: Dict[Tuple[str, ...], float] = {}
+        for values in snapshots:
+            for (name, labels), value in values.items():
+                if name == self.name:
+                    merged[labels] = merged.get(labels, 0) + value
+        return merged
+
+    def render(self, snapshots: List[Dict]) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self.merge(snapshots).items())]
+
+
+class Histogram:
+    """Histogramme à bornes fixes : [comptes par intervalle..., somme, nombre] par thread"""
+
+    kind = "histogram"
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()):
+        values = self.registry._thread_values()
+        key = (self.name, labels)
+        slots = values.get(key)
+        if slots is None:
+            # Un intervalle par borne, plus +Inf, puis somme et nombre
+            slots = values[key] = [0] * (len(self.buckets) + 3)
+        slots[bisect.bisect_left(self.buckets, value)] += 1
+        slots[-2] += value
+        slots[-1] += 1
+
+    def merge(self, snapshots: List[Dict]) -> Dict[Tuple[str, ...], List[float]]:
+        merged: Dict[Tuple[str, ...], List[float]] = {}
+        for values in snapshots:
+            for (name, labels), slots in values.items():
+                if name != self.name:
+                    continue
+                total = merged.setdefault(labels, [0] * len(slots))
+                for index, value in enumerate(list(slots)):
+                    total[index] += value
+        return merged
+
+    def render(self, snapshots: List[Dict]) -> List[str]:
+        lines = []
+        for labels, slots in sorted(self.merge(snapshots).items()):
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], slots):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(slots[-2])}")
+            lines.append(f"{self.name}_count{label_text} {_format_value(slots[-1])}")
+        return lines
+
+
+class CallbackMetric:
+    """Valeurs lues au moment de l'export (ex. statistiques d'un cache existant)"""
+
+    def __init__(self, name: str, help_text: str, kind: str, labelnames: Sequence[str],
+                 callback: Callable[[], Dict[Tuple[str, ...], float]]):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def render(self, snapshots: List[Dict]) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self.callback().items())]
+
+
+class MetricsRegistry:
+    """Métriques du processus ; les threads n'écrivent que dans leur propre dictionnaire"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._local = threading.local()
+        # (thread propriétaire, valeurs) ; les valeurs des threads terminés sont versées dans _retired
+        self._thread_states: List[Tuple[threading.Thread, Dict]] = []
+        self._retired: Dict = {}
+        self._lock = threading.Lock()
+
+    def _thread_values(self) -> Dict:
+        values = getattr(self._local, 'values', None)
+        if values is None:
+            # Seule la première écriture d'un thread prend le verrou
+            values = self._local.values = {}
+            with self._lock:
+                self._thread_states.append((threading.current_thread(), values))
+        return values
+
+    def _retire_dead_threads(self):
+        """Fusionne les valeurs des threads terminés dans l'accumulateur retiré (verrou tenu)"""
+        alive = []
+        for thread, values in self._thread_states:
+            if thread.is_alive():
+                alive.append((thread, values))
+                continue
+            for key, value in values.items():
+                if isinstance(value, list):
+                    total = self._retired.setdefault(key, [0] * len(value))
+                    for index, slot in enumerate(value):
+                        total[index] += slot
+                else:
+                    self._retired[key] = self._retired.get(key, 0) + value
+        self._thread_states = alive
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrique déjà enregistrée: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help_text, labelnames, buckets))
+
+    def callback(self, name: str, help_text: str, callback: Callable[[], Dict[Tuple[str, ...], float]],
+                 kind: str = "gauge", labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self._register(CallbackMetric(name, help_text, kind, labelnames, callback))
+
+    def render(self) -> str:
+        """Fusionne les accumulateurs de tous les threads et produit le texte d'export"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            self._retire_dead_threads()
+            states = [values for _, values in self._thread_states]
+            retired = {key: list(value) if isinstance(value, list) else value
+                       for key, value in self._retired.items()}
+        # Copie atomique (sous le GIL) de chaque dictionnaire : le thread propriétaire peut continuer
+        snapshots = [retired] + [values.copy() for values in states]
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render(snapshots))
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Écrit l'export dans un fichier (remplacement atomique, lisible par un collecteur)"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> HTTPServer:
+        """Sert /metrics en local dans un thread démon ; retourne le serveur"""
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="métriques", daemon=True).start()
+        return server
+
+
+# Registre du processus et métriques des chemins chauds
+REGISTRY = MetricsRegistry()
+
+FRAMES = REGISTRY.counter(
+    "solcesto_frames_total", "Frames analysées", ["pipeline"])
+STAGE_LATENCY = REGISTRY.histogram(
+    "solcesto_stage_latency_seconds", "Latence par étape de traitement d'une frame", ["pipeline", "stage"])
+DEGRADED_CELLS = REGISTRY.counter(
+    "solcesto_degraded_cells_total", "Cases analysées en mode rapide faute de budget")
+OCR_CACHE = REGISTRY.counter(
+    "solcesto_ocr_cache_lookups_total", "Consultations du cache OCR des badges", ["result"])
+GAMES = REGISTRY.counter(
+    "solcesto_games_total", "Parties simulées (rate() donne les parties par seconde)", ["state"])
+MOVES = REGISTRY.counter(
+    "solcesto_moves_total", "Déplacements simulés")
+INTERACTIONS = REGISTRY.counter(
+    "solcesto_interactions_total", "Interactions simulées par type d'objet", ["object_type"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export des métriques Sol Cesto pendant une simulation')
+    parser.add_argument('--games', '-n', type=int, default=100, help='Parties simulées')
+    parser.add_argument('--textfile', default=None, help='Fichier d\'export (format texte Prometheus)')
+    parser.add_argument('--port', type=int, default=None, help='Sert /metrics sur 127.0.0.1:PORT')
+    args = parser.parse_args()
+
+    import contextlib
+    import random
+    from main import ModularSolCestoGame
+    # Lancé en script, ce fichier est __main__ : main.py incrémente les compteurs du module
+    # `metrics` importé, pas ceux de cette copie
+    from metrics import REGISTRY
+
+    if args.port:
+        REGISTRY.serve(args.port)
+        print(f"📡 Métriques sur http://127.0.0.1:{args.port}/metrics")
+
+    start_time = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for seed in range(args.games):
+            random.seed(seed)
+            game = ModularSolCestoGame(seed=seed)
+            game.select_hero_interactive()
+            game.setup_game_grid()
+            game.simulate_gameplay()
+    elapsed = time.perf_counter() - start_time
+    print(f"🎮 {args.games} parties en {elapsed:.2f} s ({args.games / elapsed:.0f} parties/s)")
+
+    if args.textfile:
+        REGISTRY.write_textfile(args.textfile)
+        print(f"💾 Métriques écrites: {args.textfile}")
+    else:
+        print(REGISTRY.render())
+
+    if args.port:
+        print("⏳ Ctrl+C pour arrêter")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
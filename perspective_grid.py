@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Grille en perspective - Redressement de la grille par homographie et remap
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from calibration_store import CalibrationStore
+
+
+def order_corners(points: Sequence[Sequence[float]]) -> np.ndarray:
+    """Ordonne 4 coins en [haut-gauche, haut-droit, bas-droit, bas-gauche]"""
+    # L'ordre des clics n'est pas fiable : on le déduit de la géométrie
+    pts = np.array(points, dtype=np.float32).reshape(4, 2)
+    sums = pts.sum(axis=1)
+    diffs = pts[:, 1] - pts[:, 0]
+    return np.array([
+        pts[np.argmin(sums)],   # haut-gauche : x + y minimal
+        pts[np.argmin(diffs)],  # haut-droit : y - x minimal
+        pts[np.argmax(sums)],   # bas-droit : x + y maximal
+        pts[np.argmax(diffs)],  # bas-gauche : y - x maximal
+    ], dtype=np.float32)
+
+
+class PerspectiveGrid:
+    """Redresse chaque frame en une grille canonique où les cases sont uniformes"""
+
+    def __init__(self, store: CalibrationStore):
+        self.store = store
+        # (largeur, hauteur) -> cartes de remap précalculées pour cette résolution
+        self._maps: Dict[Tuple[int, int], Dict] = {}
+        self._generation = store.generation
+
+    def _get_maps(self, width: int, height: int) -> Dict:
+        """Cartes de remap de la résolution, calculées une seule fois"""
+        self.store.check_for_changes()
+        if self._generation != self.store.generation:
+            # Fichier de calibrage modifié : les homographies sont à refaire
+            self._maps = {}
+            self._generation = self.store.generation
+
+        maps = self._maps.get((width, height))
+        if maps is None:
+            maps = self._build_maps(width, height)
+            self._maps[(width, height)] = maps
+        return maps
+
+    def _build_maps(self, width: int, height: int) -> Dict:
+        """Calcule l'homographie grille canonique -> frame et les cartes de remap"""
+        profile = self.store.get_profile(width, height)
+        orig_width, orig_height = profile['image_dimensions']
+        grid_config = profile['grid_config']
+
+        # Coins calibrés, mis à l'échelle de la résolution de la frame
+        corners = order_corners(profile['corner_points'])
+        corners[:, 0] *= width / orig_width
+        corners[:, 1] *= height / orig_height
+
+        # Grille canonique à la taille de cellule calibrée
+        cell_width = grid_config['cell_width']
+        cell_height = grid_config['cell_height']
+        board_width = 4 * cell_width
+        board_height = 4 * cell_height
+
+        canonical = np.array([
+            [0, 0], [board_width, 0], [board_width, board_height], [0, board_height]
+        ], dtype=np.float32)
+        homography = cv2.getPerspectiveTransform(canonical, corners)
+
+        # Position source de chaque pixel de la grille canonique
+        xs, ys = np.meshgrid(np.arange(board_width, dtype=np.float32),
+                             np.arange(board_height, dtype=np.float32))
+        points = np.stack([xs, ys], axis=-1).reshape(-1, 1, 2)
+        source = cv2.perspectiveTransform(points, homography).reshape(board_height, board_width, 2)
+
+        # Cartes en virgule fixe : remap plus rapide qu'avec des cartes flottantes
+        map1, map2 = cv2.convertMaps(source[:, :, 0], source[:, :, 1], cv2.CV_16SC2)
+
+        return {
+            'map1': map1,
+            'map2': map2,
+            'homography': homography,
+            'cell_size': (cell_width, cell_height)
+        }
+
+    def warp(self, image: np.ndarray) -> np.ndarray:
+        """Redresse la frame en une seule passe vers la grille canonique"""
+        height, width = image.shape[:2]
+        maps = self._get_maps(width, height)
+        return cv2.remap(image, maps['map1'], maps['map2'], cv2.INTER_LINEAR)
+
+    def get_cell_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Taille (largeur, hauteur) d'une case dans la grille canonique"""
+        return self._get_maps(width, height)['cell_size']
+
+    def get_canonical_cell(self, row: int, col: int, width: int, height: int) -> Tuple[int, int, int, int]:
+        """Rectangle d'une case dans la grille canonique"""
+        cell_width, cell_height = self.get_cell_size(width, height)
+        x1 = col * cell_width
+        y1 = row * cell_height
+        return x1, y1, x1 + cell_width, y1 + cell_height
+
+    def project_cell(self, row: int, col: int, width: int, height: int) -> List[Tuple[int, int]]:
+        """Coins d'une case projetés dans la frame (pour la visualisation)"""
+        maps = self._get_maps(width, height)
+        x1, y1, x2, y2 = self.get_canonical_cell(row, col, width, height)
+        corners = np.array([[[x1, y1]], [[x2, y1]], [[x2, y2]], [[x1, y2]]], dtype=np.float32)
+        projected = cv2.perspectiveTransform(corners, maps['homography']).reshape(4, 2)
+        return [(int(round(x)), int(round(y))) for x, y in projected]
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Table de politique - Valeurs des rangées précalculées hors ligne, lues en mémoire mappée
+"""
+
+import argparse
+import itertools
+import json
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from board_generator import OBJECT_TYPES, BoardGenerator
+from lockstep_simulator import ObjectTable
+from probability_modifiers import CATEGORIES
+
+
+MAGIC = b"SCPT"
+VERSION = 1
+
+# En-tête : magic, version, taille des métadonnées JSON
+HEADER = struct.Struct("<4sHI")
+
+# Symboles d'une case : les catégories puis la case vide
+SYMBOLS = len(CATEGORIES) + 1
+EMPTY_SYMBOL = len(CATEGORIES)
+
+
+def row_compositions() -> List[Tuple[int, ...]]:
+    """Compositions canoniques d'une rangée (nombre de cases par catégorie et vides), moins pleines d'abord"""
+    compositions = set()
+    for cells in itertools.combinations_with_replacement(range(SYMBOLS), 4):
+        compositions.add(tuple(cells.count(symbol) for symbol in range(SYMBOLS)))
+    return sorted(compositions, key=lambda counts: (-counts[EMPTY_SYMBOL], counts))
+
+
+def category_objects(magic_monsters: Sequence[str] = ()) -> List[Dict[str, np.ndarray]]:
+    """Effets des objets de chaque catégorie et leur probabilité au sein de la catégorie"""
+    objects = ObjectTable(magic_monsters)
+    weights = BoardGenerator().object_weights
+    groups = []
+    for category in range(len(CATEGORIES)):
+        members = np.flatnonzero(objects.category[:-1] == category)
+        probabilities = weights[members] / weights[members].sum() if len(members) else np.zeros(0)
+        groups.append({
+            "probability": probabilities,
+            "monster_threat": objects.monster_threat[members],
+            "trap_damage": objects.trap_damage[members],
+            "heal": objects.heal[members],
+            "gold": objects.gold[members],
+            "magic": objects.magic[members],
+        })
+    return groups
+
+
+def solve_stats(strength: int, magic: int, compositions: List[Tuple[int, ...]],
+                groups: List[Dict[str, np.ndarray]], hp_max: int, death_penalty: float) -> np.ndarray:
+    """Valeur (compositions, PV) de vider une rangée, pour une force et une magie données.
+
+    Programmation dynamique exacte : le héros atterrit uniformément sur une case pleine de la
+    rangée, résout l'objet (tiré selon les poids de sa catégorie) et recommence jusqu'à vider
+    la rangée ; une mort vaut -death_penalty. Les soins sont bornés à hp_max."""
+    index = {counts: position for position, counts in enumerate(compositions)}
+    hp = np.arange(hp_max + 1)
+    values = np.zeros((len(compositions), hp_max + 1), dtype=np.float64)
+
+    for position, counts in enumerate(compositions):
+        filled = 4 - counts[EMPTY_SYMBOL]
+        if not filled:
+            continue  # Rangée vide : rien à gagner
+        total = np.zeros(hp_max + 1)
+        for category, count in enumerate(counts[:EMPTY_SYMBOL]):
+            group = groups[category]
+            if not count or not len(group["probability"]):
+                continue
+            # Rangée restante : une case de cette catégorie en moins (déjà résolue, moins pleine)
+            remaining = list(counts)
+            remaining[category] -= 1
+            remaining[EMPTY_SYMBOL] += 1
+            next_values = values[index[tuple(remaining)]]
+
+            defense = np.where(group["magic"], magic, strength)
+            damage = np.maximum(0, group["monster_threat"] - defense) + group["trap_damage"]       # (objets,)
+            new_hp = np.clip(hp[None, :] - damage[:, None] + group["heal"][:, None], 0, hp_max)    # (objets, PV)
+            outcome = np.where(damage[:, None] >= hp[None, :], -death_penalty,
+                               group["gold"][:, None] + next_values[new_hp])
+            total += count / filled * (group["probability"] @ outcome)
+        values[position] = total
+    values[:, 0] = -death_penalty  # Héros déjà mort
+    return values
+
+
+def _solve_task(task):
+    strength, magic, compositions, groups, hp_max, death_penalty = task
+    return strength, magic, solve_stats(strength, magic, compositions, groups, hp_max, death_penalty)
+
+
+def build_table(path: str, hp_max: int = 40, stat_max: int = 15, death_penalty: float = 100.0,
+                magic_monsters: Sequence[str] = (), workers: Optional[int] = None) -> Dict[str, float]:
+    """Calcule toute la table (une tâche par couple force/magie, réparties sur les cœurs) et l'écrit"""
+    compositions = row_compositions()
+    groups = category_objects(magic_monsters)
+    stats = stat_max + 1
+    table = np.zeros((len(compositions), stats, stats, hp_max + 1), dtype=np.float32)
+
+    start_time = time.perf_counter()
+    tasks = [(strength, magic, compositions, groups, hp_max, death_penalty)
+             for strength in range(stats) for magic in range(stats)]
+    if workers == 1:
+        results = map(_solve_task, tasks)
+        for strength, magic, values in results:
+            table[:, strength, magic] = values
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for strength, magic, values in executor.map(_solve_task, tasks, chunksize=8):
+                table[:, strength, magic] = values
+    elapsed = time.perf_counter() - start_time
+
+    meta = {
+        "categories": list(CATEGORIES),
+        "compositions": [list(counts) for counts in compositions],
+        "shape": list(table.shape),
+        "hp_max": hp_max,
+        "stat_max": stat_max,
+        "death_penalty": death_penalty,
+        "magic_monsters": list(magic_monsters),
+    }
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    # Valeurs alignées sur 8 octets après l'en-tête
+    padding = -(HEADER.size + len(meta_bytes)) % 8
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(meta_bytes) + padding))
+        f.write(meta_bytes + b" " * padding)
+        table.tofile(f)
+    os.replace(temp_path, path)
+
+    return {"entrées": table.size, "octets": os.path.getsize(path), "secondes": elapsed}
+
+
+class PolicyTable:
+    """Table de politique en mémoire mappée : seules les pages consultées sont lues"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, meta_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Table de politique invalide: {path}")
+            if version != VERSION:
+                raise ValueError(f"Version de table non supportée ({version}): {path}")
+            self.meta = json.loads(f.read(meta_size).decode('utf-8'))
+
+        if self.meta["categories"] != list(CATEGORIES):
+            raise ValueError(f"Catégories de la table différentes de probability_modifiers: {path}")
+        self.hp_max = self.meta["hp_max"]
+        self.stat_max = self.meta["stat_max"]
+        # Vue ndarray simple sur le mappage : évite le surcoût de la sous-classe memmap à chaque lecture
+        self.values = np.asarray(np.memmap(path, dtype=np.float32, mode='r', offset=HEADER.size + meta_size,
+                                           shape=tuple(self.meta["shape"])))
+        self._ranks = {tuple(counts): rank for rank, counts in enumerate(self.meta["compositions"])}
+        self._empty_rank = self._ranks[(0,) * EMPTY_SYMBOL + (4,)]
+        self._symbols: Optional[Dict[Optional[object], int]] = None
+
+    def _symbol(self, obj_type) -> int:
+        """ObjectType (ou None) -> symbole de catégorie, table construite au premier appel"""
+        if self._symbols is None:
+            objects = ObjectTable(self.meta["magic_monsters"])
+            self._symbols = {obj_type: int(objects.category[code]) for code, obj_type in enumerate(OBJECT_TYPES)}
+            self._symbols[None] = EMPTY_SYMBOL
+        return self._symbols[obj_type]
+
+    def row_rank(self, row_objects: Sequence) -> int:
+        counts = [0] * SYMBOLS
+        for obj_type in row_objects:
+            counts[self._symbol(obj_type)] += 1
+        return self._ranks[tuple(counts)]
+
+    def row_values(self, board: Dict[Tuple[int, int], object], health: int, strength: int,
+                   magic: int) -> List[float]:
+        """Valeur de chaque rangée du plateau (row, col) -> ObjectType ou None"""
+        hp = min(max(health, 0), self.hp_max)
+        strength = min(max(strength, 0), self.stat_max)
+        magic = min(max(magic, 0), self.stat_max)
+        values = []
+        for row in range(4):
+            rank = self.row_rank([board.get((row, col)) for col in range(4)])
+            # Rangée vide : jamais choisie tant qu'une autre reste
+            values.append(float(self.values[rank, strength, magic, hp])
+                          if rank != self._empty_rank else -np.inf)
+        return values
+
+    def best_row(self, board: Dict[Tuple[int, int], object], health: int, strength: int, magic: int) -> int:
+        """Rangée recommandée : 4 lectures dans la table"""
+        values = self.row_values(board, health, strength, magic)
+        return int(np.argmax(values))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Table de politique précalculée pour Sol Cesto')
+    parser.add_argument('table', nargs='?', default='policy_table.bin', help='Fichier de la table')
+    parser.add_argument('--build', action='store_true', help='Calcule la table (hors ligne)')
+    parser.add_argument('--hp-max', type=int, default=40)
+    parser.add_argument('--stat-max', type=int, default=15)
+    parser.add_argument('--workers', '-j', type=int, default=None, help='Processus (défaut: nombre de CPU)')
+    parser.add_argument('--health', type=int, default=10, help='PV du héros pour la requête de démonstration')
+    parser.add_argument('--strength', type=int, default=3)
+    parser.add_argument('--magic', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.build:
+        stats = build_table(args.table, args.hp_max, args.stat_max, workers=args.workers)
+        print(f"🧮 Table construite: {stats['entrées']:,} valeurs, {stats['octets'] / 1024:.0f} Ko "
+              f"en {stats['secondes']:.2f} s")
+
+    table = PolicyTable(args.table)
+    from main import ModularSolCestoGame
+    board = {(position.row, position.col): obj_type
+             for position, obj_type in ModularSolCestoGame().get_reference_grid()}
+
+    start_time = time.perf_counter()
+    best_row = table.best_row(board, args.health, args.strength, args.magic)
+    elapsed = time.perf_counter() - start_time
+    values = table.row_values(board, args.health, args.strength, args.magic)
+
+    print(f"\n🗺️ Grille de référence, {args.health} PV, force {args.strength}, magie {args.magic}:")
+    for row, value in enumerate(values):
+        marker = "👉" if row == best_row else "  "
+        print(f"   {marker} Rangée {row}: valeur {value:+.2f}")
+    print(f"⏱️ Requête en {elapsed * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Modificateurs de probabilités - Dents, objets marchands et bénédictions compilés en matrices
+"""
+
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Ordre des catégories dans les tableaux de codes (-1 = case vide)
+CATEGORIES = ("monster", "treasure", "trap", "healing", "utility")
+EMPTY = -1
+
+# Modificateurs connus : multiplicateurs par catégorie et/ou par case (4x4) ou par colonne.
+# Valeurs d'exemple tirées de data/game.md, à compléter avec register_modifier.
+MODIFIER_CATALOG: Dict[str, Dict[str, Any]] = {
+    "dent_de_force": {"source": "dent", "categories": {"monster": 1.21}},
+    "dent_de_piège": {"source": "dent", "categories": {"trap": 1.09}},
+    "dent_de_pierre": {"source": "dent", "columns": [0.84, 1.32, 0.84, 1.0]},  # 21%/33%/21%/25%
+    "dent_de_métal": {"source": "dent", "categories": {"monster": 1.15, "trap": 1.15, "treasure": 1.1}},
+    "boussole_du_marchand": {"source": "marchand", "categories": {"trap": 0.8}},
+    "bourse_du_marchand": {"source": "marchand", "categories": {"treasure": 1.2}},
+    "bénédiction_de_vie": {"source": "fontaine", "categories": {"healing": 1.25}},
+    "bénédiction_de_paix": {"source": "fontaine", "categories": {"monster": 0.85}},
+}
+
+
+def register_modifier(name: str, categories: Optional[Dict[str, float]] = None,
+                      columns: Optional[Sequence[float]] = None, cells: Optional[Sequence[Sequence[float]]] = None,
+                      source: str = "autre"):
+    """Ajoute ou remplace un modificateur du catalogue"""
+    for category in (categories or {}):
+        if category not in CATEGORIES:
+            raise ValueError(f"Catégorie inconnue: {category}")
+    definition: Dict[str, Any] = {"source": source}
+    if categories:
+        definition["categories"] = dict(categories)
+    if columns is not None:
+        definition["columns"] = list(columns)
+    if cells is not None:
+        definition["cells"] = [list(row) for row in cells]
+    MODIFIER_CATALOG[name] = definition
+
+
+def inventory_fingerprint(inventory: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+    """Empreinte de l'inventaire, indépendante de l'ordre des objets"""
+    return tuple(sorted(Counter(inventory).items()))
+
+
+def encode_boards(boards: Sequence[Dict[Tuple[int, int], Optional[str]]]) -> np.ndarray:
+    """Plateaux {(row, col): catégorie} -> codes de catégorie (B, 4, 4)"""
+    index = {category: code for code, category in enumerate(CATEGORIES)}
+    codes = np.full((len(boards), 4, 4), EMPTY, dtype=np.int8)
+    for board_index, board in enumerate(boards):
+        for (row, col), category in board.items():
+            if category is not None:
+                codes[board_index, row, col] = index[category]
+    return codes
+
+
+class CompiledModifiers:
+    """Effet combiné d'un inventaire : matrice 4x4 de poids et multiplicateurs par catégorie"""
+
+    def __init__(self, weight_matrix: np.ndarray, category_multipliers: np.ndarray):
+        self.weight_matrix = weight_matrix
+        self.category_multipliers = category_multipliers
+        # Multiplicateur d'une case vide (code -1) en dernière position : 1
+        self._lookup = np.append(category_multipliers, 1.0)
+
+    def cell_weights(self, codes: np.ndarray, badge_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Poids d'atterrissage (B, 4, 4) des plateaux sous cet inventaire"""
+        # codes == -1 indexe la dernière entrée de _lookup (case vide, neutre)
+        weights = self._lookup[codes] * self.weight_matrix
+        if badge_weights is not None:
+            weights = weights * badge_weights
+        return weights
+
+    def landing_probabilities(self, codes: np.ndarray, badge_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Probabilités d'atterrissage (B, 4, 4), normalisées sur chaque rangée"""
+        weights = self.cell_weights(codes, badge_weights)
+        totals = weights.sum(axis=2, keepdims=True)
+        return np.divide(weights, totals, out=np.full_like(weights, 0.25), where=totals > 0)
+
+
+class ModifierEngine:
+    """Compile les inventaires une seule fois et évalue des lots de plateaux"""
+
+    def __init__(self, catalog: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.catalog = catalog if catalog is not None else MODIFIER_CATALOG
+        # Empreinte d'inventaire -> modificateurs compilés
+        self._compiled: Dict[Tuple[Tuple[str, int], ...], CompiledModifiers] = {}
+        self.compilations = 0
+
+    def compile(self, inventory: Iterable[str]) -> CompiledModifiers:
+        """Modificateurs compilés de l'inventaire (mis en cache par empreinte)"""
+        fingerprint = inventory_fingerprint(inventory)
+        compiled = self._compiled.get(fingerprint)
+        if compiled is None:
+            compiled = self._compile(fingerprint)
+            self._compiled[fingerprint] = compiled
+        return compiled
+
+    def _compile(self, fingerprint: Tuple[Tuple[str, int], ...]) -> CompiledModifiers:
+        """Multiplie les effets de chaque objet (un objet en double s'applique deux fois)"""
+        weight_matrix = np.ones((4, 4), dtype=np.float64)
+        category_multipliers = np.ones(len(CATEGORIES), dtype=np.float64)
+
+        for name, count in fingerprint:
+            definition = self.catalog.get(name)
+            if definition is None:
+                raise ValueError(f"Modificateur inconnu: {name}")
+
+            for category, multiplier in definition.get("categories", {}).items():
+                category_multipliers[CATEGORIES.index(category)] *= multiplier ** count
+            if "columns" in definition:
+                weight_matrix *= np.asarray(definition["columns"], dtype=np.float64)[np.newaxis, :] ** count
+            if "cells" in definition:
+                weight_matrix *= np.asarray(definition["cells"], dtype=np.float64) ** count
+
+        self.compilations += 1
+        weight_matrix.flags.writeable = False
+        category_multipliers.flags.writeable = False
+        return CompiledModifiers(weight_matrix, category_multipliers)
+
+    def landing_probabilities(self, codes: np.ndarray, inventory: Iterable[str],
+                              badge_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Probabilités d'atterrissage (B, 4, 4) d'un lot de plateaux sous un inventaire"""
+        return self.compile(inventory).landing_probabilities(codes, badge_weights)
+
+    def expected_rows(self, codes: np.ndarray, inventory: Iterable[str], category_values: np.ndarray,
+                      badge_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Espérances par rangée (B, 4, K) pour des valeurs par catégorie (C, K)"""
+        probabilities = self.landing_probabilities(codes, inventory, badge_weights)
+
+        # Valeurs des cases : une ligne de zéros pour les cases vides (code -1)
+        values = np.vstack([np.asarray(category_values, dtype=np.float64),
+                            np.zeros((1, np.shape(category_values)[1]))])
+        batch = codes.shape[0]
+        cell_values = values[codes].reshape(batch * 4, 4, -1)  # (B*4 rangées, 4 cases, K)
+
+        # Un seul produit matriciel par lots : (B*4, 1, 4) @ (B*4, 4, K)
+        rows = probabilities.reshape(batch * 4, 1, 4) @ cell_values
+        return rows.reshape(batch, 4, -1)
+
+
+def main():
+    """Démonstration : un inventaire appliqué à un lot de plateaux aléatoires"""
+    engine = ModifierEngine()
+    inventory = ["dent_de_force", "dent_de_pierre", "bénédiction_de_vie", "dent_de_force"]
+
+    compiled = engine.compile(inventory)
+    print("=== MODIFICATEURS DE PROBABILITÉS ===\n")
+    print(f"🦷 Inventaire: {', '.join(inventory)}")
+    print("📊 Multiplicateurs par catégorie:")
+    for category, multiplier in zip(CATEGORIES, compiled.category_multipliers):
+        print(f"   {category:<9} ×{multiplier:.3f}")
+    print(f"📐 Poids par colonne: {', '.join(f'{w:.2f}' for w in compiled.weight_matrix[0])}")
+
+    rng = np.random.default_rng(0)
+    codes = rng.integers(EMPTY, len(CATEGORIES), size=(100_000, 4, 4)).astype(np.int8)
+    # Menace et récompense moyennes par catégorie (exemple)
+    category_values = np.array([[5, 2], [0, 8], [4, 0], [0, 5], [0, 3]], dtype=np.float64)
+
+    start_time = time.perf_counter()
+    rows = engine.expected_rows(codes, inventory, category_values)
+    elapsed = time.perf_counter() - start_time
+
+    best_rows = np.argmax(rows[:, :, 1] - rows[:, :, 0], axis=1)
+    print(f"\n⚡ {len(codes)} plateaux évalués en {elapsed * 1000:.1f} ms "
+          f"({len(codes) / elapsed:,.0f} plateaux/s) - compilations: {engine.compilations}")
+    print(f"🤖 Rangées recommandées (répartition): {np.bincount(best_rows, minlength=4).tolist()}")
+
+
+if __name__ == "__main__":
+    main()
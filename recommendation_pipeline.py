@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Pipeline de recommandation - De la capture d'écran à la rangée conseillée, sous budget de latence
+"""
+
+import os
+import sys
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from advanced_detector import AdvancedDetector
+from metrics import DEGRADED_CELLS, FRAMES, STAGE_LATENCY
+from row_evaluator import recommend_row
+from sol_cesto.core.enums import ObjectType
+
+
+# Symboles renvoyés par AdvancedDetector -> type d'objet du jeu
+SYMBOL_TO_OBJECT: Dict[str, Optional[ObjectType]] = {
+    "🗡️ Dague rouge": ObjectType.DAGGER_RED,
+    "🔴 Objet rouge": ObjectType.DAGGER_RED,
+    "💧 Goutte bleue": ObjectType.HEALTH_POTION,
+    "🔵 Objet bleu": ObjectType.KEY_BLUE,
+    "🟢 Objet vert": ObjectType.SLIME_GREEN,
+    "🍓 Fraise rouge et verte": ObjectType.HEART_RED,
+    "🍓 Objet rouge-vert": ObjectType.HEART_RED,
+    "🪙 Pièce avec ?": ObjectType.TREASURE_CHEST,
+    "🟡 Objet jaune": ObjectType.TREASURE_CHEST,
+    "⚫ Objet sombre": ObjectType.CHAINS,
+    "Non identifié": None,
+}
+
+
+def badge_to_weight(number: Optional[str]) -> Optional[float]:
+    """Poids d'atterrissage lu sur le badge ("?" ou illisible = poids de base)"""
+    if number is None or not number.isdigit():
+        return None
+    return float(number)
+
+
+class LatencyBudget:
+    """Budget de latence de bout en bout et échéance de chaque étape"""
+
+    # Échéances par défaut en millisecondes, dans l'ordre du pipeline
+    DEFAULT_STAGES = {
+        "décodage": 15.0,
+        "détection": 70.0,
+        "conversion": 5.0,
+        "évaluation": 10.0,
+    }
+
+    def __init__(self, total_ms: float = 100.0, stage_ms: Optional[Dict[str, float]] = None):
+        self.total_ms = total_ms
+        self.stage_ms = dict(self.DEFAULT_STAGES)
+        if stage_ms:
+            self.stage_ms.update(stage_ms)
+
+    def stage_deadline(self, stage: str, stage_start: float, frame_start: float) -> float:
+        """Échéance absolue (perf_counter) d'une étape : la plus proche des deux limites"""
+        return min(stage_start + self.stage_ms[stage] / 1000, frame_start + self.total_ms / 1000)
+
+
+class RecommendationPipeline:
+    """Capture -> cases détectées -> plateau d'ObjectType -> rangée recommandée"""
+
+    def __init__(self, detector: Optional[AdvancedDetector] = None, budget: Optional[LatencyBudget] = None):
+        self.detector = detector or AdvancedDetector(debug_mode=False)
+        self.budget = budget or LatencyBudget()
+        self.frames_processed = 0
+        self.frames_over_budget = 0
+
+    def _decode(self, frame: Union[str, bytes, np.ndarray]) -> np.ndarray:
+        """Accepte un chemin, des octets encodés ou une image BGR déjà décodée"""
+        if isinstance(frame, np.ndarray):
+            return frame
+        if isinstance(frame, str):
+            image = cv2.imread(frame)
+        else:
+            image = cv2.imdecode(np.frombuffer(frame, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Impossible de décoder la frame")
+        return image
+
+    def _detect(self, image: np.ndarray, deadline: float) -> Tuple[Dict[Tuple[int, int], Dict[str, Any]], int]:
+        """Analyse les 16 cases ; passé l'échéance, seule l'étape rapide tourne"""
+        results = {}
+        degraded = 0
+        cells = self.detector.extract_cells(image)
+        for (row, col), cell_image in cells.items():
+            quick_only = time.perf_counter() >= deadline
+            degraded += quick_only
+            results[(row, col)] = self.detector.analyze_cell(cell_image, row, col, quick_only=quick_only)
+        if self.detector.badge_ocr is not None:
+            self.detector.read_badge_numbers(cells, results)
+        return results, degraded
+
+    @staticmethod
+    def to_board(detections: Dict[Tuple[int, int], Dict[str, Any]]) -> Tuple[Dict, Dict]:
+        """Convertit les détections en plateau d'ObjectType et en poids de badges"""
+        board = {}
+        weights = {}
+        for position, analysis in detections.items():
+            board[position] = SYMBOL_TO_OBJECT.get(analysis['symbole'])
+            weights[position] = badge_to_weight(analysis['numéro'])
+        return board, weights
+
+    def process_frame(self, frame: Union[str, bytes, np.ndarray], health_ratio: float = 1.0) -> Dict[str, Any]:
+        """Traite une frame et retourne la recommandation avec les latences par étape"""
+        frame_start = time.perf_counter()
+        latencies = {}
+        overruns = []
+
+        def close_stage(stage: str, stage_start: float):
+            latencies[stage] = (time.perf_counter() - stage_start) * 1000
+            STAGE_LATENCY.observe(latencies[stage] / 1000, ("recommandation", stage))
+            if latencies[stage] > self.budget.stage_ms[stage]:
+                overruns.append(stage)
+
+        stage_start = time.perf_counter()
+        image = self._decode(frame)
+        close_stage("décodage", stage_start)
+
+        stage_start = time.perf_counter()
+        deadline = self.budget.stage_deadline("détection", stage_start, frame_start)
+        detections, degraded_cells = self._detect(image, deadline)
+        close_stage("détection", stage_start)
+
+        stage_start = time.perf_counter()
+        board, weights = self.to_board(detections)
+        close_stage("conversion", stage_start)
+
+        stage_start = time.perf_counter()
+        best_row, row_scores = recommend_row(board, weights, health_ratio)
+        close_stage("évaluation", stage_start)
+
+        total_ms = (time.perf_counter() - frame_start) * 1000
+        within_budget = total_ms <= self.budget.total_ms
+
+        self.frames_processed += 1
+        self.frames_over_budget += not within_budget
+        FRAMES.inc(labels=("recommandation",))
+        if degraded_cells:
+            DEGRADED_CELLS.inc(degraded_cells)
+
+        return {
+            "rangée": best_row,
+            "rangées": row_scores,
+            "plateau": board,
+            "poids": weights,
+            "détections": detections,
+            "latences_ms": latencies,
+            "total_ms": total_ms,
+            "dans_budget": within_budget,
+            "dépassements": overruns,
+            "cases_dégradées": degraded_cells,
+        }
+
+
+def main():
+    """Recommande une rangée pour chaque capture passée en argument"""
+    image_paths = sys.argv[1:] or [os.path.join('data', '20250604220023_1.jpg')]
+    pipeline = RecommendationPipeline()
+
+    for image_path in image_paths:
+        print(f"\n📷 {os.path.basename(image_path)}")
+        result = pipeline.process_frame(image_path)
+
+        for evaluation in result["rangées"]:
+            marker = "👉" if evaluation["row"] == result["rangée"] else "  "
+            print(f"   {marker} Rangée {evaluation['row']}: Menace {evaluation['threat']:.2f} | "
+                  f"Récompense {evaluation['reward']:.2f} | Score {evaluation['score']:+.2f}")
+
+        stages = " | ".join(f"{stage} {ms:.1f}" for stage, ms in result["latences_ms"].items())
+        status = "✅" if result["dans_budget"] else "⚠️ hors budget"
+        print(f"   ⏱️ {result['total_ms']:.1f} ms ({stages}) {status}")
+        if result["cases_dégradées"]:
+            print(f"   ⚠️ {result['cases_dégradées']} case(s) en étape rapide seule (échéance dépassée)")
+
+        print(f"🤖 Rangée recommandée: {result['rangée']}")
+
+
+if __name__ == "__main__":
+    main()
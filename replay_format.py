@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Format de replay binaire - Parties enregistrées en enregistrements de taille fixe
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sol_cesto.core.enums import HeroClass, ObjectType
+
+
+MAGIC = b"SCRP"
+VERSION = 2
+
+# En-tête : magic, version, taille d'un enregistrement, taille de la table de chaînes
+HEADER = struct.Struct("<4sHHI")
+
+# Enregistrement de 20 octets, lisible directement par np.memmap
+RECORD_DTYPE = np.dtype([
+    ("game", "<u4"),     # Numéro de partie dans le fichier
+    ("kind", "u1"),      # GAME_START / MOVE / INTERACTION / GAME_END
+    ("row", "u1"),
+    ("col", "u1"),
+    ("code", "u1"),      # Objet (interaction, plateau) ou classe de héros (début de partie)
+    ("action", "u1"),    # Type d'interaction
+    ("success", "u1"),   # Déplacement/interaction réussi, ou héros vivant en fin de partie
+    ("health", "<i2"),   # PV après l'enregistrement
+    ("value", "<i8"),    # Graine (début), or gagné (interaction), or final (fin)
+])
+
+GAME_START, MOVE, INTERACTION, GAME_END, BOARD = range(5)
+
+# Code d'une case vide dans les enregistrements BOARD
+EMPTY_CELL = 255
+
+ACTIONS = ["unknown", "treasure_opened", "healing_used", "combat", "item_acquired", "trap_triggered"]
+
+
+def build_string_table() -> Dict[str, List[str]]:
+    """Noms des objets, héros et actions : les codes des enregistrements sont leurs indices"""
+    return {
+        "objects": [obj_type.name for obj_type in ObjectType],
+        "heroes": [hero_class.name for hero_class in HeroClass],
+        "actions": list(ACTIONS),
+    }
+
+
+class ReplayWriter:
+    """Écrit des parties dans un fichier de replay, par blocs d'enregistrements"""
+
+    def __init__(self, path: str, flush_every: int = 4096):
+        self.path = path
+        self.flush_every = flush_every
+        self.table = build_string_table()
+        self._object_codes = {obj_type: code for code, obj_type in enumerate(ObjectType)}
+        self._hero_codes = {hero_class: code for code, hero_class in enumerate(HeroClass)}
+        self._action_codes = {action: code for code, action in enumerate(ACTIONS)}
+
+        self._pending: List[tuple] = []
+        self._game = -1
+
+        table_bytes = json.dumps(self.table, ensure_ascii=False).encode('utf-8')
+        # Début des enregistrements aligné sur 8 octets (enregistrements de 20 octets, non alignés entre eux)
+        padding = -(HEADER.size + len(table_bytes)) % 8
+
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, len(table_bytes) + padding))
+        self._file.write(table_bytes + b" " * padding)
+
+    def begin_game(self, seed: int, hero_class: HeroClass, health: int) -> int:
+        """Ouvre une nouvelle partie et retourne son numéro"""
+        self._game += 1
+        self._append(GAME_START, code=self._hero_codes[hero_class], health=health, value=seed)
+        return self._game
+
+    def record_board(self, board: Dict[Tuple[int, int], Optional[ObjectType]]):
+        """Plateau mis en place : 16 enregistrements BOARD consécutifs, un par case"""
+        for row in range(4):
+            for col in range(4):
+                obj_type = board.get((row, col))
+                self._append(BOARD, row=row, col=col,
+                             code=EMPTY_CELL if obj_type is None else self._object_codes[obj_type])
+
+    def record_move(self, row: int, col: int, success: bool, health: int):
+        """Déplacement du héros vers (row, col)"""
+        self._append(MOVE, row=row, col=col, success=success, health=health)
+
+    def record_interaction(self, row: int, col: int, obj_type: ObjectType, action: str, success: bool,
+                           health: int, gold_gained: int = 0):
+        """Interaction avec l'objet de la case (row, col)"""
+        self._append(INTERACTION, row=row, col=col, code=self._object_codes[obj_type],
+                     action=self._action_codes.get(action, 0), success=success, health=health, value=gold_gained)
+
+    def end_game(self, alive: bool, health: int, gold: int):
+        """Clôt la partie courante avec l'état final du héros"""
+        self._append(GAME_END, success=alive, health=health, value=gold)
+
+    def _append(self, kind: int, row: int = 0, col: int = 0, code: int = 0, action: int = 0,
+                success: bool = True, health: int = 0, value: int = 0):
+        if self._game < 0:
+            raise ValueError("Aucune partie ouverte : appeler begin_game d'abord")
+        self._pending.append((self._game, kind, row, col, code, action, int(success), health, value))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Écrit les enregistrements en attente en un seul bloc"""
+        if self._pending:
+            np.array(self._pending, dtype=RECORD_DTYPE).tofile(self._file)
+            self._pending = []
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ReplayReader:
+    """Lit un fichier de replay en mémoire mappée, sans copie des enregistrements"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, record_size, table_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Fichier de replay invalide: {path}")
+            if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+                raise ValueError(f"Version de replay non supportée ({version}, {record_size} octets): {path}")
+            self.table = json.loads(f.read(table_size).decode('utf-8'))
+
+        offset = HEADER.size + table_size
+        count = (os.path.getsize(path) - offset) // RECORD_DTYPE.itemsize
+        # Fichier vide ou en cours d'écriture : seuls les enregistrements complets sont lus
+        self.records = (np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=offset, shape=(count,))
+                        if count else np.empty(0, dtype=RECORD_DTYPE))
+
+        # Début de chaque partie (les enregistrements sont écrits partie par partie)
+        self._starts = np.flatnonzero(self.records["kind"] == GAME_START)
+
+    @property
+    def game_count(self) -> int:
+        return len(self._starts)
+
+    def game_records(self, game: int) -> np.ndarray:
+        """Enregistrements (vue) d'une partie"""
+        start = self._starts[game]
+        end = self._starts[game + 1] if game + 1 < len(self._starts) else len(self.records)
+        return self.records[start:end]
+
+    def describe_game(self, game: int) -> Dict[str, Any]:
+        """Partie décodée en dictionnaires lisibles"""
+        records = self.game_records(game)
+        header = records[0]
+        events = []
+        for record in records[1:]:
+            kind = int(record["kind"])
+            if kind == BOARD:
+                # Les 16 cases d'un plateau regroupées en un seul événement
+                if not events or events[-1]["type"] != "board":
+                    events.append({"type": "board", "cells": {}})
+                if record["code"] != EMPTY_CELL:
+                    events[-1]["cells"][f"{int(record['row'])},{int(record['col'])}"] = \
+                        self.table["objects"][record["code"]]
+            elif kind == MOVE:
+                events.append({"type": "move", "position": (int(record["row"]), int(record["col"])),
+                               "success": bool(record["success"]), "health": int(record["health"])})
+            elif kind == INTERACTION:
+                events.append({"type": "interaction", "position": (int(record["row"]), int(record["col"])),
+                               "object": self.table["objects"][record["code"]],
+                               "action": self.table["actions"][record["action"]],
+                               "success": bool(record["success"]), "health": int(record["health"]),
+                               "gold_gained": int(record["value"])})
+            elif kind == GAME_END:
+                events.append({"type": "end", "alive": bool(record["success"]),
+                               "health": int(record["health"]), "gold": int(record["value"])})
+        return {
+            "game": game,
+            "seed": int(header["value"]),
+            "hero": self.table["heroes"][header["code"]],
+            "initial_health": int(header["health"]),
+            "events": events,
+        }
+
+    def summarize(self) -> Dict[str, np.ndarray]:
+        """Statistiques par partie calculées en passes vectorisées sur tout le fichier"""
+        records = self.records
+        games = records["game"].astype(np.int64)
+        kinds = records["kind"]
+        count = int(games.max()) + 1 if len(games) else 0
+
+        ends = kinds == GAME_END
+        final_health = np.full(count, -1, dtype=np.int32)
+        final_health[games[ends]] = records["health"][ends]
+        final_gold = np.zeros(count, dtype=np.int64)
+        final_gold[games[ends]] = records["value"][ends]
+        alive = np.zeros(count, dtype=bool)
+        alive[games[ends]] = records["success"][ends].astype(bool)
+
+        starts = kinds == GAME_START
+        heroes = np.zeros(count, dtype=np.uint8)
+        heroes[games[starts]] = records["code"][starts]
+
+        return {
+            "moves": np.bincount(games[kinds == MOVE], minlength=count),
+            "interactions": np.bincount(games[kinds == INTERACTION], minlength=count),
+            "hero": heroes,
+            "finished": np.bincount(games[ends], minlength=count) > 0,
+            "alive": alive,
+            "final_health": final_health,
+            "final_gold": final_gold,
+        }
+
+    def board_segments(self, game: int) -> List[Dict[str, Any]]:
+        """Plateaux successifs d'une partie et rangées explorées sur chacun, dans l'ordre"""
+        object_types = list(ObjectType)
+        segments: List[Dict[str, Any]] = []
+        previous_kind = None
+        for record in self.game_records(game)[1:]:
+            kind = int(record["kind"])
+            if kind == BOARD:
+                if previous_kind != BOARD:
+                    segments.append({"board": {}, "rows": []})
+                code = int(record["code"])
+                segments[-1]["board"][(int(record["row"]), int(record["col"]))] = \
+                    None if code == EMPTY_CELL else object_types[code]
+            elif kind == MOVE and record["col"] == 0:
+                # explore_row commence toujours par la colonne 0 : un déplacement en 0 = une rangée
+                if not segments:
+                    segments.append({"board": None, "rows": []})  # Replay sans plateau enregistré
+                segments[-1]["rows"].append(int(record["row"]))
+            previous_kind = kind
+        return segments
+
+    def explored_rows(self, game: int) -> List[int]:
+        """Rangées explorées dans l'ordre, déduites des déplacements"""
+        return [row for segment in self.board_segments(game) for row in segment["rows"]]
+
+    def resimulate(self, game: int) -> Dict[str, Any]:
+        """Rejoue les plateaux et les rangées d'une partie avec sa graine, compare l'état final"""
+        # Import local : main n'est chargé que pour rejouer
+        from main import ModularSolCestoGame
+
+        expected = self.describe_game(game)
+        end = next((event for event in expected["events"] if event["type"] == "end"), None)
+
+        # Graine de la partie le temps du replay, puis état du processus restauré
+        state = random.getstate()
+        random.seed(expected["seed"])
+        simulation = ModularSolCestoGame(seed=expected["seed"])
+        # Vérification, pas une vraie partie : hors des compteurs exportés
+        simulation.record_metrics = False
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            simulation.select_hero_interactive()
+            for segment in self.board_segments(game):
+                simulation.game_grid = {}
+                simulation.setup_game_grid(segment["board"])
+                for row in segment["rows"]:
+                    simulation.explore_row(row)
+        random.setstate(state)
+
+        obtained = {"alive": simulation.hero_stats.is_alive(), "health": simulation.hero_stats.current_health}
+        return {
+            "game": game,
+            "attendu": {"alive": end["alive"], "health": end["health"]} if end else None,
+            "obtenu": obtained,
+            "identique": end is not None and end["alive"] == obtained["alive"] and end["health"] == obtained["health"],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyse d\'un fichier de replay Sol Cesto')
+    parser.add_argument('replay', help='Fichier de replay')
+    parser.add_argument('--show', type=int, default=None, help='Affiche le détail d\'une partie')
+    parser.add_argument('--resimulate', type=int, default=0,
+                        help='Nombre de parties à rejouer pour vérifier les résultats')
+    args = parser.parse_args()
+
+    reader = ReplayReader(args.replay)
+    summary = reader.summarize()
+    print(f"🎞️ {reader.game_count} partie(s), {len(reader.records)} enregistrements")
+
+    if reader.game_count:
+        finished = summary["finished"]
+        print(f"   🚶 Déplacements moyens: {summary['moves'].mean():.1f}")
+        print(f"   🎯 Interactions moyennes: {summary['interactions'].mean():.1f}")
+        if finished.any():
+            print(f"   💪 Survie: {summary['alive'][finished].mean():.0%}")
+            print(f"   💰 Or final moyen: {summary['final_gold'][finished].mean():.1f}")
+
+    if args.show is not None:
+        print(json.dumps(reader.describe_game(args.show), indent=2, ensure_ascii=False))
+
+    if args.resimulate:
+        mismatches = 0
+        for game in range(min(args.resimulate, reader.game_count)):
+            result = reader.resimulate(game)
+            if not result["identique"]:
+                mismatches += 1
+                print(f"   ❌ Partie {game}: attendu {result['attendu']} | obtenu {result['obtenu']}")
+        print(f"🔁 Parties rejouées: {min(args.resimulate, reader.game_count)} | écarts: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Analyse des résultats - Parties stockées en colonnes NumPy, requêtes group-by et percentiles
+"""
+
+import argparse
+import glob
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+GRADES = ["S", "A", "B", "C", "D", "F", "?"]
+
+# Rangées choisies gardées par partie (-1 = pas de choix)
+MAX_ROWS = 8
+
+COLUMN_DTYPES = {
+    "score": np.int32,
+    "grade": np.uint8,          # Indice dans GRADES
+    "gold": np.int32,
+    "damage_taken": np.int32,
+    "health": np.int32,
+    "alive": np.bool_,
+    "hero": np.uint8,           # Indice dans la table des classes de héros
+    "moves": np.int32,
+    "first_row": np.int8,
+    "row_choices": np.int8,     # (N, MAX_ROWS)
+}
+
+
+def parse_health(value: Any) -> int:
+    """PV courants depuis "110/110" ou un entier"""
+    if isinstance(value, str):
+        return int(value.split('/')[0])
+    return int(value)
+
+
+def score_from_status(final_status: Dict[str, Any]) -> Tuple[int, str]:
+    """Score et note des anciens résultats, même barème que ModularSolCestoGame.evaluate_performance"""
+    health = parse_health(final_status['stats']['health'])
+    score = (final_status['stats']['gold'] + final_status['inventory']['item_count'] * 10 + health
+             + (final_status['hero_info']['level'] - 1) * 50 - final_status['combat_stats']['damage_taken'])
+    if health <= 0:
+        return score, "F"
+    for threshold, grade in [(200, "S"), (150, "A"), (100, "B"), (50, "C")]:
+        if score >= threshold:
+            return score, grade
+    return score, "D"
+
+
+class ResultTable:
+    """Résultats de parties en colonnes (une ligne par partie)"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], heroes: List[str]):
+        self.columns = columns
+        self.heroes = heroes
+
+    def __len__(self) -> int:
+        return len(self.columns["score"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict[str, Any]]) -> 'ResultTable':
+        """Aplatit des résultats JSON (format modular_game_results.json) en colonnes"""
+        heroes: List[str] = []
+        hero_index: Dict[str, int] = {}
+        rows: Dict[str, List[Any]] = {name: [] for name in COLUMN_DTYPES}
+
+        for result in results:
+            final_status = result['hero_final_status']
+            performance = result.get('performance') or {}
+            score, grade = performance.get('score'), performance.get('grade')
+            if score is None or grade is None:
+                score, grade = score_from_status(final_status)
+
+            hero = result.get('hero_class')
+            if hero is None:
+                history = result.get('hero_selection_history') or [{}]
+                hero = history[0].get('hero_class', 'inconnu')
+            if hero not in hero_index:
+                hero_index[hero] = len(heroes)
+                heroes.append(hero)
+
+            health = parse_health(final_status['stats']['health'])
+            choices = list(result.get('rows_explored', []))[:MAX_ROWS]
+
+            rows["score"].append(score)
+            rows["grade"].append(GRADES.index(grade) if grade in GRADES else GRADES.index("?"))
+            rows["gold"].append(final_status['stats']['gold'])
+            rows["damage_taken"].append(final_status['combat_stats']['damage_taken'])
+            rows["health"].append(health)
+            rows["alive"].append(health > 0)
+            rows["hero"].append(hero_index[hero])
+            rows["moves"].append(result.get('game_statistics', {}).get('total_moves', 0))
+            rows["first_row"].append(choices[0] if choices else -1)
+            rows["row_choices"].append(choices + [-1] * (MAX_ROWS - len(choices)))
+
+        columns = {name: np.array(values, dtype=COLUMN_DTYPES[name]) for name, values in rows.items()}
+        if not len(columns["row_choices"]):
+            columns["row_choices"] = columns["row_choices"].reshape(0, MAX_ROWS)
+        return cls(columns, heroes)
+
+    @classmethod
+    def from_json_files(cls, paths: Iterable[str]) -> 'ResultTable':
+        """Charge une série de fichiers de résultats JSON (lent : à faire une seule fois)"""
+        def iter_results():
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    yield json.load(f)
+        return cls.from_results(iter_results())
+
+    def save(self, path: str):
+        """Sauvegarde en .npz (archive unique) ou en dossier de .npy mappables en mémoire"""
+        if path.endswith('.npz'):
+            np.savez(path, heroes=np.array(self.heroes), **self.columns)
+            return
+        os.makedirs(path, exist_ok=True)
+        for name, values in self.columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), values)
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({"heroes": self.heroes, "grades": GRADES, "rows": len(self)}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'ResultTable':
+        """Charge une table ; un dossier est ouvert en mémoire mappée (aucune lecture immédiate)"""
+        if path.endswith('.npz'):
+            with np.load(path) as archive:
+                columns = {name: archive[name] for name in COLUMN_DTYPES}
+                heroes = archive['heroes'].tolist()
+            return cls(columns, heroes)
+
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                   for name in COLUMN_DTYPES}
+        return cls(columns, meta["heroes"])
+
+    def _labels(self, key: str, codes: np.ndarray) -> List[Any]:
+        """Libellés lisibles des clés de regroupement"""
+        if key == "hero":
+            return [self.heroes[code] for code in codes]
+        if key == "grade":
+            return [GRADES[code] for code in codes]
+        return codes.tolist()
+
+    def group_by(self, key: str, value: str, agg: str = "mean",
+                 where: Optional[np.ndarray] = None) -> Dict[Any, float]:
+        """Agrégat (count, sum, mean, min, max) d'une colonne par valeur de clé"""
+        keys = np.asarray(self.columns[key])
+        values = np.asarray(self.columns[value], dtype=np.float64)
+        if where is not None:
+            keys, values = keys[where], values[where]
+
+        groups, inverse = np.unique(keys, return_inverse=True)
+        if agg in ("count", "sum", "mean"):
+            counts = np.bincount(inverse, minlength=len(groups))
+            sums = np.bincount(inverse, weights=values, minlength=len(groups))
+            result = {"count": counts, "sum": sums, "mean": sums / np.maximum(counts, 1)}[agg]
+        elif agg in ("min", "max"):
+            # Tri par groupe puis réduction sur chaque segment contigu
+            order = np.argsort(inverse, kind='stable')
+            starts = np.searchsorted(inverse[order], np.arange(len(groups)))
+            reducer = np.minimum if agg == "min" else np.maximum
+            result = reducer.reduceat(values[order], starts)
+        else:
+            raise ValueError(f"Agrégat inconnu: {agg}")
+
+        return dict(zip(self._labels(key, groups), result.tolist()))
+
+    def percentiles(self, value: str, q: Iterable[float], by: Optional[str] = None) -> Dict[Any, List[float]]:
+        """Percentiles d'une colonne, globaux ou par valeur de clé"""
+        q = list(q)
+        values = np.asarray(self.columns[value], dtype=np.float64)
+        if by is None:
+            return {"tous": np.percentile(values, q).tolist()} if len(values) else {"tous": []}
+
+        keys = np.asarray(self.columns[by])
+        # Tri unique (clé, valeur) : chaque groupe devient un segment trié
+        order = np.lexsort((values, keys))
+        sorted_keys = keys[order]
+        sorted_values = values[order]
+        groups, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+
+        results = {}
+        for label, start, count in zip(self._labels(by, groups), starts, counts):
+            # Interpolation linéaire, comme np.percentile, sans re-trier le segment
+            positions = np.asarray(q) / 100 * (count - 1)
+            lower = np.floor(positions).astype(np.int64)
+            upper = np.minimum(lower + 1, count - 1)
+            fraction = positions - lower
+            segment = sorted_values[start:start + count]
+            results[label] = (segment[lower] * (1 - fraction) + segment[upper] * fraction).tolist()
+        return results
+
+    def row_choice_counts(self) -> Dict[int, int]:
+        """Nombre de fois où chaque rangée a été choisie, toutes parties confondues"""
+        choices = np.asarray(self.columns["row_choices"]).ravel()
+        counts = np.bincount(choices[choices >= 0], minlength=4)
+        return {row: int(count) for row, count in enumerate(counts)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyse en colonnes des résultats de parties Sol Cesto')
+    parser.add_argument('source', help='Dossier de table, archive .npz, ou motif de fichiers JSON')
+    parser.add_argument('--save', default=None, help='Convertit les JSON en table (.npz ou dossier)')
+    parser.add_argument('--by', default='hero', help='Colonne de regroupement')
+    parser.add_argument('--value', default='score', help='Colonne analysée')
+    args = parser.parse_args()
+
+    if os.path.isdir(args.source) or args.source.endswith('.npz'):
+        table = ResultTable.load(args.source)
+    else:
+        paths = sorted(glob.glob(args.source))
+        table = ResultTable.from_json_files(paths)
+        print(f"📥 {len(paths)} fichier(s) JSON importé(s)")
+        if args.save:
+            table.save(args.save)
+            print(f"💾 Table sauvegardée: {args.save}")
+
+    print(f"\n📊 {len(table)} partie(s)")
+    if not len(table):
+        return
+
+    print(f"\n📋 {args.value} par {args.by}:")
+    means = table.group_by(args.by, args.value, "mean")
+    counts = table.group_by(args.by, args.value, "count")
+    quantiles = table.percentiles(args.value, [50, 90, 99], by=args.by)
+    for label, mean in means.items():
+        p50, p90, p99 = quantiles[label]
+        print(f"   {label}: {int(counts[label])} parties | moyenne {mean:.1f} | "
+              f"p50 {p50:.1f} | p90 {p90:.1f} | p99 {p99:.1f}")
+
+    print(f"\n🏅 Notes: {table.group_by('grade', 'score', 'count')}")
+    print(f"🧭 Rangées choisies: {table.row_choice_counts()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Évaluateur de rangées - Score récompense/menace pondéré par les probabilités d'atterrissage
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from metrics import REGISTRY
+from sol_cesto.core.enums import ObjectType
+from sol_cesto.patterns.factory import GameObjectFactory
+
+
+# Niveaux de PV distingués par le cache (ratio arrondi au 1/HP_BUCKETS le plus proche)
+HP_BUCKETS = 20
+ROW_CACHE_SIZE = 8192
+
+
+def landing_probabilities(weights: Optional[Sequence[Optional[float]]], size: int = 4) -> List[float]:
+    """Probabilités d'atterrissage d'une rangée à partir des poids des badges"""
+    # Sans badge lisible, chaque case garde le poids de base (25% chacune)
+    if weights is None:
+        weights = [None] * size
+    values = [1.0 if weight is None else float(weight) for weight in weights]
+    total = sum(values)
+    if total <= 0:
+        return [1.0 / size] * size
+    return [value / total for value in values]
+
+
+def canonical_row(objects: Sequence[Optional[ObjectType]],
+                  weights: Optional[Sequence[Optional[float]]] = None) -> Tuple[Tuple[str, float], ...]:
+    """Multiset trié des couples (objet, poids) : l'ordre des cases ne change pas la valeur"""
+    if weights is None:
+        weights = [None] * len(objects)
+    return tuple(sorted(
+        (obj_type.name if obj_type is not None else "", 1.0 if weight is None else float(weight))
+        for obj_type, weight in zip(objects, weights)
+    ))
+
+
+def health_bucket(health_ratio: float) -> int:
+    """Tranche de PV (0..HP_BUCKETS) utilisée pour pondérer la menace"""
+    return int(round(max(0.0, min(1.0, health_ratio)) * HP_BUCKETS))
+
+
+@lru_cache(maxsize=ROW_CACHE_SIZE)
+def _evaluate_canonical(row: Tuple[Tuple[str, float], ...], bucket: int) -> Tuple[float, float, float]:
+    """Menace, récompense et score d'une rangée canonique (mémoïsé)"""
+    probabilities = landing_probabilities([weight for _, weight in row], len(row))
+
+    threat = 0.0
+    reward = 0.0
+    for (name, _), probability in zip(row, probabilities):
+        if not name:  # Case vide
+            continue
+        info = GameObjectFactory.get_object_info(ObjectType[name])
+        threat += probability * info['threat_level']
+        reward += probability * info['reward_value']
+
+    # PV bas : la menace pèse jusqu'à deux fois plus lourd
+    danger = 1.0 + (1.0 - bucket / HP_BUCKETS)
+
+    return threat, reward, reward - danger * threat
+
+
+def evaluate_row(objects: Sequence[Optional[ObjectType]], weights: Optional[Sequence[Optional[float]]] = None,
+                 health_ratio: float = 1.0) -> Dict[str, float]:
+    """Espérance de menace, de récompense et score d'une rangée"""
+    threat, reward, score = _evaluate_canonical(canonical_row(objects, weights), health_bucket(health_ratio))
+    return {
+        "threat": threat,
+        "reward": reward,
+        "score": score
+    }
+
+
+def row_cache_info() -> Dict[str, float]:
+    """Statistiques du cache des rangées (succès, échecs, taux de succès)"""
+    info = _evaluate_canonical.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0
+    }
+
+
+def clear_row_cache():
+    """Vide le cache (ex. après un changement des règles des objets)"""
+    _evaluate_canonical.cache_clear()
+
+
+def recommend_row(board: Dict[Tuple[int, int], Optional[ObjectType]],
+                  weights: Optional[Dict[Tuple[int, int], Optional[float]]] = None,
+                  health_ratio: float = 1.0) -> Tuple[int, List[Dict[str, Any]]]:
+    """Rangée recommandée et détail des scores des 4 rangées"""
+    weights = weights or {}
+    rows = []
+    for row in range(4):
+        objects = [board.get((row, col)) for col in range(4)]
+        row_weights = [weights.get((row, col)) for col in range(4)]
+        evaluation = evaluate_row(objects, row_weights, health_ratio)
+        evaluation["row"] = row
+        rows.append(evaluation)
+
+    best = max(rows, key=lambda evaluation: evaluation["score"])
+    return best["row"], rows
+
+
+REGISTRY.callback(
+    "solcesto_row_cache_lookups_total", "Consultations du cache des rangées",
+    lambda: {("hit",): _evaluate_canonical.cache_info().hits, ("miss",): _evaluate_canonical.cache_info().misses},
+    kind="counter", labelnames=["result"])
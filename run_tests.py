@@ -5,16 +5,137 @@ Script pour lancer tous les tests du projet Sol Cesto IA
 
 import sys
 import os
+import io
+import json
 import unittest
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import Any, Dict, List
 
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Historique des durées, utilisé pour équilibrer les shards
+TIMINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.test_timings.json')
 
-def run_all_tests():
-    """Lance tous les tests unitaires"""
+
+class TimingTestResult(unittest.TextTestResult):
+    """Résultat de test qui mesure la durée de chaque test"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = []
+        self._test_started = 0.0
+    
+    def startTest(self, test):
+        self._test_started = time.perf_counter()
+        super().startTest(test)
+    
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.timings.append((test.id(), time.perf_counter() - self._test_started))
+
+
+def _flatten_suite(suite: unittest.TestSuite) -> List[unittest.TestCase]:
+    """Liste les tests individuels d'une suite imbriquée"""
+    tests = []
+    for item in suite:
+        if isinstance(item, unittest.TestSuite):
+            tests.extend(_flatten_suite(item))
+        else:
+            tests.append(item)
+    return tests
+
+
+def _imported_module(test: unittest.TestCase) -> str:
+    """Module d'un test ; pour un module en échec d'import, le module visé et non unittest.loader"""
+    if isinstance(test, unittest.loader._FailedTest):
+        return test._testMethodName
+    return test.__class__.__module__
+
+
+def _group_tests_by_module(suite: unittest.TestSuite) -> Dict[str, List[str]]:
+    """Regroupe les identifiants de tests par module (modules importables uniquement)"""
+    modules = {}
+    for test in _flatten_suite(suite):
+        # Un _FailedTest ne se recharge pas par son nom : lancé à part (voir _failed_imports)
+        if not isinstance(test, unittest.loader._FailedTest):
+            modules.setdefault(_imported_module(test), []).append(test.id())
+    return modules
+
+
+def _failed_imports(suite: unittest.TestSuite) -> List[unittest.TestCase]:
+    """Tests d'échec d'import produits par la découverte, porteurs de l'ImportError d'origine"""
+    return [test for test in _flatten_suite(suite) if isinstance(test, unittest.loader._FailedTest)]
+
+
+def load_timing_history() -> Dict[str, Dict[str, float]]:
+    """Charge l'historique des durées par module et par test"""
+    if not os.path.exists(TIMINGS_FILE):
+        return {"modules": {}, "tests": {}}
+    try:
+        with open(TIMINGS_FILE, 'r') as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        return {"modules": {}, "tests": {}}
+    history.setdefault("modules", {})
+    history.setdefault("tests", {})
+    return history
+
+
+def save_timing_history(history: Dict[str, Dict[str, float]]):
+    """Sauvegarde l'historique des durées pour les prochains lancements"""
+    with open(TIMINGS_FILE, 'w') as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+
+
+def build_shards(modules: Dict[str, List[str]], history: Dict[str, Dict[str, float]], workers: int) -> List[List[str]]:
+    """Répartit les modules en shards de durée équilibrée (plus long d'abord)"""
+    known = [history["modules"][name] for name in modules if name in history["modules"]]
+    default_duration = sum(known) / len(known) if known else 1.0
+    
+    durations = {name: history["modules"].get(name, default_duration) for name in modules}
+    shards = [{"duration": 0.0, "modules": []} for _ in range(max(1, min(workers, len(modules))))]
+    
+    for name in sorted(modules, key=durations.get, reverse=True):
+        shard = min(shards, key=lambda s: s["duration"])
+        shard["duration"] += durations[name]
+        shard["modules"].append(name)
+    
+    return [shard["modules"] for shard in shards if shard["modules"]]
+
+
+def _run_shard(test_ids: List[str], start_dir: str) -> Dict[str, Any]:
+    """Lance une liste de tests dans un worker et retourne un résultat sérialisable"""
+    # Même sys.path que la découverte (dossier de tests comme racine)
+    top_level = os.path.abspath(start_dir)
+    if top_level not in sys.path:
+        sys.path.insert(0, top_level)
+    
+    loader = unittest.TestLoader()
+    return _run_suite(loader.loadTestsFromNames(test_ids))
+
+
+def _run_suite(suite: unittest.TestSuite) -> Dict[str, Any]:
+    """Lance une suite et retourne un résultat sérialisable"""
+    stream = io.StringIO()
+    runner = unittest.TextTestRunner(stream=stream, verbosity=2, resultclass=TimingTestResult)
+    result = runner.run(suite)
+    
+    return {
+        "output": stream.getvalue(),
+        "tests_run": result.testsRun,
+        "failures": [(str(test), traceback) for test, traceback in result.failures],
+        "errors": [(str(test), traceback) for test, traceback in result.errors],
+        "skipped": len(result.skipped),
+        "timings": result.timings,
+        "success": result.wasSuccessful()
+    }
+
+
+def run_all_tests(workers: int = None, slowest: int = 10):
+    """Lance tous les tests unitaires, répartis sur plusieurs processus"""
     print("=" * 70)
     print("🧪 SOL CESTO IA - LANCEMENT DES TESTS")
     print("=" * 70)
@@ -29,42 +150,95 @@ def run_all_tests():
     # Compter les tests
     test_count = suite.countTestCases()
     print(f"📊 Nombre de tests trouvés: {test_count}")
-    print()
     
-    # Lancer les tests avec un runner détaillé
-    runner = unittest.TextTestRunner(verbosity=2)
+    # Répartition des modules en shards équilibrés par durée passée
+    modules = _group_tests_by_module(suite)
+    failed_imports = _failed_imports(suite)
+    history = load_timing_history()
+    workers = workers or os.cpu_count() or 1
+    shards = build_shards(modules, history, workers)
+    print(f"⚙️  {len(modules)} module(s) répartis sur {len(shards)} processus")
+    print()
     
     start_time = time.time()
-    result = runner.run(suite)
+    if len(shards) <= 1:
+        shard_results = [_run_shard([test_id for name in shard for test_id in modules[name]], start_dir)
+                         for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+            futures = [
+                executor.submit(_run_shard, [test_id for name in shard for test_id in modules[name]], start_dir)
+                for shard in shards
+            ]
+            shard_results = [future.result() for future in futures]
+    if failed_imports:
+        # Lancés dans ce processus : ils rapportent directement l'ImportError capturée à la découverte
+        shard_results.append(_run_suite(unittest.TestSuite(failed_imports)))
     end_time = time.time()
     
+    # Sortie détaillée de chaque shard
+    for index, shard_result in enumerate(shard_results, 1):
+        print(f"─── Shard {index}/{len(shard_results)} " + "─" * 50)
+        print(shard_result["output"])
+    
+    tests_run = sum(r["tests_run"] for r in shard_results)
+    failures = [item for r in shard_results for item in r["failures"]]
+    errors = [item for r in shard_results for item in r["errors"]]
+    skipped = sum(r["skipped"] for r in shard_results)
+    timings = [item for r in shard_results for item in r["timings"]]
+    
+    # Durées par module (un test id commence par le nom de son module)
+    module_of_test = {test_id: name for name, test_ids in modules.items() for test_id in test_ids}
+    module_of_test.update({test.id(): _imported_module(test) for test in failed_imports})
+    module_timings = {}
+    for test_id, duration in timings:
+        name = module_of_test.get(test_id, test_id.rsplit('.', 2)[0])
+        module_timings[name] = module_timings.get(name, 0.0) + duration
+    
+    history["modules"].update(module_timings)
+    history["tests"].update(dict(timings))
+    save_timing_history(history)
+    
     # Résumé des résultats
     print("\n" + "=" * 70)
     print("📈 RÉSUMÉ DES TESTS")
     print("=" * 70)
     
-    print(f"⏱️  Temps d'exécution: {end_time - start_time:.2f} secondes")
-    print(f"✅ Tests réussis: {result.testsRun - len(result.failures) - len(result.errors)}")
-    print(f"❌ Tests échoués: {len(result.failures)}")
-    print(f"💥 Erreurs: {len(result.errors)}")
-    print(f"⏭️  Tests ignorés: {len(result.skipped)}")
+    print(f"⏱️  Temps d'exécution: {end_time - start_time:.2f} secondes "
+          f"(temps cumulé des tests: {sum(d for _, d in timings):.2f} s)")
+    print(f"✅ Tests réussis: {tests_run - len(failures) - len(errors)}")
+    print(f"❌ Tests échoués: {len(failures)}")
+    print(f"💥 Erreurs: {len(errors)}")
+    print(f"⏭️  Tests ignorés: {skipped}")
+    
+    # Durées par module
+    if module_timings:
+        print("\n📦 DURÉE PAR MODULE:")
+        for name, duration in sorted(module_timings.items(), key=lambda item: item[1], reverse=True):
+            print(f"   {duration:8.3f} s  {name}")
+    
+    # Tests les plus lents
+    if timings and slowest > 0:
+        print(f"\n🐢 LES {min(slowest, len(timings))} TESTS LES PLUS LENTS:")
+        for test_id, duration in sorted(timings, key=lambda item: item[1], reverse=True)[:slowest]:
+            print(f"   {duration:8.3f} s  {test_id}")
     
     # Détails des échecs
-    if result.failures:
+    if failures:
         print("\n❌ DÉTAILS DES ÉCHECS:")
-        for test, traceback in result.failures:
+        for test, traceback in failures:
             print(f"\n- {test}")
             print(f"  {traceback}")
     
     # Détails des erreurs
-    if result.errors:
+    if errors:
         print("\n💥 DÉTAILS DES ERREURS:")
-        for test, traceback in result.errors:
+        for test, traceback in errors:
             print(f"\n- {test}")
             print(f"  {traceback}")
     
     # Code de sortie
-    success = result.wasSuccessful()
+    success = all(r["success"] for r in shard_results)
     
     if success:
         print("\n✅ TOUS LES TESTS SONT PASSÉS AVEC SUCCÈS! 🎉")
@@ -137,6 +311,10 @@ def main():
     parser.add_argument('--module', '-m', help='Module de test spécifique à lancer')
     parser.add_argument('--coverage', '-c', action='store_true', 
                         help='Lancer avec analyse de couverture')
+    parser.add_argument('--workers', '-j', type=int, default=None,
+                        help='Nombre de processus (par défaut: nombre de CPU)')
+    parser.add_argument('--slowest', '-s', type=int, default=10,
+                        help='Nombre de tests les plus lents à afficher')
     
     args = parser.parse_args()
     
@@ -145,7 +323,7 @@ def main():
     elif args.module:
         return run_specific_test_module(args.module)
     else:
-        return run_all_tests()
+        return run_all_tests(workers=args.workers, slowest=args.slowest)
 
 
 if __name__ == '__main__':
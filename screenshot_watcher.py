@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Surveillance des captures Steam - Détection lancée dès qu'une nouvelle capture est écrite
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import re
+import select
+import struct
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import STAGE_LATENCY
+
+
+# Nom des captures Steam : AAAAMMJJhhmmss_N.jpg (ex. 20250604220023_1.jpg)
+STEAM_SCREENSHOT = re.compile(r"^(?P<date>\d{14})_(?P<index>\d+)\.(?:jpe?g|png)$", re.IGNORECASE)
+
+DEFAULT_INDEX_PATH = "screenshot_index.json"
+
+# Constantes inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def screenshot_time(name: str) -> Optional[str]:
+    """Date de prise de vue encodée dans le nom Steam, au format ISO"""
+    match = STEAM_SCREENSHOT.match(name)
+    if not match:
+        return None
+    return datetime.strptime(match.group("date"), "%Y%m%d%H%M%S").isoformat()
+
+
+class ScreenshotIndex:
+    """Fichiers déjà traités, par nom et par empreinte du contenu, persistés en JSON"""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.hashes: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.hashes = data.get("hashes", {})
+
+    def is_unchanged(self, name: str, stat: os.stat_result) -> bool:
+        """Fichier déjà vu avec la même taille et la même date : inutile de le relire"""
+        entry = self.files.get(name)
+        return entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+    def record(self, name: str, stat: os.stat_result, digest: str, result: Optional[Dict[str, Any]]):
+        self.files[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+        if result is not None:
+            self.hashes[digest] = dict(result, fichier=name)
+
+    def save(self):
+        """Écriture atomique : un arrêt brutal laisse l'ancien index intact"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"files": self.files, "hashes": self.hashes}, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+
+class InotifyWatcher:
+    """Événements de fin d'écriture du noyau (Linux), via libc et ctypes"""
+
+    def __init__(self, folder: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 a échoué")
+        # Fichier fermé après écriture, ou renommé dans le dossier (écriture via fichier temporaire)
+        watch = libc.inotify_add_watch(self.fd, os.fsencode(folder), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if watch < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch a échoué: {folder}")
+
+    def wait(self, timeout: float) -> List[str]:
+        """Noms des fichiers terminés ; bloque au plus `timeout` secondes"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        names = []
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(buffer):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT.size
+            name = buffer[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Repli sans inotify : un fichier est prêt quand sa taille et sa date restent stables"""
+
+    def __init__(self, folder: str, interval: float = 0.25):
+        self.folder = folder
+        self.interval = interval
+        self._pending: Dict[str, tuple] = {}
+        # Fichiers déjà présents : laissés à scan_existing
+        self._seen: Dict[str, tuple] = dict(self._signature(entry) for entry in os.scandir(folder) if entry.is_file())
+
+    @staticmethod
+    def _signature(entry: os.DirEntry) -> tuple:
+        stat = entry.stat()
+        return entry.name, (stat.st_size, stat.st_mtime_ns)
+
+    def wait(self, timeout: float) -> List[str]:
+        time.sleep(min(self.interval, timeout))
+        ready = []
+        current = {}
+        for entry in os.scandir(self.folder):
+            if entry.is_file():
+                name, signature = self._signature(entry)
+                current[name] = signature
+        for name, signature in current.items():
+            if self._seen.get(name) == signature:
+                continue
+            # Prêt seulement si rien n'a changé depuis le passage précédent
+            if self._pending.get(name) == signature:
+                ready.append(name)
+                self._seen[name] = signature
+                del self._pending[name]
+            else:
+                self._pending[name] = signature
+        return ready
+
+    def close(self):
+        pass
+
+
+class ScreenshotWatcher:
+    """Lance la détection sur chaque nouvelle capture, une seule fois par contenu"""
+
+    def __init__(self, folder: str, index_path: str = DEFAULT_INDEX_PATH,
+                 handler: Optional[Callable[[str, bytes], Dict[str, Any]]] = None,
+                 pattern: re.Pattern = STEAM_SCREENSHOT, polling: bool = False, interval: float = 0.25):
+        self.folder = folder
+        self.index = ScreenshotIndex(index_path)
+        self.handler = handler or self._recommend
+        self.pattern = pattern
+        self._pipeline = None
+
+        self.watcher = None
+        if not polling:
+            try:
+                self.watcher = InotifyWatcher(folder)
+                self.mode = "inotify"
+            except (OSError, AttributeError):
+                # Pas de Linux ou plus de descripteurs inotify disponibles
+                self.watcher = None
+        if self.watcher is None:
+            self.watcher = PollingWatcher(folder, interval)
+            self.mode = "scrutation"
+
+        self.processed = 0
+        self.duplicates = 0
+        self.failures = 0
+
+    def _recommend(self, path: str, content: bytes) -> Dict[str, Any]:
+        """Traitement par défaut : recommandation de rangée sur les octets déjà lus"""
+        if self._pipeline is None:
+            from recommendation_pipeline import RecommendationPipeline
+            self._pipeline = RecommendationPipeline()
+        result = self._pipeline.process_frame(content)
+        print(f"   👉 Rangée recommandée: {result['rangée']} ({result['total_ms']:.1f} ms)")
+        return {"rangée": result["rangée"], "total_ms": round(result["total_ms"], 1)}
+
+    def process(self, name: str, detected_at: Optional[float] = None) -> bool:
+        """Traite une capture si elle est nouvelle ; retourne True si la détection a tourné"""
+        if not self.pattern.match(name):
+            return False
+        path = os.path.join(self.folder, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False  # Supprimée entre l'événement et le traitement
+        if self.index.is_unchanged(name, stat):
+            return False
+
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            print(f"❌ {name}: lecture impossible: {e}")
+            return False
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        if digest in self.index.hashes:
+            # Même image sous un autre nom (copie, capture en double) : résultat déjà connu
+            self.duplicates += 1
+            print(f"♻️ {name}: doublon de {self.index.hashes[digest]['fichier']}")
+            self.index.record(name, stat, digest, None)
+            self.index.save()
+            return False
+
+        if detected_at is not None:
+            STAGE_LATENCY.observe(time.perf_counter() - detected_at, ("surveillance", "attente"))
+        print(f"\n📷 {name} ({screenshot_time(name)})")
+        try:
+            result = self.handler(path, content)
+        except Exception as e:
+            # Pas d'entrée dans l'index : l'échec peut être passager (dépendance, mémoire), la capture
+            # sera retentée au prochain événement ou au prochain démarrage
+            self.failures += 1
+            print(f"❌ {name}: {e}")
+            return False
+        self.processed += 1
+        self.index.record(name, stat, digest, dict(result or {}, prise=screenshot_time(name)))
+        self.index.save()
+        return True
+
+    def scan_existing(self):
+        """Traite les captures présentes au démarrage et absentes de l'index"""
+        for name in sorted(os.listdir(self.folder)):
+            self.process(name)
+
+    def run(self, duration: Optional[float] = None, timeout: float = 0.5):
+        """Boucle de surveillance (Ctrl+C pour arrêter, ou après `duration` secondes)"""
+        end_time = None if duration is None else time.monotonic() + duration
+        try:
+            while end_time is None or time.monotonic() < end_time:
+                names = self.watcher.wait(timeout)
+                # Horodatage à la réception de l'événement : l'attente inclut le traitement des précédents
+                detected_at = time.perf_counter()
+                for name in names:
+                    self.process(name, detected_at=detected_at)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.watcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Surveille un dossier de captures Steam et lance la détection')
+    parser.add_argument('folder', help='Dossier de captures (ex. .../userdata/<id>/760/remote/<appid>/screenshots)')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help='Index des captures déjà traitées')
+    parser.add_argument('--polling', action='store_true', help='Force la scrutation au lieu d\'inotify')
+    parser.add_argument('--interval', type=float, default=0.25, help='Période de scrutation (s)')
+    parser.add_argument('--skip-existing', action='store_true', help='Ignore les captures déjà présentes')
+    parser.add_argument('--duration', type=float, default=None, help='Arrêt après ce nombre de secondes')
+    args = parser.parse_args()
+
+    watcher = ScreenshotWatcher(args.folder, args.index, polling=args.polling, interval=args.interval)
+    print(f"👀 Surveillance de {args.folder} ({watcher.mode})")
+    if not args.skip_existing:
+        watcher.scan_existing()
+    watcher.run(args.duration)
+    print(f"\n✅ {watcher.processed} capture(s) analysée(s), {watcher.duplicates} doublon(s) ignoré(s), "
+          f"{watcher.failures} échec(s)")
+
+
+if __name__ == "__main__":
+    main()
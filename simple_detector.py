@@ -4,17 +4,17 @@ Détecteur simple - Affiche toutes les cases trouvées
 """
 
 import cv2
-import json
 from typing import Dict, Tuple
 
+from calibration_store import CalibrationStore, DEFAULT_CONFIG_PATH
+
 
 class SimpleDetector:
     """Détecteur simple pour voir toutes les cases"""
     
-    def __init__(self):
-        # Charger la configuration de calibrage
-        with open('grid_calibration_config.json', 'r') as f:
-            self.config = json.load(f)
+    def __init__(self, config_path: str = DEFAULT_CONFIG_PATH):
+        # Profils de calibrage, rechargés automatiquement si le fichier change
+        self.calibration = CalibrationStore(config_path)
         
         # Ce qu'on voit dans chaque case (basé sur l'image réelle)
         self.grid_content = {
@@ -41,26 +41,8 @@ class SimpleDetector:
     
     def get_cell_coordinates(self, row: int, col: int, width: int, height: int) -> Tuple[int, int, int, int]:
         """Obtient les coordonnées d'une cellule avec la calibration"""
-        # Utilise les ratios calibrés
-        grid_x1 = int(width * 0.223438)
-        grid_x2 = int(width * 0.777604)
-        grid_y1 = int(height * 0.041667)
-        grid_y2 = int(height * 0.957407)
-        
-        total_width = grid_x2 - grid_x1
-        total_height = grid_y2 - grid_y1
-        
-        # Pas d'espacement (calibré à 0)
-        cell_width = total_width // 4
-        cell_height = total_height // 4
-        
-        # Position de la cellule
-        x1 = grid_x1 + col * cell_width
-        y1 = grid_y1 + row * cell_height
-        x2 = x1 + cell_width
-        y2 = y1 + cell_height
-        
-        return x1, y1, x2, y2
+        # Profil de la résolution (ou profil par défaut mis à l'échelle)
+        return self.calibration.get_cell_coordinates(row, col, width, height)
     
     def detect_all_cells(self, image_path: str):
         """Détecte et affiche toutes les cases"""
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Tournoi de stratégies - Politiques de choix de rangée comparées par paires sur des plateaux identiques
+"""
+
+import argparse
+import contextlib
+import copy
+import functools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from board_generator import BIOMES, EMPTY, OBJECT_TYPES, BoardGenerator
+from main import ModularSolCestoGame
+from policy_table import EMPTY_SYMBOL, SYMBOLS, category_objects, row_compositions, solve_stats
+from probability_modifiers import CATEGORIES
+from row_evaluator import recommend_row
+from sol_cesto.core.enums import ObjectType
+from sol_cesto.patterns.factory import GameObjectFactory
+
+
+Board = Dict[tuple, Optional[ObjectType]]
+
+
+def decode_board(codes: np.ndarray) -> Board:
+    """Tableau de codes -> plateau (row, col) -> ObjectType, au format de setup_game_grid"""
+    return {(row, col): OBJECT_TYPES[code] if code != EMPTY else None
+            for (row, col), code in np.ndenumerate(codes)}
+
+
+def row_objects(board: Board, row: int) -> List[ObjectType]:
+    return [board[(row, col)] for col in range(4) if board.get((row, col)) is not None]
+
+
+# --- Politiques : (partie, plateau) -> rangée ---
+
+def heuristic_policy(game: ModularSolCestoGame, board: Board) -> int:
+    """Récompense moins menace de la rangée, comme display_grid_info"""
+    def score(row: int) -> float:
+        infos = [GameObjectFactory.get_object_info(obj_type) for obj_type in row_objects(board, row)]
+        return sum(info['reward_value'] for info in infos) - sum(info['threat_level'] for info in infos)
+    return max(range(4), key=score)
+
+
+def fewest_monsters_policy(game: ModularSolCestoGame, board: Board) -> int:
+    """Rangée avec le moins de monstres, puis la moins menaçante"""
+    def key(row: int):
+        infos = [GameObjectFactory.get_object_info(obj_type) for obj_type in row_objects(board, row)]
+        return (sum(info['category'] == "monster" for info in infos), sum(info['threat_level'] for info in infos))
+    return min(range(4), key=key)
+
+
+def evaluator_policy(game: ModularSolCestoGame, board: Board) -> int:
+    """Évaluateur de rangées (probabilités d'atterrissage, menace pondérée par les PV)"""
+    health_ratio = game.hero_stats.current_health / max(game.hero_stats.max_health, 1)
+    best_row, _ = recommend_row(board, game.grid_weights, health_ratio)
+    return best_row
+
+
+def _rollout_score(game: ModularSolCestoGame, row: int) -> int:
+    """Score obtenu en explorant `row` sur une copie de la partie"""
+    # Ni replay ni métriques pour une exploration qui n'a pas eu lieu ; le fichier ouvert n'est pas copié
+    writer, game.replay_writer = game.replay_writer, None
+    try:
+        trial = copy.deepcopy(game)
+    finally:
+        game.replay_writer = writer
+    trial.record_metrics = False
+    trial.explore_row(row)
+    score, _ = trial.evaluate_performance()
+    return score
+
+
+def sampled_policy(game: ModularSolCestoGame, board: Board, samples: int = 8) -> int:
+    """Moyenne de `samples` explorations simulées par rangée, avec des tirages indépendants"""
+    state = random.getstate()
+    # Graine dérivée de l'état courant : la politique reste déterministe pour une partie donnée
+    sampler = random.Random(hash(state[1][:8]))
+    best_row, best_mean = 0, -math.inf
+    for row in range(4):
+        total = 0
+        for _ in range(samples):
+            random.seed(sampler.getrandbits(64))
+            total += _rollout_score(game, row)
+        if total / samples > best_mean:
+            best_row, best_mean = row, total / samples
+    # Les simulations n'entament pas le flux aléatoire de la vraie partie
+    random.setstate(state)
+    return best_row
+
+
+# Pénalité d'une mort dans la programmation dynamique, comme policy_table
+DEATH_PENALTY = 100.0
+
+
+@functools.lru_cache(maxsize=None)
+def _row_solution(defense: int, hp_max: int) -> Tuple[Dict[Tuple[int, ...], int], np.ndarray]:
+    """Rangs des compositions et valeurs (compositions, PV) de la DP exacte de policy_table"""
+    compositions = row_compositions()
+    values = solve_stats(defense, defense, compositions, category_objects(), hp_max, DEATH_PENALTY)
+    return {counts: rank for rank, counts in enumerate(compositions)}, values
+
+
+def _hero_defense(game: ModularSolCestoGame) -> int:
+    """Défense du héros choisi, comparée à la menace des monstres dans le modèle de combat"""
+    heroes = game.hero_selector.list_available_heroes()
+    info = heroes.get(game.selected_class.value) or heroes.get(game.selected_class.name.lower()) or {}
+    return int(info.get('defense', 0))
+
+
+def exact_policy(game: ModularSolCestoGame, board: Board) -> int:
+    """Espérance exacte de chaque rangée (atterrissages et objets tirés selon leurs lois), sans
+    regarder le flux aléatoire de la partie"""
+    hp_max = max(game.hero_stats.max_health, 1)
+    ranks, values = _row_solution(_hero_defense(game), hp_max)
+    health = min(max(game.hero_stats.current_health, 0), hp_max)
+
+    scores = []
+    for row in range(4):
+        counts = [0] * SYMBOLS
+        for col in range(4):
+            obj_type = board.get((row, col))
+            symbol = (EMPTY_SYMBOL if obj_type is None
+                      else CATEGORIES.index(GameObjectFactory.get_object_info(obj_type)['category']))
+            counts[symbol] += 1
+        # Rangée vide : jamais choisie tant qu'une autre reste
+        scores.append(-math.inf if counts[EMPTY_SYMBOL] == 4 else float(values[ranks[tuple(counts)], health]))
+    return int(np.argmax(scores))
+
+
+POLICIES: Dict[str, Callable[[ModularSolCestoGame, Board], int]] = {
+    "heuristique": heuristic_policy,
+    "moins_de_monstres": fewest_monsters_policy,
+    "évaluateur": evaluator_policy,
+    "échantillonné": sampled_policy,
+    "exact": exact_policy,
+}
+
+
+def play_game(policy: Callable[[ModularSolCestoGame, Board], int], boards: np.ndarray, seed: int) -> int:
+    """Une partie : un plateau par tour, la politique choisit la rangée explorée"""
+    # Même graine pour toutes les politiques : mêmes tirages de combat (nombres aléatoires communs)
+    random.seed(seed)
+    game = ModularSolCestoGame(seed=seed)
+    game.select_hero_interactive()
+    for codes in boards:
+        if not game.hero_stats.is_alive():
+            break
+        board = decode_board(codes)
+        game.game_grid = {}
+        game.setup_game_grid(board)
+        game.explore_row(policy(game, board))
+    score, _ = game.evaluate_performance()
+    return score
+
+
+def play_chunk(policy_names: Sequence[str], seeds: Sequence[int], rounds: int, biome: int = 1) -> np.ndarray:
+    """Joue chaque partie avec toutes les politiques : (parties, politiques) scores"""
+    scores = np.zeros((len(seeds), len(policy_names)), dtype=np.int64)
+    generator = BoardGenerator()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for game_index, seed in enumerate(seeds):
+            # Étages consécutifs du biome, tirés du flux propre à la partie
+            generator.rng = np.random.default_rng(seed)
+            boards = generator.sample(rounds, biome, np.arange(rounds))
+            for policy_index, name in enumerate(policy_names):
+                scores[game_index, policy_index] = play_game(POLICIES[name], boards, seed)
+    return scores
+
+
+def run_tournament(policy_names: Sequence[str], games: int, rounds: int = 3, seed: int = 0,
+                   workers: Optional[int] = None, chunk_size: int = 25, biome: int = 1) -> np.ndarray:
+    """Scores (parties, politiques) ; les paires restent dans le même processus"""
+    # Une graine indépendante par partie, identique pour toutes les politiques
+    seeds = [int(child.generate_state(1, np.uint64)[0])
+             for child in np.random.SeedSequence(seed).spawn(games)]
+    chunks = [seeds[start:start + chunk_size] for start in range(0, games, chunk_size)]
+
+    if workers == 1:
+        parts = [play_chunk(policy_names, chunk, rounds, biome) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(play_chunk, [policy_names] * len(chunks), chunks,
+                                      [rounds] * len(chunks), [biome] * len(chunks)))
+    return np.concatenate(parts) if parts else np.zeros((0, len(policy_names)), dtype=np.int64)
+
+
+def paired_comparison(scores: np.ndarray, policy_names: Sequence[str], reference: str,
+                      z: float = 1.96) -> List[Dict[str, float]]:
+    """Écart moyen de chaque politique à la référence, intervalle de confiance apparié"""
+    games = len(scores)
+    ref = scores[:, list(policy_names).index(reference)].astype(np.float64)
+    comparisons = []
+    for index, name in enumerate(policy_names):
+        if name == reference:
+            continue
+        values = scores[:, index].astype(np.float64)
+        differences = values - ref
+        paired_var = differences.var(ddof=1) if games > 1 else 0.0
+        # Variance si les deux politiques avaient joué des parties indépendantes
+        unpaired_var = (values.var(ddof=1) + ref.var(ddof=1)) if games > 1 else 0.0
+        half_width = z * math.sqrt(paired_var / games) if games else math.inf
+        comparisons.append({
+            "politique": name,
+            "écart_moyen": float(differences.mean()) if games else 0.0,
+            "ic_bas": float(differences.mean()) - half_width if games else -math.inf,
+            "ic_haut": float(differences.mean()) + half_width if games else math.inf,
+            "victoires": float((differences > 0).mean()) if games else 0.0,
+            # Parties indépendantes nécessaires pour la même précision, par partie appariée
+            "gain_variance": float(unpaired_var / paired_var) if paired_var > 0 else math.inf,
+        })
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tournoi de politiques de choix de rangée')
+    parser.add_argument('--games', '-n', type=int, default=200, help='Parties par politique')
+    parser.add_argument('--rounds', type=int, default=3, help='Plateaux par partie')
+    parser.add_argument('--biome', type=int, default=1, choices=BIOMES)
+    parser.add_argument('--policies', nargs='+', default=["heuristique", "moins_de_monstres", "évaluateur"],
+                        choices=list(POLICIES), help='Politiques en lice')
+    parser.add_argument('--reference', default=None, help='Politique de référence (la première par défaut)')
+    parser.add_argument('--seed', type=int, default=0, help='Graine du tournoi')
+    parser.add_argument('--workers', '-j', type=int, default=None, help='Processus (défaut: nombre de CPU)')
+    args = parser.parse_args()
+
+    reference = args.reference or args.policies[0]
+    start_time = time.perf_counter()
+    scores = run_tournament(args.policies, args.games, args.rounds, args.seed, args.workers, biome=args.biome)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"🏟️ {args.games} parties × {len(args.policies)} politiques en {elapsed:.1f} s\n")
+    for index, name in enumerate(args.policies):
+        print(f"   {name:<18} score moyen {scores[:, index].mean():7.1f}")
+
+    print(f"\n⚖️ Écarts appariés à '{reference}' (IC 95%):")
+    for comparison in paired_comparison(scores, args.policies, reference):
+        print(f"   {comparison['politique']:<18} {comparison['écart_moyen']:+7.2f} "
+              f"[{comparison['ic_bas']:+.2f}, {comparison['ic_haut']:+.2f}] | "
+              f"meilleure dans {comparison['victoires']:.0%} des parties | "
+              f"variance ÷{comparison['gain_variance']:.1f} grâce à l'appariement")
+
+
+if __name__ == "__main__":
+    main()
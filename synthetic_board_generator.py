@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Générateur de grilles synthétiques - Captures 4x4 étiquetées pour les benchmarks
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from calibration_store import CalibrationStore, DEFAULT_CONFIG_PATH
+
+
+DEFAULT_LABELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sprite_labels.json')
+
+
+class SyntheticBoardGenerator:
+    """Compose des captures de grille à partir de sprites de cases étiquetés"""
+
+    # Champs de bruit précalculés par résolution, tirés au hasard pour chaque frame
+    NOISE_BANK_SIZE = 8
+
+    def __init__(self, labels_path: str = DEFAULT_LABELS_PATH, config_path: str = DEFAULT_CONFIG_PATH,
+                 seed: int = 0):
+        self.calibration = CalibrationStore(config_path)
+        self.rng = np.random.default_rng(seed)
+
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+
+        # Capture source : fournit les sprites et l'arrière-plan (interface autour de la grille)
+        image_path = os.path.join(os.path.dirname(os.path.abspath(labels_path)), labels['image'])
+        self.source_image = cv2.imread(image_path)
+        if self.source_image is None:
+            raise ValueError(f"Impossible de charger l'image source: {image_path}")
+
+        self.sprites, self.sprite_labels = self._harvest_sprites(labels['cells'])
+
+        # (largeur, hauteur) -> arrière-plan, boîtes des cases et sprites redimensionnés
+        self._layouts: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._noise_banks: Dict[Tuple[int, int, float], np.ndarray] = {}
+
+    def _harvest_sprites(self, cells: Dict[str, Dict[str, Any]]) -> Tuple[List[np.ndarray], List[Dict[str, Any]]]:
+        """Découpe chaque case étiquetée de la capture source"""
+        height, width = self.source_image.shape[:2]
+        sprites = []
+        sprite_labels = []
+        for key, label in sorted(cells.items()):
+            row, col = (int(value) for value in key.split(','))
+            x1, y1, x2, y2 = self.calibration.get_cell_coordinates(row, col, width, height)
+            sprites.append(self.source_image[y1:y2, x1:x2].copy())
+            sprite_labels.append(label)
+        return sprites, sprite_labels
+
+    def _get_layout(self, width: int, height: int) -> Dict[str, Any]:
+        """Prépare une fois par résolution l'arrière-plan et la pile de sprites"""
+        layout = self._layouts.get((width, height))
+        if layout is not None:
+            return layout
+
+        background = cv2.resize(self.source_image, (width, height), interpolation=cv2.INTER_AREA)
+        boxes = [self.calibration.get_cell_coordinates(row, col, width, height)
+                 for row in range(4) for col in range(4)]
+        x1, y1, x2, y2 = boxes[0]
+        cell_width, cell_height = x2 - x1, y2 - y1
+
+        # Pile (S, h, w, 3) : une case = une indexation dans ce tableau
+        tiles = np.stack([
+            cv2.resize(sprite, (cell_width, cell_height), interpolation=cv2.INTER_AREA)
+            for sprite in self.sprites
+        ])
+
+        layout = {"background": background, "boxes": boxes, "tiles": tiles}
+        self._layouts[(width, height)] = layout
+        return layout
+
+    def generate_batch(self, batch_size: int, width: int, height: int, noise_sigma: float = 0.0,
+                       scale_jitter: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Génère un lot de frames (B, H, W, 3) et les indices de sprites (B, 4, 4)"""
+        layout = self._get_layout(width, height)
+        tiles = layout["tiles"]
+
+        sprite_ids = self.rng.integers(0, len(tiles), size=(batch_size, 4, 4))
+        frames = np.repeat(layout["background"][np.newaxis], batch_size, axis=0)
+
+        # Chaque case est collée pour tout le lot en une seule affectation
+        for index, (x1, y1, x2, y2) in enumerate(layout["boxes"]):
+            frames[:, y1:y2, x1:x2] = tiles[sprite_ids[:, index // 4, index % 4]]
+
+        if noise_sigma > 0:
+            noise_bank = self._get_noise_bank(width, height, noise_sigma)
+            choices = self.rng.integers(0, len(noise_bank), size=batch_size)
+            for index in range(batch_size):
+                # Addition saturée uint8 + int16, sans tableau intermédiaire flottant
+                cv2.add(frames[index], noise_bank[choices[index]], dst=frames[index], dtype=cv2.CV_8U)
+
+        if scale_jitter > 0:
+            for index in range(batch_size):
+                frames[index] = self._jitter_scale(frames[index], scale_jitter)
+
+        return frames, sprite_ids
+
+    def _get_noise_bank(self, width: int, height: int, noise_sigma: float) -> np.ndarray:
+        """Banque de bruits gaussiens (K, H, W, 3) en int16, générée une seule fois"""
+        key = (width, height, noise_sigma)
+        bank = self._noise_banks.get(key)
+        if bank is None:
+            bank = np.empty((self.NOISE_BANK_SIZE, height, width, 3), dtype=np.int16)
+            for noise in bank:
+                cv2.randn(noise, 0, noise_sigma)
+            self._noise_banks[key] = bank
+        return bank
+
+    def _jitter_scale(self, frame: np.ndarray, scale_jitter: float) -> np.ndarray:
+        """Zoom aléatoire autour du centre, recadré à la taille d'origine"""
+        height, width = frame.shape[:2]
+        scale = 1.0 + self.rng.uniform(-scale_jitter, scale_jitter)
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), 0.0, scale)
+        return cv2.warpAffine(frame, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE)
+
+    @staticmethod
+    def apply_jpeg(frame: np.ndarray, quality: int) -> np.ndarray:
+        """Aller-retour JPEG en mémoire pour reproduire les artefacts de compression"""
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Échec de l'encodage JPEG")
+        return cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+
+    def labels_for(self, sprite_ids: np.ndarray) -> List[List[Dict[str, Any]]]:
+        """Étiquettes 4x4 d'une frame à partir de ses indices de sprites"""
+        return [[self.sprite_labels[sprite_id] for sprite_id in row] for row in sprite_ids.tolist()]
+
+    def iter_frames(self, count: int, width: int, height: int, batch_size: int = 8,
+                    noise_sigma: float = 0.0, scale_jitter: float = 0.0,
+                    jpeg_quality: Optional[int] = None) -> Iterator[Tuple[np.ndarray, List[List[Dict[str, Any]]]]]:
+        """Itère sur des frames étiquetées générées par lots"""
+        produced = 0
+        while produced < count:
+            size = min(batch_size, count - produced)
+            frames, sprite_ids = self.generate_batch(size, width, height, noise_sigma, scale_jitter)
+            for frame, ids in zip(frames, sprite_ids):
+                if jpeg_quality is not None:
+                    frame = self.apply_jpeg(frame, jpeg_quality)
+                yield frame, self.labels_for(ids)
+            produced += size
+
+    def write_dataset(self, output_dir: str, count: int, width: int, height: int, image_format: str = 'jpg',
+                      jpeg_quality: Optional[int] = None, noise_sigma: float = 0.0, scale_jitter: float = 0.0,
+                      batch_size: int = 8, workers: int = 8) -> str:
+        """Écrit un jeu de données étiqueté (images ou dump .npy) et son labels.jsonl"""
+        os.makedirs(output_dir, exist_ok=True)
+        labels_path = os.path.join(output_dir, 'labels.jsonl')
+
+        dump = None
+        if image_format == 'npy':
+            # Dump mappé en mémoire, lisible par AdvancedDetector.detect_frame_dump
+            dump = np.lib.format.open_memmap(os.path.join(output_dir, 'frames.npy'), mode='w+',
+                                             dtype=np.uint8, shape=(count, height, width, 3))
+
+        params = []
+        if image_format == 'jpg' and jpeg_quality is not None:
+            params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+
+        with open(labels_path, 'w', encoding='utf-8') as labels_file, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = []
+            produced = 0
+            while produced < count:
+                size = min(batch_size, count - produced)
+                frames, sprite_ids = self.generate_batch(size, width, height, noise_sigma, scale_jitter)
+
+                for offset in range(size):
+                    index = produced + offset
+                    entry = {"index": index, "largeur": width, "hauteur": height,
+                             "cases": self.labels_for(sprite_ids[offset])}
+
+                    if dump is not None:
+                        frame = frames[offset]
+                        if jpeg_quality is not None:
+                            frame = self.apply_jpeg(frame, jpeg_quality)
+                        dump[index] = frame
+                    else:
+                        # cv2.imwrite libère le GIL : encodage et écriture en parallèle
+                        filename = f"board_{index:06d}.{image_format}"
+                        entry["fichier"] = filename
+                        pending.append(executor.submit(
+                            cv2.imwrite, os.path.join(output_dir, filename), frames[offset], params
+                        ))
+
+                    labels_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+                produced += size
+
+                # Borne le nombre d'écritures en attente (mémoire stable)
+                if len(pending) > 4 * workers:
+                    for future in pending:
+                        future.result()
+                    pending = []
+
+            for future in pending:
+                future.result()
+
+        if dump is not None:
+            dump.flush()
+
+        return labels_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Génère des grilles Sol Cesto synthétiques étiquetées')
+    parser.add_argument('output_dir', help='Dossier de sortie')
+    parser.add_argument('--count', '-n', type=int, default=1000, help='Nombre de frames')
+    parser.add_argument('--width', type=int, default=1920, help='Largeur des frames')
+    parser.add_argument('--height', type=int, default=1080, help='Hauteur des frames')
+    parser.add_argument('--format', choices=['jpg', 'png', 'npy'], default='jpg', help='Format de sortie')
+    parser.add_argument('--quality', type=int, default=None,
+                        help='Qualité JPEG (artefacts, aussi appliqués au format npy)')
+    parser.add_argument('--noise', type=float, default=0.0, help='Écart-type du bruit gaussien')
+    parser.add_argument('--scale-jitter', type=float, default=0.0, help='Variation d\'échelle (ex: 0.02)')
+    parser.add_argument('--seed', type=int, default=0, help='Graine aléatoire')
+    parser.add_argument('--workers', type=int, default=8, help='Threads d\'écriture')
+    args = parser.parse_args()
+
+    generator = SyntheticBoardGenerator(seed=args.seed)
+    print(f"🎨 {len(generator.sprites)} sprites étiquetés chargés")
+
+    labels_path = generator.write_dataset(
+        args.output_dir, args.count, args.width, args.height,
+        image_format=args.format, jpeg_quality=args.quality, noise_sigma=args.noise,
+        scale_jitter=args.scale_jitter, workers=args.workers
+    )
+    print(f"✅ {args.count} frames {args.width}x{args.height} générées - étiquettes: {labels_path}")
+
+
+if __name__ == "__main__":
+    main()
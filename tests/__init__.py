@@ -0,0 +1,3 @@
+"""
+Tests du projet Sol Cesto IA
+"""
@@ -0,0 +1,3 @@
+"""
+Tests unitaires : formats de fichiers, calibrage et caches
+"""
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests du cache de l'OCR des badges (Tesseract remplacé par un faux lecteur)
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+try:
+    from badge_ocr import BadgeOCR
+except ImportError:  # pytesseract non installé
+    BadgeOCR = None
+
+
+def fake_read_mosaic(mosaic, count):
+    """Lecture factice : une réponse par vignette de la mosaïque"""
+    return [(str(index), 0.9) for index in range(count)]
+
+
+@unittest.skipIf(BadgeOCR is None, "pytesseract non installé")
+class TestBadgeOCRCache(unittest.TestCase):
+    """Succès, échecs et éviction du cache des vignettes"""
+
+    def setUp(self):
+        # Cellules distinctes : bruit aléatoire de graine fixe
+        self.cells = [np.random.default_rng(seed).integers(0, 256, (96, 96, 3), dtype=np.uint8)
+                      for seed in range(4)]
+
+    def make_ocr(self, cache_size: int):
+        ocr = BadgeOCR(cache_size=cache_size)
+        patcher = mock.patch.object(ocr, 'read_mosaic', side_effect=fake_read_mosaic)
+        self.read_mosaic = patcher.start()
+        self.addCleanup(patcher.stop)
+        return ocr
+
+    def test_tiles_are_distinct(self):
+        """Prérequis : les cellules de test donnent des empreintes différentes"""
+        ocr = BadgeOCR()
+        hashes = {ocr.tile_hash(ocr.badge_tile(cell)) for cell in self.cells}
+        self.assertEqual(len(hashes), len(self.cells))
+
+    def test_one_ocr_call_per_frame(self):
+        """Badges identiques d'une frame lus une seule fois, en un seul appel"""
+        ocr = self.make_ocr(cache_size=16)
+        cells = {(0, 0): self.cells[0], (0, 1): self.cells[0], (1, 0): self.cells[1]}
+        results = ocr.read_badges(cells)
+
+        self.assertEqual(self.read_mosaic.call_count, 1)
+        self.assertEqual(self.read_mosaic.call_args[0][1], 2)
+        self.assertEqual(results[(0, 0)], results[(0, 1)])
+        self.assertNotEqual(results[(0, 0)], results[(1, 0)])
+        stats = ocr.get_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 2, 2))
+
+    def test_cache_hit_skips_ocr(self):
+        """Frame déjà vue : aucun appel Tesseract"""
+        ocr = self.make_ocr(cache_size=16)
+        first = ocr.read_badges({(0, 0): self.cells[0], (0, 1): self.cells[1]})
+        second = ocr.read_badges({(0, 0): self.cells[0], (0, 1): self.cells[1]})
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.read_mosaic.call_count, 1)
+        self.assertEqual(ocr.get_cache_stats()["hit_rate"], 0.5)
+
+    def test_eviction_least_recently_used(self):
+        """Cache plein : la vignette la moins récemment utilisée est évincée"""
+        ocr = self.make_ocr(cache_size=2)
+        ocr.read_badges({(0, 0): self.cells[0]})
+        ocr.read_badges({(0, 0): self.cells[1]})
+        # Vignette 0 relue : elle devient la plus récente
+        ocr.read_badges({(0, 0): self.cells[0]})
+        ocr.read_badges({(0, 0): self.cells[2]})
+
+        self.assertEqual(ocr.get_cache_stats()["size"], 2)
+        calls = self.read_mosaic.call_count
+        ocr.read_badges({(0, 0): self.cells[0]})
+        self.assertEqual(self.read_mosaic.call_count, calls)
+        ocr.read_badges({(0, 0): self.cells[1]})
+        self.assertEqual(self.read_mosaic.call_count, calls + 1)
+
+    def test_frame_hits_survive_eviction(self):
+        """Un succès de la frame n'est pas évincé par les nouvelles vignettes de la même frame"""
+        ocr = self.make_ocr(cache_size=2)
+        ocr.read_badges({(0, 0): self.cells[0]})
+        ocr.read_badges({(0, 0): self.cells[1]})
+        ocr.read_badges({(0, 0): self.cells[0], (0, 1): self.cells[2]})
+
+        calls = self.read_mosaic.call_count
+        ocr.read_badges({(0, 0): self.cells[0], (0, 1): self.cells[2]})
+        self.assertEqual(self.read_mosaic.call_count, calls)
+        self.assertEqual(ocr.get_cache_stats()["size"], 2)
+
+    def test_mosaic_layout(self):
+        """Vignettes à position connue sur une bande blanche"""
+        ocr = BadgeOCR()
+        tiles = [np.zeros((ocr.TILE_HEIGHT, ocr.TILE_WIDTH), dtype=np.uint8)] * 3
+        mosaic = ocr.build_mosaic(tiles)
+        stride = ocr.TILE_WIDTH + ocr.MARGIN
+
+        self.assertEqual(mosaic.shape, (ocr.TILE_HEIGHT + 2 * ocr.MARGIN, 3 * stride + ocr.MARGIN))
+        self.assertEqual(int(mosaic[ocr.MARGIN, ocr.MARGIN + stride]), 0)
+        self.assertEqual(int(mosaic[ocr.MARGIN, ocr.MARGIN + ocr.TILE_WIDTH]), 255)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests du magasin de calibrage (profils par résolution, rechargement à chaud)
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from calibration_store import CalibrationStore
+
+
+def make_profile(width: int, height: int) -> dict:
+    """Profil minimal : grille au centre de l'image"""
+    return {
+        "image_dimensions": [width, height],
+        "grid_config": {
+            "grid_x1": width // 4, "grid_x2": width * 3 // 4,
+            "grid_y1": height // 4, "grid_y2": height * 3 // 4,
+            "h_spacing": 8, "v_spacing": 8,
+        },
+    }
+
+
+class TestCalibrationStore(unittest.TestCase):
+    """Chargement des formats, choix du profil et rechargement"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "calibrage.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_config(self, data, mtime_offset: int = 0):
+        """Écrit le fichier ; mtime_offset garantit une date de modification différente"""
+        with open(self.path, 'w') as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+        if mtime_offset:
+            stat = os.stat(self.path)
+            os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+
+    def test_legacy_format(self):
+        """Ancien format à profil unique : nommé d'après sa résolution"""
+        self.write_config(make_profile(1920, 1080))
+        store = CalibrationStore(self.path)
+        self.assertEqual(store.default_profile_name, "1920x1080")
+        self.assertTrue(store.has_profile(1920, 1080))
+        self.assertEqual(store.get_default_profile()["image_dimensions"], [1920, 1080])
+
+    def test_profiles_by_size_and_default(self):
+        """Profil exact si calibré, sinon profil par défaut"""
+        self.write_config({
+            "default_profile": "steam-deck",
+            "profiles": {"1920x1080": make_profile(1920, 1080), "steam-deck": make_profile(1280, 800)},
+        })
+        store = CalibrationStore(self.path)
+        self.assertEqual(store.get_profile(1920, 1080)["image_dimensions"], [1920, 1080])
+        self.assertEqual(store.get_profile(1024, 768)["image_dimensions"], [1280, 800])
+        self.assertEqual(store.get_profile_by_name("steam-deck")["image_dimensions"], [1280, 800])
+        with self.assertRaises(ValueError):
+            store.get_profile_by_name("inconnu")
+
+    def test_cell_coordinates(self):
+        """16 cellules dans la grille, de même taille, sans chevauchement"""
+        self.write_config(make_profile(1920, 1080))
+        store = CalibrationStore(self.path)
+        boxes = [store.get_cell_coordinates(row, col, 1920, 1080) for row in range(4) for col in range(4)]
+
+        x1, y1, x2, y2 = boxes[0]
+        self.assertEqual((x1, y1), (480, 270))
+        self.assertEqual({(bx2 - bx1, by2 - by1) for bx1, by1, bx2, by2 in boxes}, {(x2 - x1, y2 - y1)})
+        self.assertLess(boxes[0][2], boxes[1][0])
+        self.assertLessEqual(boxes[-1][2], 1440)
+        self.assertLessEqual(boxes[-1][3], 810)
+
+    def test_reload_on_change(self):
+        """Fichier modifié : profils relus et caches dérivés invalidés"""
+        self.write_config(make_profile(1920, 1080))
+        store = CalibrationStore(self.path, check_interval=0.0)
+        generation = store.generation
+        store.get_cell_coordinates(0, 0, 1920, 1080)
+
+        self.write_config({"profiles": {"1280x800": make_profile(1280, 800)}}, mtime_offset=10**9)
+        self.assertTrue(store.check_for_changes())
+        self.assertEqual(store.generation, generation + 1)
+        self.assertEqual(store.default_profile_name, "1280x800")
+        self.assertFalse(store.has_profile(1920, 1080))
+        # Plus de modification : pas de nouvelle lecture
+        self.assertFalse(store.check_for_changes())
+
+    def test_invalid_json_keeps_last_profiles(self):
+        """Fichier invalide (écriture en cours) : les derniers profils valides restent en place"""
+        self.write_config(make_profile(1920, 1080))
+        store = CalibrationStore(self.path, check_interval=0.0)
+
+        self.write_config('{"profiles": {', mtime_offset=10**9)
+        with redirect_stdout(io.StringIO()):
+            self.assertFalse(store.check_for_changes())
+        self.assertTrue(store.has_profile(1920, 1080))
+        # Même fichier invalide : pas relu à chaque appel
+        self.assertFalse(store.check_for_changes())
+
+        self.write_config(make_profile(1280, 800), mtime_offset=2 * 10**9)
+        self.assertTrue(store.check_for_changes())
+        self.assertTrue(store.has_profile(1280, 800))
+
+    def test_save_profile(self):
+        """Profil ajouté, fichier réécrit au nouveau format et relu"""
+        self.write_config(make_profile(1920, 1080))
+        store = CalibrationStore(self.path)
+        store.save_profile(make_profile(1280, 800), name="steam-deck")
+
+        self.assertEqual(set(store.profiles), {"1920x1080", "steam-deck"})
+        self.assertEqual(store.default_profile_name, "1920x1080")
+        with open(self.path) as f:
+            data = json.load(f)
+        self.assertEqual(data["default_profile"], "1920x1080")
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+
+        store.save_profile(make_profile(2560, 1440), make_default=True)
+        self.assertEqual(store.default_profile_name, "2560x1440")
+        self.assertEqual(CalibrationStore(self.path).default_profile_name, "2560x1440")
+
+
+if __name__ == '__main__':
+    unittest.main()
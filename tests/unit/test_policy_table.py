@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests de la table de politique précalculée
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from board_generator import OBJECT_TYPES
+from policy_table import (EMPTY_SYMBOL, HEADER, MAGIC, VERSION, PolicyTable, build_table, category_objects,
+                          row_compositions, solve_stats)
+
+
+class TestPolicyTable(unittest.TestCase):
+    """Construction, relecture et validation d'une petite table"""
+
+    HP_MAX = 10
+    STAT_MAX = 2
+    DEATH_PENALTY = 100.0
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.temp_dir, "politique.scpt")
+        # Petite table calculée dans ce processus (workers=1)
+        cls.stats = build_table(cls.path, hp_max=cls.HP_MAX, stat_max=cls.STAT_MAX,
+                                death_penalty=cls.DEATH_PENALTY, workers=1)
+        cls.table = PolicyTable(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir)
+
+    def test_header_and_shape(self):
+        """Métadonnées relues et dimensions (compositions, force, magie, PV)"""
+        stats = self.STAT_MAX + 1
+        self.assertEqual(self.table.values.shape, (len(row_compositions()), stats, stats, self.HP_MAX + 1))
+        self.assertEqual(self.stats["entrées"], self.table.values.size)
+        self.assertEqual(self.stats["octets"], os.path.getsize(self.path))
+        self.assertEqual(self.table.hp_max, self.HP_MAX)
+        self.assertEqual(self.table.stat_max, self.STAT_MAX)
+
+    def test_values_match_solver(self):
+        """Les valeurs écrites sont celles de solve_stats (en float32)"""
+        compositions = row_compositions()
+        expected = solve_stats(1, 2, compositions, category_objects(), self.HP_MAX, self.DEATH_PENALTY)
+        np.testing.assert_allclose(self.table.values[:, 1, 2], expected.astype(np.float32))
+
+    def test_row_compositions(self):
+        """Compositions uniques de 4 cases, rangée vide en premier"""
+        compositions = row_compositions()
+        self.assertEqual(len(set(compositions)), len(compositions))
+        self.assertTrue(all(sum(counts) == 4 for counts in compositions))
+        self.assertEqual(compositions[0][EMPTY_SYMBOL], 4)
+
+    def test_row_values(self):
+        """Rangée vide jamais choisie, PV et statistiques bornés à la table"""
+        board = {(1, col): OBJECT_TYPES[0] for col in range(4)}
+        board[(2, 0)] = OBJECT_TYPES[-1]
+        values = self.table.row_values(board, health=5, strength=1, magic=1)
+
+        self.assertEqual(values[0], -np.inf)
+        self.assertEqual(values[3], -np.inf)
+        self.assertTrue(np.isfinite(values[1]))
+        self.assertIn(self.table.best_row(board, health=5, strength=1, magic=1), (1, 2))
+
+        # Hors bornes : mêmes lectures qu'aux bornes
+        self.assertEqual(self.table.row_values(board, health=99, strength=99, magic=-3),
+                         self.table.row_values(board, health=self.HP_MAX, strength=self.STAT_MAX, magic=0))
+
+    def test_row_rank_ignores_order(self):
+        """Deux rangées de même composition partagent la même entrée"""
+        row = [OBJECT_TYPES[0], None, OBJECT_TYPES[-1], None]
+        self.assertEqual(self.table.row_rank(row), self.table.row_rank(list(reversed(row))))
+
+    def test_invalid_header(self):
+        """Magic ou version inconnus : ValueError"""
+        path = os.path.join(self.temp_dir, "invalide.scpt")
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(b"XXXX", VERSION, 0))
+        with self.assertRaises(ValueError):
+            PolicyTable(path)
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION + 1, 0))
+        with self.assertRaises(ValueError):
+            PolicyTable(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests du format de replay binaire
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from replay_format import (BOARD, GAME_END, GAME_START, HEADER, MAGIC, RECORD_DTYPE, VERSION,
+                           ReplayReader, ReplayWriter)
+from sol_cesto.core.enums import HeroClass, ObjectType
+
+
+class TestReplayFormat(unittest.TestCase):
+    """Aller-retour écriture/lecture d'un fichier de replay"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "parties.scrp")
+        self.hero = list(HeroClass)[0]
+        self.objects = list(ObjectType)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_two_games(self, flush_every: int = 4096):
+        """Deux parties : la première avec deux plateaux, la seconde sans plateau"""
+        first_board = {(0, 0): self.objects[0], (1, 2): self.objects[1], (3, 3): self.objects[2]}
+        second_board = {(2, 1): self.objects[3]}
+        with ReplayWriter(self.path, flush_every=flush_every) as writer:
+            self.assertEqual(writer.begin_game(seed=42, hero_class=self.hero, health=20), 0)
+            writer.record_board(first_board)
+            writer.record_move(1, 0, True, 20)
+            writer.record_move(1, 2, True, 18)
+            writer.record_interaction(1, 2, self.objects[1], "combat", True, 18, gold_gained=3)
+            writer.record_board(second_board)
+            writer.record_move(2, 0, True, 18)
+            writer.end_game(alive=True, health=18, gold=3)
+
+            self.assertEqual(writer.begin_game(seed=2**40, hero_class=self.hero, health=15), 1)
+            writer.record_move(3, 0, False, 15)
+            writer.end_game(alive=False, health=0, gold=0)
+        return first_board, second_board
+
+    def test_header_and_alignment(self):
+        """En-tête lisible et enregistrements alignés sur 8 octets"""
+        self.write_two_games()
+        with open(self.path, 'rb') as f:
+            magic, version, record_size, table_size = HEADER.unpack(f.read(HEADER.size))
+        self.assertEqual(magic, MAGIC)
+        self.assertEqual(version, VERSION)
+        self.assertEqual(record_size, RECORD_DTYPE.itemsize)
+        self.assertEqual((HEADER.size + table_size) % 8, 0)
+
+    def test_round_trip(self):
+        """Les parties relues correspondent aux enregistrements écrits"""
+        self.write_two_games(flush_every=3)
+        reader = ReplayReader(self.path)
+
+        self.assertEqual(reader.game_count, 2)
+        first = reader.describe_game(0)
+        self.assertEqual(first["seed"], 42)
+        self.assertEqual(first["hero"], self.hero.name)
+        self.assertEqual(first["initial_health"], 20)
+        self.assertEqual([event["type"] for event in first["events"]],
+                         ["board", "move", "move", "interaction", "board", "move", "end"])
+        interaction = first["events"][3]
+        self.assertEqual(interaction["object"], self.objects[1].name)
+        self.assertEqual(interaction["action"], "combat")
+        self.assertEqual(interaction["gold_gained"], 3)
+        self.assertEqual(first["events"][-1], {"type": "end", "alive": True, "health": 18, "gold": 3})
+
+        second = reader.describe_game(1)
+        self.assertEqual(second["seed"], 2**40)
+        self.assertFalse(second["events"][-1]["alive"])
+
+    def test_board_segments(self):
+        """Plateaux reconstruits case par case et rangées rattachées à leur plateau"""
+        first_board, second_board = self.write_two_games()
+        reader = ReplayReader(self.path)
+
+        segments = reader.board_segments(0)
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(len(segments[0]["board"]), 16)
+        self.assertEqual({position: obj_type for position, obj_type in segments[0]["board"].items()
+                          if obj_type is not None}, first_board)
+        self.assertIsNone(segments[0]["board"][(2, 2)])
+        self.assertEqual(segments[0]["rows"], [1])
+        self.assertEqual({position: obj_type for position, obj_type in segments[1]["board"].items()
+                          if obj_type is not None}, second_board)
+        self.assertEqual(reader.explored_rows(0), [1, 2])
+
+        # Partie sans plateau enregistré : rangées quand même restituées
+        self.assertEqual(reader.board_segments(1), [{"board": None, "rows": [3]}])
+
+    def test_summarize(self):
+        """Statistiques vectorisées par partie"""
+        self.write_two_games()
+        summary = ReplayReader(self.path).summarize()
+
+        np.testing.assert_array_equal(summary["moves"], [3, 1])
+        np.testing.assert_array_equal(summary["interactions"], [1, 0])
+        np.testing.assert_array_equal(summary["alive"], [True, False])
+        np.testing.assert_array_equal(summary["final_health"], [18, 0])
+        np.testing.assert_array_equal(summary["final_gold"], [3, 0])
+        self.assertTrue(summary["finished"].all())
+
+    def test_partial_file(self):
+        """Un enregistrement incomplet en fin de fichier (écriture en cours) est ignoré"""
+        self.write_two_games()
+        with open(self.path, 'ab') as f:
+            f.write(b"\x00" * (RECORD_DTYPE.itemsize // 2))
+        reader = ReplayReader(self.path)
+        self.assertEqual(reader.game_count, 2)
+        self.assertEqual(int(reader.records["kind"][-1]), GAME_END)
+
+    def test_empty_file(self):
+        """Fichier sans partie : aucun enregistrement"""
+        ReplayWriter(self.path).close()
+        reader = ReplayReader(self.path)
+        self.assertEqual(reader.game_count, 0)
+        self.assertEqual(len(reader.records), 0)
+
+    def test_record_before_game(self):
+        """Un enregistrement hors partie est refusé"""
+        with ReplayWriter(self.path) as writer:
+            with self.assertRaises(ValueError):
+                writer.record_move(0, 0, True, 10)
+
+    def test_invalid_header(self):
+        """Magic ou version inconnus : ValueError"""
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(b"XXXX", VERSION, RECORD_DTYPE.itemsize, 0))
+        with self.assertRaises(ValueError):
+            ReplayReader(self.path)
+
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION + 1, RECORD_DTYPE.itemsize, 0))
+        with self.assertRaises(ValueError):
+            ReplayReader(self.path)
+
+    def test_record_kinds(self):
+        """Un plateau occupe 16 enregistrements BOARD après le début de partie"""
+        self.write_two_games()
+        kinds = ReplayReader(self.path).game_records(0)["kind"]
+        self.assertEqual(int(kinds[0]), GAME_START)
+        self.assertTrue((kinds[1:17] == BOARD).all())
+        self.assertEqual(int((kinds == BOARD).sum()), 32)
+
+
+if __name__ == '__main__':
+    unittest.main()